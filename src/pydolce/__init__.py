@@ -2,8 +2,11 @@ import logging
 
 import pydolce.core.rules.checkers  # noqa: F401  (checkers are registered on import)
 from pydolce.commands.check import check
+from pydolce.commands.coordinate import coordinate
 from pydolce.commands.format_docs import format_docs
+from pydolce.commands.merge_results import merge_results
 from pydolce.commands.suggest import suggest
+from pydolce.commands.worker import worker
 
 __version__ = "0.1.5"
 
@@ -12,4 +15,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-__all__ = ["__version__", "check", "format_docs", "suggest"]
+__all__ = [
+    "__version__",
+    "check",
+    "coordinate",
+    "format_docs",
+    "merge_results",
+    "suggest",
+    "worker",
+]
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+MOCK_MODEL = "dolce-mock"
+
+CHECK_GOOD_RESPONSE = {"status": "GOOD", "issues": [], "descr": []}
+
+
+@dataclass
+class LatencyDistribution:
+    """Distribution of the simulated inference time (in seconds)"""
+
+    kind: str = "constant"
+    params: tuple[float, ...] = (0.0,)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            value = rng.gauss(self.params[0], self.params[1])
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(self.params[0], self.params[1])
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.kind}")
+        return max(value, 0.0)
+
+    @staticmethod
+    def from_str(spec: str) -> LatencyDistribution:
+        """Parse specs like 'constant:0.1', 'uniform:0.05,0.2' or 'normal:0.1,0.02'"""
+        kind, _, params_str = spec.partition(":")
+        params = tuple(float(p) for p in params_str.split(",") if p) or (0.0,)
+        expected = {"constant": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Invalid latency distribution: {spec}")
+        return LatencyDistribution(kind, params)
+
+
+@dataclass
+class MockRequest:
+    """A generation request received by the mock server, whatever its wire format"""
+
+    api: str
+    model: str
+    system: str
+    prompt: str
+    schema: dict | None = None
+
+
+MockResponder = Callable[[MockRequest], str]
+
+
+def default_responder(request: MockRequest) -> str:
+    """Answer check prompts with a GOOD verdict and suggestion prompts with
+    a placeholder description for every requested item."""
+    if "RULES TO CHECK" in request.system:
+        return json.dumps(CHECK_GOOD_RESPONSE)
+
+    output_format = request.system.partition("EXACT OUTPUT FORMAT IN JSON:")[2]
+    keys = re.findall(r'"(\w+)":', output_format)
+    if not keys:
+        return "Hi!"
+    return json.dumps(
+        {
+            key: {} if key == "raises" else f"Mock {key.replace('_', ' ')}."
+            for key in keys
+        }
+    )
+
+
+@dataclass
+class MockServerConfig:
+    """Behavior of the mock LLM server
+
+    `rules` are (regex, response) pairs matched in order against the user
+    prompt, the first match wins. Unmatched requests go to `responder`.
+    """
+
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    error_rate: float = 0.0
+    rules: list[tuple[str, str]] = field(default_factory=list)
+    responder: MockResponder = default_responder
+    seed: int = 0
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockLLMServer:
+    """Local HTTP server speaking the Ollama, OpenAI-compatible and Anthropic APIs
+
+    Meant for tests and benchmarks. Every served generation request records
+    its service time in `latencies`.
+    """
+
+    def __init__(
+        self,
+        config: MockServerConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.config = config or MockServerConfig()
+        self.latencies: list[float] = []
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(self.config.seed)  # noqa: S311 (not used for security)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> MockLLMServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def __enter__(self) -> MockLLMServer:
+        return self.start()
+
+    def __exit__(self, *_args: object) -> None:
+        self.stop()
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            self.requests += 1
+            delay = self.config.latency.sample(self._rng)
+            failed = self._rng.random() < self.config.error_rate
+            if failed:
+                self.errors += 1
+        return delay, failed
+
+    def respond(self, request: MockRequest) -> str:
+        for pattern, response in self.config.rules:
+            if re.search(pattern, request.prompt):
+                return response
+        return self.config.responder(request)
+
+    def record_latency(self, latency: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+
+    def generate(self, api: str, data: dict) -> tuple[int, dict]:
+        """Serve a generation request of an API, returns the status and body"""
+        start = time.perf_counter()
+        delay, failed = self._draw()
+        time.sleep(delay)
+        if failed:
+            return 503, {"error": "mock failure"}
+
+        parse_request, build_response = _APIS[api]
+        request = parse_request(data)
+        body = build_response(request, self.respond(request), delay)
+        self.record_latency(time.perf_counter() - start)
+        return 200, body
+
+
+def _handler_for(server: MockLLMServer) -> type[BaseHTTPRequestHandler]:
+    class _MockHandler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+        def _send_json(self, status: int, body: dict) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_HEAD(self) -> None:
+            self.send_response(200)
+            self.end_headers()
+
+        def do_GET(self) -> None:
+            if self.path == "/api/tags":
+                self._send_json(200, {"models": [{"name": MOCK_MODEL}]})
+            elif self.path.endswith("/models"):
+                self._send_json(200, {"data": [{"id": MOCK_MODEL}]})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+
+            if self.path == "/api/generate" and "prompt" not in data:
+                # Model load request, the mock model is always loaded
+                self._send_json(
+                    200, {"model": MOCK_MODEL, "response": "", "done": True}
+                )
+                return
+
+            api = _api_for(self.path)
+            if api is None:
+                self._send_json(404, {"error": "not found"})
+                return
+
+            self._send_json(*server.generate(api, data))
+
+    return _MockHandler
+
+
+def _api_for(path: str) -> str | None:
+    if path == "/api/generate":
+        return "ollama"
+    if path.endswith("/chat/completions"):
+        return "openai"
+    if path == "/v1/messages":
+        return "anthropic"
+    return None
+
+
+def _parse_ollama_request(data: dict) -> MockRequest:
+    return MockRequest(
+        api="ollama",
+        model=data.get("model", ""),
+        system=data.get("system", ""),
+        prompt=data.get("prompt", ""),
+        schema=data.get("format") if isinstance(data.get("format"), dict) else None,
+    )
+
+
+def _parse_openai_request(data: dict) -> MockRequest:
+    messages = data.get("messages", [])
+    system = "".join(m["content"] for m in messages if m["role"] == "system")
+    prompt = "".join(m["content"] for m in messages if m["role"] == "user")
+    response_format = data.get("response_format") or {}
+    schema = response_format.get("json_schema", {}).get("schema")
+    return MockRequest("openai", data.get("model", ""), system, prompt, schema)
+
+
+def _parse_anthropic_request(data: dict) -> MockRequest:
+    system_field = data.get("system", "")
+    system = (
+        system_field
+        if isinstance(system_field, str)
+        else "".join(block["text"] for block in system_field)
+    )
+    prompt = "".join(
+        m["content"] if isinstance(m["content"], str) else str(m["content"])
+        for m in data.get("messages", [])
+    )
+    tools = data.get("tools") or []
+    schema = tools[0]["input_schema"] if tools else None
+    return MockRequest("anthropic", data.get("model", ""), system, prompt, schema)
+
+
+def _token_counts(request: MockRequest, text: str) -> tuple[int, int]:
+    return _estimate_tokens(request.system + request.prompt), _estimate_tokens(text)
+
+
+def _ollama_response(request: MockRequest, text: str, delay: float) -> dict:
+    prompt_tokens, completion_tokens = _token_counts(request, text)
+    duration_ns = int(delay * 1e9)
+    return {
+        "model": request.model,
+        "response": text,
+        "done": True,
+        "prompt_eval_count": prompt_tokens,
+        "eval_count": completion_tokens,
+        "prompt_eval_duration": duration_ns // 4,
+        "eval_duration": duration_ns - duration_ns // 4,
+        "load_duration": 0,
+        "total_duration": duration_ns,
+    }
+
+
+def _openai_response(request: MockRequest, text: str, delay: float) -> dict:
+    prompt_tokens, completion_tokens = _token_counts(request, text)
+    return {
+        "model": request.model,
+        "choices": [{"message": {"role": "assistant", "content": text}}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _anthropic_response(request: MockRequest, text: str, delay: float) -> dict:
+    prompt_tokens, completion_tokens = _token_counts(request, text)
+    content: dict[str, Any] = {"type": "text", "text": text}
+    if request.schema is not None:
+        try:
+            content = {"type": "tool_use", "name": "report", "input": json.loads(text)}
+        except json.JSONDecodeError:
+            pass
+    return {
+        "model": request.model,
+        "content": [content],
+        "usage": {"input_tokens": prompt_tokens, "output_tokens": completion_tokens},
+    }
+
+
+# API -> request parser and response builder
+_APIS: dict[
+    str,
+    tuple[Callable[[dict], MockRequest], Callable[[MockRequest, str, float], dict]],
+] = {
+    "ollama": (_parse_ollama_request, _ollama_response),
+    "openai": (_parse_openai_request, _openai_response),
+    "anthropic": (_parse_anthropic_request, _anthropic_response),
+}
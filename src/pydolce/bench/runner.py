@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+import rich
+
+from pydolce.bench.mock_server import (
+    MOCK_MODEL,
+    LatencyDistribution,
+    MockLLMServer,
+    MockServerConfig,
+)
+from pydolce.bench.synthetic import generate_synthetic_repo
+from pydolce.commands.check import check
+from pydolce.config import DEFAULT_EXCLUDES, DolceConfig
+from pydolce.core.client import LLMClient, LLMError
+from pydolce.core.errors import LLMResponseError
+from pydolce.core.parser import code_segments_from_path
+from pydolce.core.suggest import suggest_from_segment
+
+
+@dataclass
+class BenchmarkResult:
+    """Throughput and latency of one benchmarked command"""
+
+    name: str
+    segments: int
+    wall_time: float
+    requests: int
+    errors: int
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def segments_per_second(self) -> float:
+        return self.segments / self.wall_time if self.wall_time else 0.0
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+        return ordered[index]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "segments": self.segments,
+            "wall_time": self.wall_time,
+            "segments_per_second": self.segments_per_second,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_p50": self.percentile(50),
+            "latency_p90": self.percentile(90),
+            "latency_p99": self.percentile(99),
+        }
+
+
+@contextlib.contextmanager
+def _inside(path: Path) -> Iterator[None]:
+    old_cwd = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(old_cwd)
+
+
+@contextlib.contextmanager
+def _measure(
+    name: str, server: MockLLMServer, segments: int, results: list[BenchmarkResult]
+) -> Iterator[None]:
+    requests_before, errors_before = server.requests, server.errors
+    latencies_before = len(server.latencies)
+    start = time.perf_counter()
+    yield
+    results.append(
+        BenchmarkResult(
+            name=name,
+            segments=segments,
+            wall_time=time.perf_counter() - start,
+            requests=server.requests - requests_before,
+            errors=server.errors - errors_before,
+            latencies=server.latencies[latencies_before:],
+        )
+    )
+
+
+def _bench_check(config: DolceConfig) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            check(".", config)
+        except SystemExit:
+            pass  # Synthetic repos have undocumented code on purpose
+
+
+def _bench_suggest(config: DolceConfig) -> int:
+    llm = LLMClient.from_dolce_config(config)
+    suggested = 0
+    for segment in code_segments_from_path(".", config.exclude):
+        if segment.has_doc or segment.seg_type.name == "Module":
+            continue
+        try:
+            suggest_from_segment(segment, config, llm)
+        except (LLMError, LLMResponseError, ValueError):
+            continue
+        suggested += 1
+    return suggested
+
+
+def run_benchmark(
+    provider: str = "ollama",
+    files: int = 20,
+    segments_per_file: int = 10,
+    latency: str = "constant:0.05",
+    error_rate: float = 0.0,
+    concurrency: int | None = None,
+    seed: int = 0,
+) -> list[BenchmarkResult]:
+    """Benchmark `dolce check` (cold and warm cache) and `dolce suggest`
+    against a mock LLM server over a synthetic repository."""
+    server_config = MockServerConfig(
+        latency=LatencyDistribution.from_str(latency),
+        error_rate=error_rate,
+        seed=seed,
+    )
+    results: list[BenchmarkResult] = []
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        MockLLMServer(server_config) as server,
+        _inside(Path(tmp)),
+    ):
+        Path("pyproject.toml").write_text('[project]\nname = "synthetic"\n')
+        generate_synthetic_repo(Path(tmp), files, segments_per_file, seed)
+        segments = sum(1 for _ in code_segments_from_path(".", DEFAULT_EXCLUDES))
+
+        def _config() -> DolceConfig:
+            return DolceConfig(
+                url=server.url,
+                provider=provider,
+                model=MOCK_MODEL,
+                exclude=DEFAULT_EXCLUDES,
+                concurrency=concurrency,
+                retry_delay=0.0,
+            )
+
+        with _measure("check (cold cache)", server, segments, results):
+            _bench_check(_config())
+        with _measure("check (warm cache)", server, segments, results):
+            _bench_check(_config())
+
+        suggest_config = _config()
+        suggest_config.llm_cache = False
+        with _measure("suggest", server, 0, results):
+            suggested = _bench_suggest(suggest_config)
+        results[-1].segments = suggested
+
+    return results
+
+
+def print_benchmark(results: list[BenchmarkResult]) -> None:
+    for result in results:
+        rich.print(f"[bold magenta]{result.name}[/bold magenta]")
+        rich.print(
+            f"  {result.segments} segments in {result.wall_time:.2f}s "
+            f"([cyan]{result.segments_per_second:.1f} segments/s[/cyan])"
+        )
+        rich.print(f"  {result.requests} LLM requests, {result.errors} failed")
+        if result.latencies:
+            rich.print(
+                f"  latency p50 {result.percentile(50) * 1000:.1f}ms, "
+                f"p90 {result.percentile(90) * 1000:.1f}ms, "
+                f"p99 {result.percentile(99) * 1000:.1f}ms"
+            )
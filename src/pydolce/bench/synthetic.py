@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+_VERBS = ["compute", "load", "parse", "send", "build", "merge", "update", "render"]
+_NOUNS = ["report", "config", "user", "record", "payload", "matrix", "index", "batch"]
+_TYPES = ["int", "str", "float", "bool", "list[int]", "dict[str, int]"]
+
+
+def _documented_function(rng: random.Random, name: str) -> str:
+    n_params = rng.randint(0, 4)
+    params = [(f"arg{i}", rng.choice(_TYPES)) for i in range(n_params)]
+    ret = rng.choice(_TYPES)
+    signature = ", ".join(f"{p}: {t}" for p, t in params)
+    args_doc = "".join(
+        f"        {p} ({t}): The {rng.choice(_NOUNS)} to {rng.choice(_VERBS)}.\n"
+        for p, t in params
+    )
+    body_lines = [f"    value = {rng.randint(0, 100)}"]
+    body_lines += [
+        f"    value += len(str({rng.choice(params)[0] if params else 'value'}))"
+        for _ in range(rng.randint(1, 12))
+    ]
+    return (
+        f"def {name}({signature}) -> {ret}:\n"
+        f'    """{rng.choice(_VERBS).capitalize()} the {rng.choice(_NOUNS)}.\n\n'
+        + (f"    Args:\n{args_doc}\n" if params else "")
+        + f"    Returns:\n        {ret}: The resulting {rng.choice(_NOUNS)}.\n"
+        '    """\n' + "\n".join(body_lines) + "\n    return value  # type: ignore\n"
+    )
+
+
+def _undocumented_function(rng: random.Random, name: str) -> str:
+    return f"def {name}(x: int) -> int:\n    return x * {rng.randint(2, 9)}\n"
+
+
+def _documented_class(rng: random.Random, name: str) -> str:
+    methods = "".join(
+        "\n" + _indent(_documented_function(rng, f"method_{i}"))
+        for i in range(rng.randint(1, 3))
+    )
+    return (
+        f"class {name}:\n"
+        f'    """A {rng.choice(_NOUNS)} {rng.choice(_VERBS)}er."""\n' + methods
+    )
+
+
+def _indent(code: str) -> str:
+    return "\n".join(("    " + line) if line else line for line in code.splitlines())
+
+
+def generate_synthetic_repo(
+    root: Path, files: int = 20, segments_per_file: int = 10, seed: int = 0
+) -> int:
+    """Write a synthetic Python package under `root` for benchmarking.
+
+    Returns the number of top level definitions written.
+    """
+    rng = random.Random(seed)  # noqa: S311 (not used for security)
+    package = root / "synthetic"
+    package.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for file_idx in range(files):
+        parts = [f'"""Synthetic module {file_idx}."""\n']
+        for seg_idx in range(segments_per_file):
+            name = f"{rng.choice(_VERBS)}_{rng.choice(_NOUNS)}_{seg_idx}"
+            kind = rng.random()
+            if kind < 0.6:
+                parts.append(_documented_function(rng, name))
+            elif kind < 0.8:
+                parts.append(_undocumented_function(rng, name))
+            else:
+                parts.append(_documented_class(rng, name.title().replace("_", "")))
+            written += 1
+        (package / f"module_{file_idx}.py").write_text("\n\n".join(parts))
+    return written
@@ -1,20 +1,53 @@
 from __future__ import annotations
 
-import logging
-from collections import Counter
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, TypeVar
 
 import rich
 
 from pydolce.config import DolceConfig
-from pydolce.core.check import check_segment
-from pydolce.core.client import LLMClient
-from pydolce.core.parser import (
-    code_segments_from_path,
+from pydolce.core.cache import CacheHandler, segment_fingerprint
+from pydolce.core.check import (
+    LLM_CANCELLED_ISSUE,
+    LLM_DEFERRED_ISSUE,
+    LLM_GATED_ISSUE,
+    LLM_UNAVAILABLE_ISSUE,
+    LLM_UNSAMPLED_ISSUE,
+    TOKEN_BUDGET_ISSUE,
+    check_segment,
 )
+from pydolce.core.coalesce import Coalescer
+from pydolce.core.parser import CodeSegment, python_files
+from pydolce.core.pipeline import ParseStage
+from pydolce.core.priority import changed_lines, risk_score
+from pydolce.core.results import RunReport
+from pydolce.core.router import LLMRouter
 from pydolce.core.rules.checkers.common import CheckContext, CheckResult, CheckStatus
+from pydolce.core.rules.plan import RulePlan
 from pydolce.core.rules.rule import LLMRule, Rule
+from pydolce.core.rules.rulesets import RULE_BY_REF
+from pydolce.core.sampling import Coverage, SampleRotation, stale_rules
+from pydolce.core.sharding import Shard, file_key, segment_key
+from pydolce.core.similarity import Vocabulary
+from pydolce.core.tokens import TokenBudget
 
-logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+CACHE_SYNC_INTERVAL = 5.0  # Seconds between writes of the check cache file
+VOCABULARY_FILE = "vocabulary.json"  # In the cache folder, see `Vocabulary`
+SAMPLING_FILE = "sampling.json"  # In the cache folder, see `SampleRotation`
+
+# Counters of the segments whose LLM rules a run left unchecked
+_UNFINISHED_COUNTERS = (
+    "segments_deferred",
+    "segments_over_budget",
+    "segments_degraded",
+    "segments_cancelled",
+)
 
 
 def _print_summary(report: dict[Rule, list[CheckResult]]) -> None:
@@ -46,72 +79,562 @@ def _print_report_issues(report: dict[Rule, list[CheckResult]]) -> None:
                 rich.print(f"[yellow]  - {line}[/yellow]")
 
 
-def check(path: str, config: DolceConfig) -> None:
-    llm = None
-    if config.url and any(isinstance(rule, LLMRule) for rule in config.rule_set):
-        llm = LLMClient.from_dolce_config(config)
-        if not llm.test_connection():
-            rich.print("[red]✗ LLM connection failed[/red]")
-            return
+def _print_prefilter_summary(ctx: CheckContext) -> None:
+    counters = ctx.stats.counters
+    skipped = counters["dce501_prescreened"]
+    audited = counters["dce501_audited"]
+    if not skipped and not audited:
+        return
+    line = (
+        f"\n[bold]DCE501 prefilter[/bold] (threshold "
+        f"{ctx.config.behavior_prefilter}): {skipped} segments skipped the LLM"
+    )
+    if audited:
+        misses = counters["dce501_audit_misses"]
+        line += (
+            f", estimated false negative rate {misses / audited:.1%} "
+            f"({misses} of {audited} audited segments were BAD)"
+        )
+    rich.print(line)
 
-    ctx = CheckContext(config=config)
-    bad = 0
-    unknown = 0
 
-    handler = None
-    try:
-        handler = config.cache_handler
-    except Exception as e:
-        logger.debug("Not using cache handler: %s", e)
+def _sample_coverage(
+    segments: Iterable[CodeSegment], plan: RulePlan, handler: CacheHandler
+) -> Coverage:
+    coverage = Coverage()
+    for segment in segments:
+        coverage.add(
+            handler.verdict_times(segment), plan.for_type(segment.seg_type).llm_rules
+        )
+    return coverage
 
-    assert handler is not None
 
-    config_rules = config.rule_set
-    for segment in code_segments_from_path(path, config.exclude):
-        loc = f"[blue]{segment.code_path}[/blue]"
-        rich.print(f"[white]\\[  ...  ][/white] [blue]{loc}[/blue]", end="\r")
-        seg_rules = config_rules
+def _print_sample_summary(
+    ctx: CheckContext, sample: SampleRotation, coverage: Coverage
+) -> None:
+    not_sampled = ctx.stats.counters["segments_not_sampled"]
+    slot = sample.run % sample.slots + 1
+    line = (
+        f"\n[bold]LLM sample[/bold] (slice {slot} of {sample.slots}): "
+        f"{not_sampled} segments without a verdict were not sampled, "
+        f"{coverage.covered} of {coverage.segments} segments covered "
+        f"({coverage.ratio:.1%})"
+    )
+    if coverage.oldest is not None:
+        age = (time.time() - coverage.oldest) / (24 * 3600)
+        line += f", oldest verdict {age:.1f} days old"
+    rich.print(line)
 
-        report: dict[Rule, list[CheckResult]] = {}
-        if handler is not None:
-            cached_report = handler.get_report(segment)
-            report = {
-                rule: results
-                for rule, results in cached_report.items()
-                if results is not None
-            }
-            seg_rules = [rule for rule in seg_rules if rule not in cached_report]
 
-        if seg_rules:
-            new_report = check_segment(segment, seg_rules, ctx, llm)
-            if handler is not None:
-                handler.set_report(segment, new_report, sync=True)
-            report.update(new_report)
+# Unknown results set aside from the report, and the counter of their segments
+_SKIPPED_LLM_ISSUES = (
+    (LLM_UNAVAILABLE_ISSUE, "segments_degraded"),
+    (TOKEN_BUDGET_ISSUE, "segments_over_budget"),
+    (LLM_GATED_ISSUE, "segments_gated"),
+    (LLM_DEFERRED_ISSUE, "segments_queued_for_llm"),
+    (LLM_UNSAMPLED_ISSUE, "segments_not_sampled"),
+    (LLM_CANCELLED_ISSUE, "segments_cancelled"),
+)
 
-        statuses = Counter(r.status for rep in report.values() for r in rep)
 
-        if statuses.get(CheckStatus.GOOD, 0) == sum(statuses.values()):
-            rich.print(f"[green][  OK   ][/green] {loc}")
-            continue
+def _settle_report(
+    segment: CodeSegment,
+    report: dict[Rule, list[CheckResult]],
+    new_report: dict[Rule, list[CheckResult]],
+    ctx: CheckContext,
+    handler: CacheHandler | None,
+) -> dict[Rule, list[CheckResult]]:
+    """Cache the new results and set aside the LLM rules that were not checked"""
+    if new_report and handler is not None:
+        handler.set_report(segment, new_report)
+        handler.sync_cache(CACHE_SYNC_INTERVAL)
+    for issue, counter in _SKIPPED_LLM_ISSUES:
+        if _has_issue(report, issue):
+            ctx.stats.increment(counter)
+            report = _without_issue(report, issue)
+    return report
+
+
+def print_segment_report(
+    code_path: str, report: dict[Rule, list[CheckResult]]
+) -> Counter[CheckStatus]:
+    loc = f"[blue]{code_path}[/blue]"
+    statuses = Counter(r.status for rep in report.values() for r in rep)
+
+    if statuses[CheckStatus.GOOD] == sum(statuses.values()):
+        rich.print(f"[green][  OK   ][/green] {loc}")
+        return statuses
+
+    if statuses[CheckStatus.BAD]:
+        rich.print(f"[red][ ERROR ][/red] {loc}")
+    if statuses[CheckStatus.UNKNOWN]:
+        rich.print(f"[yellow][  ???  ][/yellow] {loc}")
+    _print_report_issues(report)
+    return statuses
 
-        if statuses.get(CheckStatus.BAD, 0):
-            rich.print(f"[red][ ERROR ][/red] {loc}")
-            bad += 1
-        if statuses.get(CheckStatus.UNKNOWN, 0):
-            rich.print(f"[yellow][  ???  ][/yellow] {loc}")
-            unknown += 1
-        _print_report_issues(report)
 
+def print_run_summary(bad: int, unknown: int) -> None:
     if bad or unknown:
         rich.print("\n[bold]Summary:[/bold]")
         if unknown:
             rich.print(f"[yellow]✓ Unkown: {unknown}[/yellow]")
         if bad:
             rich.print(f"[red]✗ Incorrect: {bad}[/red]")
-        if not bad and not unknown:
-            rich.print("[green]✓ All correct[/green]")
     else:
         rich.print("\n[bold green]✓ All correct[/bold green]")
 
-    if bad:
+
+def _print_skipped_summary(ctx: CheckContext) -> None:
+    counters = ctx.stats.counters
+    if degraded := counters["segments_degraded"]:
+        rich.print(
+            f"\n[yellow]! LLM unavailable: {degraded} segments were checked "
+            "with static rules only[/yellow]"
+        )
+
+    if over_budget := counters["segments_over_budget"]:
+        rich.print(
+            f"\n[yellow]! Token budget reached: {over_budget} segments were "
+            "checked with static rules only[/yellow]"
+        )
+
+    if deferred := counters["segments_deferred"]:
+        rich.print(
+            f"\n[yellow]! Time budget reached: the LLM checks of {deferred} "
+            "segments were deferred[/yellow]"
+        )
+
+    if gated := counters["segments_gated"]:
+        action = (
+            "deferred to the end of the run"
+            if ctx.config.llm_gate == "defer"
+            else "skipped"
+        )
+        rich.print(
+            f"\n[yellow]! Gate rules failed: the LLM checks of {gated} "
+            f"segments were {action}[/yellow]"
+        )
+
+    _print_prefilter_summary(ctx)
+
+
+def _has_issue(report: dict[Rule, list[CheckResult]], issue: str) -> bool:
+    return any(
+        result.issue == issue for results in report.values() for result in results
+    )
+
+
+def _without_issue(
+    report: dict[Rule, list[CheckResult]], issue: str
+) -> dict[Rule, list[CheckResult]]:
+    return {
+        rule: results
+        for rule, results in report.items()
+        if not _has_issue({rule: results}, issue)
+    }
+
+
+def _check_with_cache(
+    segment: CodeSegment,
+    plan: RulePlan,
+    ctx: CheckContext,
+    llm: LLMRouter | None,
+    handler: CacheHandler | None,
+    gate: frozenset[Rule] = frozenset(),
+    skip_llm: str | None = None,
+    sample: SampleRotation | None = None,
+    precomputed: dict[Rule, list[CheckResult]] | None = None,
+) -> tuple[dict[Rule, list[CheckResult]], dict[Rule, list[CheckResult]]]:
+    """Check the rules of a segment that are not cached.
+
+    With a `sample`, the stale LLM verdicts of the segments in it are checked
+    again, and the LLM rules of the other segments are skipped. The
+    `precomputed` results (of the parse processes) are taken as new ones.
+    Returns the full report and the part of it that was newly computed.
+    """
+    cached_report: dict[Rule, list[CheckResult]] = {}
+    if handler is not None:
+        cached_report = handler.get_report(segment)
+        if sample is not None and segment in sample:
+            stale = stale_rules(
+                handler.verdict_times(segment),
+                plan.for_type(segment.seg_type).llm_rules,
+                ctx.config.sample_max_age_days * 24 * 3600,
+            )
+            cached_report = {
+                rule: results
+                for rule, results in cached_report.items()
+                if rule not in stale
+            }
+        elif sample is not None:
+            skip_llm = LLM_UNSAMPLED_ISSUE
+    computed = {
+        rule: results
+        for rule, results in (precomputed or {}).items()
+        if rule not in cached_report
+    }
+    report = cached_report | computed
+
+    new_report = computed | check_segment(
+        segment, plan, ctx, llm, report, gate, skip_llm
+    )
+    report.update(new_report)
+    return report, new_report
+
+
+def _coalesced(
+    segment: CodeSegment,
+    check_fn: Callable[[CodeSegment], tuple[dict, dict]],
+    coalescer: Coalescer[tuple[dict, dict]],
+    ctx: CheckContext | None = None,
+) -> tuple[dict, dict]:
+    """Check a segment once per fingerprint, identical ones reuse its report
+
+    Duplicates are counted in the stats of `ctx`, if given.
+    """
+    (report, new_report), shared = coalescer.get(
+        segment_fingerprint(segment), lambda: check_fn(segment)
+    )
+    if shared:
+        if ctx is not None:
+            ctx.stats.increment("duplicate_segments")
+        # Same fingerprint, so the new results are already cached
+        return dict(report), {}
+    return report, new_report
+
+
+def _checked_segments(
+    segments: Iterable[CodeSegment],
+    check_fn: Callable[[CodeSegment], T],
+    parallel: int,
+) -> Iterator[tuple[CodeSegment, T]]:
+    """Check segments with up to `parallel` concurrent checks, keeping their order."""
+    if parallel <= 1:
+        for segment in segments:
+            loc = f"[blue]{segment.code_path}[/blue]"
+            rich.print(f"[white]\\[  ...  ][/white] [blue]{loc}[/blue]", end="\r")
+            yield segment, check_fn(segment)
+        return
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        pending: deque[tuple[CodeSegment, Future[T]]] = deque()
+        for segment in segments:
+            pending.append((segment, executor.submit(check_fn, segment)))
+            if len(pending) >= parallel * 2:
+                done_segment, future = pending.popleft()
+                yield done_segment, future.result()
+        while pending:
+            done_segment, future = pending.popleft()
+            yield done_segment, future.result()
+
+
+def _sample_rotation(
+    config: DolceConfig, llm: LLMRouter | None, handler: CacheHandler
+) -> SampleRotation | None:
+    if llm is None or config.sample is None:
+        return None
+    return SampleRotation.next_run(
+        config.sample, config.sample_seed, handler.cache_folder / SAMPLING_FILE
+    )
+
+
+def _deadline(ctx: CheckContext, llm: LLMRouter | None) -> float | None:
+    """When the LLM checks of a time budgeted run should stop being started"""
+    if llm is None or ctx.config.time_budget is None:
+        return None
+    return ctx.stats.started_at + ctx.config.time_budget
+
+
+def _timed(
+    check_fn: Callable[[CodeSegment], T], run_report: RunReport, root: Path
+) -> Callable[[CodeSegment], T]:
+    """Add the time spent checking each segment to the time of its file"""
+
+    def _check(segment: CodeSegment) -> T:
+        start = time.perf_counter()
+        try:
+            return check_fn(segment)
+        finally:
+            run_report.add_time(
+                file_key(segment.file_path, root), time.perf_counter() - start
+            )
+
+    return _check
+
+
+def prefilter_vocabulary(
+    config: DolceConfig, plan: RulePlan, handler: CacheHandler
+) -> Vocabulary | None:
+    """The vocabulary of the last run, when the DCE501 prefilter needs one"""
+    if config.behavior_prefilter is None or RULE_BY_REF["DCE501"] not in plan:
+        return None
+    return Vocabulary.load(handler.cache_folder / VOCABULARY_FILE)
+
+
+def segments_to_check(
+    path: str,
+    config: DolceConfig,
+    root: Path,
+    rules: Iterable[Rule] = (),
+    vocabulary: Vocabulary | None = None,
+) -> ParseStage:
+    """The segments of the files (of the shard) of a run, parsed in the background
+
+    The static `rules` are checked while parsing, when files are parsed in
+    other processes. The segments of every parsed file are counted in the
+    `vocabulary`, if any.
+    """
+    files = python_files(path, config.exclude)
+    if config.shard is None:
+        return ParseStage(files, config, rules, vocabulary=vocabulary)
+
+    shard = Shard.parse(config.shard, config.shard_by)
+    timings = None
+    if config.shard_timings is not None:
+        try:
+            timings = RunReport.load(config.shard_timings).files
+        except (OSError, ValueError, KeyError) as e:
+            rich.print(f"[red]✗ Failed to load shard timings: {e}[/red]")
+            raise SystemExit(1) from e
+    files = shard.files(files, root, timings)
+    rich.print(f"[bold]Shard {shard}[/bold] ({len(files)} files)")
+    return ParseStage(
+        files, config, rules, lambda s: shard.includes(s, root), vocabulary
+    )
+
+
+class _CheckRun:
+    """State of a check run, from its first checks to its summary
+
+    Segments are checked as they are parsed. Those whose LLM checks were
+    deferred by the time budget, or gated with `llm_gate = "defer"`, are
+    queued and checked once every segment was seen, riskiest first.
+
+    Once `max_errors` segments have bad results, parsing stops, the checks
+    not started yet are skipped and the LLM requests not sent yet are
+    cancelled. The checks in flight finish, so their results are still cached.
+    """
+
+    def __init__(
+        self, config: DolceConfig, llm: LLMRouter | None, handler: CacheHandler
+    ) -> None:
+        self.config = config
+        self.llm = llm
+        self.handler = handler
+        self.root = handler.project_root
+        self.ctx = CheckContext(
+            config=config, budget=TokenBudget(config.max_tokens_per_run)
+        )
+        self.plan = RulePlan(
+            config.rule_set, llm.profile_for if llm is not None else None
+        )
+        if llm is not None:
+            self.ctx.vocabulary = prefilter_vocabulary(config, self.plan, handler)
+        self.parallel = config.parallel_requests if llm is not None else 1
+        self.sample = _sample_rotation(config, llm, handler)
+        self.deadline = _deadline(self.ctx, llm)
+        self.stage: ParseStage | None = None
+        self._stopped = threading.Event()
+        self.run_report = RunReport(shard=config.shard)
+        self.bad: set[str] = set()  # Code paths of the segments with bad results
+        self.unknown: set[str] = set()
+        self.sampled: list[CodeSegment] = []  # Segments whose LLM coverage is reported
+        self.queued: list[tuple[CodeSegment, bool]] = []  # And if it had cached results
+        self.gated: list[CodeSegment] = []
+
+    def _record(
+        self, segment: CodeSegment, report: dict[Rule, list[CheckResult]]
+    ) -> None:
+        """Add the results of a segment to the run report and print them"""
+        self.run_report.add_results(segment_key(segment, self.root), report)
+        statuses = print_segment_report(segment.code_path, report)
+        if statuses[CheckStatus.BAD]:
+            self.bad.add(segment.code_path)
+            self._stop_at_max_errors()
+        if statuses[CheckStatus.UNKNOWN]:
+            self.unknown.add(segment.code_path)
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped.is_set()
+
+    def _stop_at_max_errors(self) -> None:
+        max_errors = self.config.max_errors
+        if max_errors is None or self.stopped or len(self.bad) < max_errors:
+            return
+        self._stopped.set()
+        if self.stage is not None:
+            self.stage.close()
+        if self.llm is not None:
+            self.llm.cancel()
+
+    @property
+    def finished(self) -> bool:
+        """Whether every LLM rule of the run was checked"""
+        counters = self.ctx.stats.counters
+        return not self.stopped and not any(
+            counters[counter] for counter in _UNFINISHED_COUNTERS
+        )
+
+    def _check_with_cache(
+        self, segment: CodeSegment, static: dict[Rule, list[CheckResult]]
+    ) -> tuple[dict, dict]:
+        return _check_with_cache(
+            segment,
+            self.plan,
+            self.ctx,
+            self.llm,
+            self.handler,
+            self.config.gate_rules,
+            LLM_DEFERRED_ISSUE if self.deadline is not None else None,
+            self.sample,
+            static,
+        )
+
+    def check_segments(self, path: str) -> None:
+        """Check the segments of a path as they are parsed"""
+        stage = self.stage = segments_to_check(
+            path, self.config, self.root, self.plan.rules, self.ctx.vocabulary
+        )
+        checked: Coalescer[tuple[dict, dict]] = Coalescer()
+
+        def _check_once(segment: CodeSegment) -> tuple[dict, dict] | None:
+            if self.stopped:
+                return None
+            static = stage.static_results(segment)
+            return _coalesced(
+                segment, lambda s: self._check_with_cache(s, static), checked, self.ctx
+            )
+
+        for segment, result in _checked_segments(
+            stage, _timed(_check_once, self.run_report, self.root), self.parallel
+        ):
+            if result is not None:
+                self._add_checked(segment, *result)
+
+    def _add_checked(
+        self,
+        segment: CodeSegment,
+        report: dict[Rule, list[CheckResult]],
+        new_report: dict[Rule, list[CheckResult]],
+    ) -> None:
+        self.ctx.stats.increment("segments_checked")
+        if self.sample is not None and segment.doc.strip():
+            self.sampled.append(segment)
+        if _has_issue(report, LLM_DEFERRED_ISSUE):
+            self.queued.append((segment, len(report) > len(new_report)))
+        elif self.config.llm_gate == "defer" and _has_issue(report, LLM_GATED_ISSUE):
+            self.gated.append(segment)
+        self._record(
+            segment,
+            _settle_report(segment, report, new_report, self.ctx, self.handler),
+        )
+
+    def check_queued(self) -> None:
+        """Check the LLM rules of the queued segments until the deadline, if any
+
+        Segments not started in time are reported as deferred, those not
+        started before the error limit is reached are left out.
+        """
+        if not (self.queued or self.gated) or self.stopped:
+            return
+        # Static failures were already reported, only the LLM rules are left
+        changed = changed_lines(self.config.changed_since) if self.queued else {}
+        self.queued.sort(key=lambda item: -risk_score(item[0], changed, item[1]))
+        queue = [segment for segment, _ in self.queued] + self.gated
+        rich.print(f"\n[bold]Deferred LLM checks ({len(queue)} segments):[/bold]")
+        rechecked: Coalescer[tuple[dict, dict]] = Coalescer()
+
+        def _recheck(segment: CodeSegment) -> tuple[dict, dict] | None:
+            if self.stopped or self._past_deadline():
+                return None
+            return _coalesced(
+                segment,
+                lambda s: _check_with_cache(
+                    s, self.plan, self.ctx, self.llm, self.handler, sample=self.sample
+                ),
+                rechecked,
+            )
+
+        for segment, result in _checked_segments(
+            queue, _timed(_recheck, self.run_report, self.root), self.parallel
+        ):
+            self._add_rechecked(segment, result)
+
+    def _past_deadline(self) -> bool:
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def _add_rechecked(
+        self, segment: CodeSegment, result: tuple[dict, dict] | None
+    ) -> None:
+        if result is None and not self.stopped:
+            self.ctx.stats.increment("segments_deferred")
+            rich.print(f"[yellow][ DEFER ][/yellow] [blue]{segment.code_path}[/blue]")
+        if result is None:
+            return
+        report = _settle_report(segment, *result, self.ctx, self.handler)
+        self._record(
+            segment,
+            {
+                rule: results
+                for rule, results in report.items()
+                if isinstance(rule, LLMRule)
+            },
+        )
+
+    def finish(self) -> None:
+        """Store the state of the run for the next ones and print its summary"""
+        self.handler.sync_cache()
+        if self.ctx.vocabulary is not None:
+            self.ctx.vocabulary.save(self.handler.cache_folder / VOCABULARY_FILE)
+        _print_skipped_summary(self.ctx)
+        if self.stopped:
+            rich.print(
+                f"\n[yellow]! Stopped after {self.config.max_errors} segments with "
+                "errors, the rest of the project was not checked[/yellow]"
+            )
+        if self.sample is not None:
+            if self.finished:
+                self.sample.save(self.handler.cache_folder / SAMPLING_FILE)
+            coverage = _sample_coverage(self.sampled, self.plan, self.handler)
+            _print_sample_summary(self.ctx, self.sample, coverage)
+        print_run_summary(len(self.bad), len(self.unknown))
+
+    def write_outputs(
+        self, show_stats: bool, stats_json: str | None, report_json: str | None
+    ) -> None:
+        if show_stats:
+            self.ctx.stats.print_summary()
+        if stats_json:
+            self.ctx.stats.write_json(stats_json)
+        if report_json:
+            self.run_report.elapsed = self.ctx.stats.elapsed
+            self.run_report.counters.update(self.ctx.stats.counters)
+            self.run_report.cache = self.handler.delta()
+            self.run_report.write_json(report_json)
+
+
+def check(
+    path: str,
+    config: DolceConfig,
+    show_stats: bool = False,
+    stats_json: str | None = None,
+    report_json: str | None = None,
+) -> None:
+    llm = None
+    if config.url and any(isinstance(rule, LLMRule) for rule in config.rule_set):
+        llm = LLMRouter.from_dolce_config(config)
+        if not llm.test_connection():
+            rich.print("[red]✗ LLM connection failed[/red]")
+            return
+        if config.warm_up:
+            llm.warm_up()
+
+    run = _CheckRun(config, llm, config.cache_handler)
+    run.check_segments(path)
+    run.check_queued()
+    run.finish()
+    run.write_outputs(show_stats, stats_json, report_json)
+
+    if run.bad:
         raise SystemExit(1)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections import Counter
+from pathlib import Path
+
+import rich
+
+from pydolce.commands.check import (
+    VOCABULARY_FILE,
+    prefilter_vocabulary,
+    print_run_summary,
+    print_segment_report,
+    segments_to_check,
+)
+from pydolce.config import DolceConfig
+from pydolce.core.check import LLM_UNAVAILABLE_ISSUE, check_segment
+from pydolce.core.distributed import (
+    IDLE_TIMEOUT,
+    LEASE_TIMEOUT,
+    REMOTE_CHECK_OPTIONS,
+    SECRET_ENV_VAR,
+    Coordinator,
+    WorkQueue,
+    is_loopback,
+)
+from pydolce.core.parser import CodeSegment
+from pydolce.core.results import RunReport, report_from_json
+from pydolce.core.rules.checkers.common import CheckContext, CheckResult, CheckStatus
+from pydolce.core.rules.plan import RulePlan
+from pydolce.core.rules.rule import Rule
+from pydolce.core.sharding import file_key, segment_key
+
+
+def _pending_llm_rules(
+    segment: CodeSegment,
+    plan: RulePlan,
+    report: dict[Rule, list[CheckResult]],
+    ctx: CheckContext,
+) -> list[str]:
+    """References of the LLM rules of a segment left to the workers"""
+    seg_plan = plan.for_type(segment.seg_type)
+    if not seg_plan.llm_groups or not segment.doc.strip():
+        return []
+    gate = ctx.config.gate_rules
+    if any(
+        result.is_bad
+        for rule in seg_plan.static_rules
+        if rule in gate
+        for result in report.get(rule, [])
+    ):
+        ctx.stats.increment("segments_gated")
+        return []
+    return [rule.reference for rule in seg_plan.llm_rules if rule not in report]
+
+
+def _add_work(
+    work: WorkQueue,
+    segment: CodeSegment,
+    key: str,
+    rules: list[str],
+    root: Path,
+    sources: dict[str, str],
+) -> None:
+    """Queue the LLM rules of a segment, with the source of its file"""
+    file = file_key(segment.file_path, root)
+    if file not in sources:
+        sources[file] = segment.file_path.read_text()
+    work.add(file, key, rules, sources[file])
+
+
+def _count_statuses(
+    key: str, statuses: Counter[CheckStatus], bad: set[str], unknown: set[str]
+) -> None:
+    if statuses[CheckStatus.BAD]:
+        bad.add(key)
+    if statuses[CheckStatus.UNKNOWN]:
+        unknown.add(key)
+
+
+def _require_secret(host: str, secret: str | None) -> None:
+    if not secret and not is_loopback(host):
+        rich.print(
+            f"[red]✗ Serving on {host} requires a secret, set {SECRET_ENV_VAR}[/red]"
+        )
+        raise SystemExit(1)
+
+
+def coordinate(
+    path: str,
+    config: DolceConfig,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    lease_timeout: float = LEASE_TIMEOUT,
+    idle_timeout: float | None = IDLE_TIMEOUT,
+    show_stats: bool = False,
+    report_json: str | None = None,
+    secret: str | None = None,
+) -> None:
+    """Check the static rules, then serve the LLM checks to remote workers
+
+    The results of the workers are added to the cache and to the report of
+    the run as they arrive. Gated segments are skipped, whatever `llm_gate`.
+    Workers get the vocabulary of the project for the DCE501 prefilter and
+    the check options of `config` (`REMOTE_CHECK_OPTIONS`). Workers must send
+    the `secret`, which is required to serve on other hosts than the loopback
+    one. If no worker is heard from for `idle_timeout` seconds, the checks
+    left are reported as UNKNOWN and the run fails.
+    """
+    _require_secret(host, secret)
+    ctx = CheckContext(config=config)
+    handler = config.cache_handler
+    root = handler.project_root
+    plan = RulePlan(config.rule_set)
+    run_report = RunReport(shard=config.shard)
+    work = WorkQueue(
+        lease_timeout, retry_issue=LLM_UNAVAILABLE_ISSUE, idle_timeout=idle_timeout
+    )
+    work.options = {option: getattr(config, option) for option in REMOTE_CHECK_OPTIONS}
+    waiting: dict[str, CodeSegment] = {}
+    sources: dict[str, str] = {}
+    bad: set[str] = set()  # Keys of the segments with bad results
+    unknown: set[str] = set()
+
+    vocabulary = prefilter_vocabulary(config, plan, handler)
+    stage = segments_to_check(path, config, root, plan.rules, vocabulary)
+    for segment in stage:
+        ctx.stats.increment("segments_checked")
+        cached = handler.get_report(segment)
+        static = stage.static_results(segment)
+        computed = {rule: res for rule, res in static.items() if rule not in cached}
+        new_report = computed | check_segment(
+            segment, plan, ctx, None, cached | computed
+        )
+        handler.set_report(segment, new_report)
+        report = cached | new_report
+        key = segment_key(segment, root)
+        run_report.add_results(key, report)
+        _count_statuses(
+            key, print_segment_report(segment.code_path, report), bad, unknown
+        )
+
+        rules = _pending_llm_rules(segment, plan, report, ctx)
+        if rules:
+            _add_work(work, segment, key, rules, root, sources)
+            waiting[key] = segment
+    handler.sync_cache()
+    if vocabulary is not None:
+        vocabulary.save(handler.cache_folder / VOCABULARY_FILE)
+        work.vocabulary = vocabulary.totals()
+
+    if work.items:
+        with Coordinator(work, host, port, secret) as coordinator:
+            rich.print(
+                f"\n[bold]Serving {len(work.items)} LLM checks at "
+                f"{coordinator.url}[/bold], waiting for workers"
+            )
+            for item, results in work.results():
+                ctx.stats.increment("remote_llm_checks")
+                segment = waiting[item.segment]
+                report = report_from_json(results)
+                handler.set_report(segment, report)
+                run_report.add_results(item.segment, report)
+                statuses = print_segment_report(segment.code_path, report)
+                _count_statuses(item.segment, statuses, bad, unknown)
+        handler.sync_cache()
+        if work.timed_out:
+            rich.print(
+                f"[red]✗ No worker for {idle_timeout}s, "
+                "the LLM checks left were given up on[/red]"
+            )
+
+    print_run_summary(len(bad), len(unknown))
+    if show_stats:
+        ctx.stats.print_summary()
+    if report_json:
+        run_report.elapsed = ctx.stats.elapsed
+        run_report.counters.update(ctx.stats.counters)
+        run_report.cache = handler.delta()
+        run_report.write_json(report_json)
+
+    if bad or work.timed_out:
+        raise SystemExit(1)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import rich
+
+from pydolce.commands.check import print_run_summary, print_segment_report
+from pydolce.config import DolceConfig
+from pydolce.core.results import RunReport
+from pydolce.core.rules.checkers.common import CheckStatus
+
+
+def merge_results(
+    reports: list[str],
+    config: DolceConfig,
+    output: str | None = None,
+    update_cache: bool = True,
+) -> None:
+    """Merge the JSON reports of the shards of a run, and their cache entries"""
+    loaded = [RunReport.load(report) for report in reports]
+    merged = RunReport.merge(loaded)
+    shards = sorted({report.shard or "-" for report in loaded})
+    rich.print(
+        f"[bold]Merged {len(loaded)} reports[/bold] (shards {', '.join(shards)}): "
+        f"{len(merged.segments)} segments, {len(merged.files)} files"
+    )
+
+    for segment in sorted(merged.segments):
+        report = merged.results(segment)
+        if any(not r.is_good for results in report.values() for r in results):
+            print_segment_report(segment, report)
+
+    if update_cache:
+        config.cache_handler.merge(merged.cache, sync=True)
+    if output:
+        merged.write_json(output)
+
+    bad = merged.count(CheckStatus.BAD)
+    print_run_summary(bad, merged.count(CheckStatus.UNKNOWN))
+    if bad:
+        raise SystemExit(1)
@@ -7,6 +7,7 @@ import rich.syntax
 
 from pydolce.config import DolceConfig
 from pydolce.core.client import LLMClient, LLMError
+from pydolce.core.errors import LLMResponseError
 from pydolce.core.parser import CodeSegment, ModuleHeaders, code_segments_from_path
 from pydolce.core.suggest import suggest_from_segment
 
@@ -28,7 +29,7 @@ def _process_segment(
 
     try:
         suggestion = suggest_from_segment(segment, config, llm, module_headers)
-    except LLMError as e:
+    except (LLMError, LLMResponseError) as e:
         rich.print(f"[red]✗ Could not get suggestion: {e}[/red]")
         return None
 
@@ -93,6 +94,8 @@ def suggest(path: Path | str, config: DolceConfig) -> None:
         if not llm.test_connection():
             rich.print("[red]✗ Connection failed[/red]")
             return
+        if config.warm_up:
+            llm.warm_up()
 
     assert llm is not None
 
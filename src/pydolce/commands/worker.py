@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import requests
+import rich
+
+from pydolce.config import DolceConfig
+from pydolce.core.check import check_segment
+from pydolce.core.distributed import REMOTE_CHECK_OPTIONS, RETRY_AFTER, SECRET_HEADER
+from pydolce.core.parser import CodeSegment, code_segments_from_source
+from pydolce.core.results import JsonResults, report_to_json
+from pydolce.core.router import LLMRouter
+from pydolce.core.rules.checkers.common import CheckContext
+from pydolce.core.rules.plan import RulePlan
+from pydolce.core.rules.rulesets import RULE_BY_REF
+from pydolce.core.sharding import segment_key
+from pydolce.core.similarity import Vocabulary
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_NOT_FOUND_ISSUE = "Segment not found in the source sent by the coordinator"
+
+
+def _post(
+    session: requests.Session, url: str, body: dict[str, Any], timeout: float
+) -> dict[str, Any]:
+    response = session.post(url, json=body, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def _check_batch(
+    lease: dict[str, Any],
+    ctx: CheckContext,
+    llm: LLMRouter,
+    plans: dict[tuple[str, ...], RulePlan],
+    parallel: int,
+) -> dict[int, JsonResults]:
+    """Check the LLM rules of the items of a lease"""
+    segments: dict[str, CodeSegment] = {}
+    for file, source in lease["files"].items():
+        for segment in code_segments_from_source(source, Path(file)):
+            segments[segment_key(segment, Path.cwd())] = segment
+
+    def _check(item: dict[str, Any]) -> JsonResults:
+        rules = tuple(item["rules"])
+        if rules not in plans:
+            plans[rules] = RulePlan((RULE_BY_REF[r] for r in rules), llm.profile_for)
+        segment = segments.get(item["segment"])
+        if segment is None:
+            return {
+                r: [{"status": "unknown", "issue": SEGMENT_NOT_FOUND_ISSUE}]
+                for r in rules
+            }
+        report = check_segment(segment, plans[rules], ctx, llm)
+        return report_to_json(report)
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        results = executor.map(_check, lease["items"])
+        return {
+            item["id"]: result
+            for item, result in zip(lease["items"], results, strict=True)
+        }
+
+
+def _lease_context(config: DolceConfig, lease: dict[str, Any]) -> CheckContext:
+    """Context of the checks with the options of the coordinator"""
+    options = lease.get("options", {})
+    ctx = CheckContext(
+        config=dataclasses.replace(
+            config, **{k: options[k] for k in REMOTE_CHECK_OPTIONS if k in options}
+        )
+    )
+    if lease.get("vocabulary") is not None:
+        ctx.vocabulary = Vocabulary({"coordinator": lease["vocabulary"]})
+    return ctx
+
+
+def worker(
+    url: str,
+    config: DolceConfig,
+    batch_size: int = 8,
+    name: str | None = None,
+    connect_timeout: float = 60.0,
+    secret: str | None = None,
+) -> None:
+    """Check the LLM rules of the segments served by a coordinator
+
+    Batches are leased until the coordinator has no work left (or is gone,
+    once some work was done). The coordinator is waited for up to
+    `connect_timeout` seconds, so workers can be started first. The `secret`
+    of the coordinator, if any, is sent with every request. The check options
+    of the coordinator override those of `config`.
+    """
+    llm = LLMRouter.from_dolce_config(config)
+    if not llm.test_connection():
+        rich.print("[red]✗ LLM connection failed[/red]")
+        raise SystemExit(1)
+
+    url = url.rstrip("/")
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    ctx = CheckContext(config=config)
+    plans: dict[tuple[str, ...], RulePlan] = {}
+    session = requests.Session()
+    session.headers.update({SECRET_HEADER: secret} if secret else {})
+    started = time.monotonic()
+    connected = False
+    checked = 0
+
+    while True:
+        try:
+            lease = _post(
+                session,
+                f"{url}/lease",
+                {"worker": name, "max": batch_size, "vocabulary": not connected},
+                config.timeout,
+            )
+        except requests.RequestException as e:
+            if connected:
+                logger.debug("Coordinator gone: %s", e)
+                break
+            if time.monotonic() - started > connect_timeout:
+                rich.print(f"[red]✗ Coordinator unreachable: {e}[/red]")
+                raise SystemExit(1) from e
+            time.sleep(RETRY_AFTER)
+            continue
+
+        if not connected:
+            ctx = _lease_context(config, lease)
+        connected = True
+        if lease["done"]:
+            break
+        if not lease["items"]:
+            time.sleep(lease["retry_after"])
+            continue
+
+        results = _check_batch(lease, ctx, llm, plans, config.parallel_requests)
+        checked += len(results)
+        rich.print(f"[blue]{name}[/blue] checked {len(results)} segments")
+        try:
+            _post(
+                session,
+                f"{url}/results",
+                {"worker": name, "results": results},
+                config.timeout,
+            )
+        except requests.RequestException as e:
+            logger.debug("Coordinator gone: %s", e)
+            break
+
+    rich.print(f"[green]✓ {name} checked {checked} segments[/green]")
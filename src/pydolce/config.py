@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import dataclasses
 import os
 from dataclasses import dataclass
 from functools import cached_property
@@ -8,15 +9,19 @@ from typing import Any
 
 import toml
 
-from pydolce.core.cache import CacheHandler
+from pydolce.core.cache import CacheHandler, ResponseCache
+from pydolce.core.endpoints import Endpoint, parse_endpoints
 from pydolce.core.parser import CodeSegmentType
 from pydolce.core.rules import filters
+from pydolce.core.rules.rule import Rule, RuleGroup, StaticRule
 from pydolce.core.rules.rulesets import (
     ALL_RULES,
     DEFAULT_RULES,
+    RULE_BY_REF,
     RULE_REFERENCES,
-    RuleSet,
 )
+from pydolce.core.sharding import Shard
+from pydolce.core.spelling import spelling_fingerprint
 
 DEFAULT_EXCLUDES = [
     "__init__.py",
@@ -33,6 +38,26 @@ DEFAULT_EXCLUDES = [
 
 DEFAULT_SCOPES = ["function", "class", "method", "property"]
 
+# LLM options that a model profile can override
+PROFILE_OPTIONS = {
+    "provider",
+    "url",
+    "model",
+    "api_key",
+    "temperature",
+    "max_tokens",
+    "timeout",
+    "max_retries",
+    "retry_delay",
+    "prompt_caching",
+    "keep_alive",
+    "structured_output",
+}
+DEFAULT_PROFILE = "default"
+
+LLM_GATE_POLICIES = ("off", "skip", "defer")
+DEFAULT_LLM_GATE_RULES = ["DCE101", "DCE201", "DCE301"]
+
 
 @dataclass
 class DolceConfig:
@@ -49,30 +74,96 @@ class DolceConfig:
     ignore_private_functions: bool = True
     scopes: list[str] | None = None
 
+    # Spelling options
+    spelling_dictionaries: list[str] | None = None  # Files with one word per line
+    spelling_words: list[str] | None = None  # Extra words that are not typos
+
     # Docstring style options
     ensure_style: str | None = None  # e.g., "google", "numpy", "sphinx"
 
     # LLM options
     provider: str = ""  # "ollama"
-    url: str = ""  # "http://localhost:11434"
+    url: str | list[str | dict[str, Any]] = ""  # "http://localhost:11434"
     model: str = ""  # "qwen3:8b"
     api_key: str | None = None
     temperature: float = 0.0
     max_tokens: int | None = 2000
+    compact_code: bool = True  # Elide literals and nested bodies sent to the LLM
+    max_prompt_tokens: int | None = 8000  # Per request, longer code is elided
+    max_tokens_per_run: int | None = None  # No more LLM calls once it is spent
+    llm_gate: str = "off"  # "skip" or "defer" LLM rules when gate rules fail
+    llm_gate_rules: list[str] | None = None  # Static rules gating the LLM ones
+    time_budget: float | None = None  # Seconds, then pending LLM checks are deferred
+    max_errors: int | None = None  # Segments with errors before the run stops
+    changed_since: str = "HEAD"  # Git revision, code changed since is checked first
+    shard: str | None = None  # "i/N", checks the i-th of N parts of the project
+    shard_by: str = "file"  # Split the files, or the segments of every file
+    shard_timings: str | None = None  # JSON report whose file timings balance shards
+    sample: float | None = None  # Share of the segments LLM-checked on each run
+    sample_seed: int = 0  # Changing it starts a new rotation of the samples
+    sample_max_age_days: float = 30.0  # Older LLM verdicts are checked again
+    behavior_prefilter: float | None = None  # Docstring/code agreement skipping DCE501
+    behavior_prefilter_audit: float = 0.05  # Share of skipped DCE501 checks still sent
     timeout: int = 120
     max_retries: int = 3
     retry_delay: float = 1.0
+    prompt_caching: bool = True  # Reuse the shared system prompt on the provider
+    keep_alive: str | None = "30m"  # Ollama only, keeps the model (and KV cache) loaded
+    structured_output: bool = False  # Constrain LLM responses to a JSON schema
+    llm_cache: bool = True  # Memoize LLM responses (only when temperature is 0)
+    llm_cache_max_entries: int = 10000
+    llm_cache_max_age_days: float = 30.0
+    preflight_ttl: float = 60.0  # Seconds a successful connection check is trusted
+    warm_up: bool = True  # Load the model in the background while parsing
+
+    # Model routing options
+    profiles: dict[str, dict[str, Any]] | None = None  # LLM options per profile
+    routing: dict[str, str] | None = None  # Rule reference or group -> profile
+    escalate_to: str | None = None  # Profile re-checking BAD/UNKNOWN verdicts
+
+    # Parallelism and load balancing options
+    parse_processes: int | None = None  # Processes parsing large projects, one per CPU
+    concurrency: int | None = None  # Parallel LLM requests, one per endpoint if unset
+    max_endpoint_failures: int = 3  # Consecutive failures before ejecting an endpoint
+    endpoint_eject_time: float = 30.0  # Seconds before probing an ejected endpoint
+    circuit_breaker_threshold: int = 5  # Consecutive LLM failures before giving up
+    circuit_breaker_reset: float = 30.0  # Seconds before probing the LLM again
 
     @cached_property
-    def rule_set(self) -> RuleSet:
+    def rule_set(self) -> frozenset[Rule]:
         if self.target is None and self.disable is None:
-            return DEFAULT_RULES
+            return frozenset(DEFAULT_RULES)
 
         rules = filters.only(self.target, ALL_RULES) if self.target else DEFAULT_RULES
         if self.disable:
             rules = filters.exclude(self.disable, rules)
 
-        return rules
+        # Filters are one-shot iterators, the cached rule set is iterated often
+        return frozenset(rules)
+
+    @cached_property
+    def gate_rules(self) -> frozenset[Rule]:
+        """Static rules whose failure gates the LLM rules of a segment."""
+        if self.llm_gate == "off":
+            return frozenset()
+        refs = self.llm_gate_rules or DEFAULT_LLM_GATE_RULES
+        return frozenset(RULE_BY_REF[ref] for ref in refs)
+
+    @property
+    def endpoints(self) -> list[Endpoint]:
+        """The LLM endpoints parsed from the url option."""
+        return parse_endpoints(self.url) if self.url else []
+
+    @property
+    def parallel_requests(self) -> int:
+        """Number of segments checked concurrently."""
+        return self.concurrency or max(len(self.endpoints), 1)
+
+    def profile_config(self, name: str) -> DolceConfig:
+        """The configuration of a model profile, the default one is this config."""
+        if name == DEFAULT_PROFILE:
+            return self
+        return dataclasses.replace(self, **(self.profiles or {})[name])
 
     @cached_property
     def segment_types(self) -> set[CodeSegmentType]:
@@ -84,7 +175,26 @@ class DolceConfig:
     @cached_property
     def cache_handler(self) -> CacheHandler:
         """Lazily initializes and returns the CacheHandler based on the current rule set."""
-        return CacheHandler()
+        return CacheHandler(self.rule_versions)
+
+    @property
+    def rule_versions(self) -> dict[str, str]:
+        """Versions of what rules check besides the code, e.g. the spelling words."""
+        spelling = [r for r in self.rule_set if r.group == RuleGroup.CONTENT]
+        if not spelling:
+            return {}
+        version = spelling_fingerprint(
+            tuple(self.spelling_dictionaries or ()), tuple(self.spelling_words or ())
+        )
+        return {rule.reference: version for rule in spelling}
+
+    @cached_property
+    def response_cache(self) -> ResponseCache:
+        """Lazily initializes and returns the on-disk LLM ResponseCache."""
+        return ResponseCache(
+            max_entries=self.llm_cache_max_entries,
+            max_age=self.llm_cache_max_age_days * 24 * 3600,
+        )
 
     def validate(self) -> None:
         """Validates the configuration to ensure all required fields are set correctly."""
@@ -124,6 +234,18 @@ class DolceConfig:
         if self.url and (not self.model or not self.provider):
             raise ValueError("Both model and provider must be set if url is provided.")
 
+        self._validate_llm_options()
+        self._validate_endpoints()
+        self._validate_routing()
+        self._validate_gate()
+        self._validate_budgets()
+        self._validate_prefilter()
+        self._validate_sampling()
+
+    def _validate_llm_options(self) -> None:
+        if self.llm_cache_max_entries < 1:
+            raise ValueError("LLM cache max entries must be a positive integer.")
+
         if self.temperature < 0.0 or self.temperature > 1.0:
             raise ValueError("Temperature must be between 0.0 and 1.0.")
 
@@ -136,6 +258,90 @@ class DolceConfig:
         if self.retry_delay < 0.0:
             raise ValueError("Retry delay must be a non-negative float.")
 
+    def _validate_endpoints(self) -> None:
+        if self.url:
+            self.endpoints  # noqa: B018 (raises on invalid endpoints)
+
+        if self.concurrency is not None and self.concurrency < 1:
+            raise ValueError("Concurrency must be a positive integer.")
+
+        if self.max_endpoint_failures < 1:
+            raise ValueError("Max endpoint failures must be a positive integer.")
+
+        if self.endpoint_eject_time < 0.0:
+            raise ValueError("Endpoint eject time must be a non-negative float.")
+
+        if self.parse_processes is not None and self.parse_processes < 1:
+            raise ValueError("Parse processes must be a positive integer.")
+
+        if self.circuit_breaker_threshold < 1:
+            raise ValueError("Circuit breaker threshold must be a positive integer.")
+
+    def _validate_gate(self) -> None:
+        if self.llm_gate not in LLM_GATE_POLICIES:
+            raise ValueError(
+                f"Invalid LLM gate policy: {self.llm_gate}. "
+                f"Supported policies are {', '.join(LLM_GATE_POLICIES)}."
+            )
+
+        if invalid_refs := [
+            ref
+            for ref in (self.llm_gate_rules or [])
+            if not isinstance(RULE_BY_REF.get(ref), StaticRule)
+        ]:
+            raise ValueError(f"LLM gate rules must be static rules: {invalid_refs}")
+
+    def _validate_budgets(self) -> None:
+        if self.max_prompt_tokens is not None and self.max_prompt_tokens < 1:
+            raise ValueError("Max prompt tokens must be a positive integer.")
+
+        if self.max_tokens_per_run is not None and self.max_tokens_per_run < 1:
+            raise ValueError("Max tokens per run must be a positive integer.")
+
+        if self.time_budget is not None and self.time_budget <= 0.0:
+            raise ValueError("Time budget must be a positive number of seconds.")
+
+        if self.max_errors is not None and self.max_errors < 1:
+            raise ValueError("Max errors must be a positive integer.")
+
+    def _validate_prefilter(self) -> None:
+        if self.behavior_prefilter is not None and not (
+            0.0 <= self.behavior_prefilter <= 1.0
+        ):
+            raise ValueError("Behavior prefilter must be between 0.0 and 1.0.")
+
+        if not 0.0 <= self.behavior_prefilter_audit <= 1.0:
+            raise ValueError("Behavior prefilter audit must be between 0.0 and 1.0.")
+
+    def _validate_sampling(self) -> None:
+        if self.shard is not None:
+            Shard.parse(self.shard, self.shard_by)
+
+        if self.sample is not None and not 0.0 < self.sample <= 1.0:
+            raise ValueError("Sample must be greater than 0.0 and at most 1.0.")
+
+        if self.sample_max_age_days <= 0.0:
+            raise ValueError("Sample max age must be a positive number of days.")
+
+    def _validate_routing(self) -> None:
+        profiles = {DEFAULT_PROFILE, *(self.profiles or {})}
+        for name, options in (self.profiles or {}).items():
+            if invalid := set(options) - PROFILE_OPTIONS:
+                raise ValueError(f"Invalid options in profile '{name}': {invalid}")
+
+        groups = {group.name.lower() for group in RuleGroup}
+        for key, profile in (self.routing or {}).items():
+            if key not in RULE_REFERENCES and key.lower() not in groups:
+                raise ValueError(
+                    f"Invalid routing key: {key}. Use a rule reference or one of "
+                    f"the rule groups {sorted(groups)}."
+                )
+            if profile not in profiles:
+                raise ValueError(f"Unknown profile in routing: {profile}")
+
+        if self.escalate_to is not None and self.escalate_to not in profiles:
+            raise ValueError(f"Unknown escalation profile: {self.escalate_to}")
+
     @staticmethod
     def from_pyproject() -> DolceConfig:
         """
@@ -162,6 +368,16 @@ class DolceConfig:
             None if api_key_env_var is None else os.environ.get(api_key_env_var, None)
         )
 
+        profiles = {
+            name: {k.replace("-", "_"): v for k, v in options.items()}
+            for name, options in config.get("profiles", {}).items()
+        }
+        for options in profiles.values():
+            if options.get("api_key") is not None:
+                options["api_key"] = os.environ.get(options["api_key"], None)
+        if profiles:
+            config["profiles"] = profiles
+
         config = DolceConfig(**config)
         config.validate()
         return config
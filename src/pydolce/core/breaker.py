@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+import time
+from enum import Enum
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops calling a service after consecutive failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are rejected right away. Once `reset_timeout` seconds pass, a single probe
+    call is allowed (half-open): if it succeeds the circuit closes again,
+    otherwise it stays open for another `reset_timeout` seconds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == CircuitState.OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go through, reserving the probe when half-open."""
+        with self._lock:
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = CircuitState.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state == CircuitState.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
@@ -3,16 +3,24 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import sqlite3
+import threading
+import time
 from pathlib import Path
+from typing import Any
 
 from pydolce.core.parser import CodeSegment
 from pydolce.core.rules.checkers.common import CheckResult, CheckStatus
-from pydolce.core.rules.rule import Rule
+from pydolce.core.rules.rule import LLMRule, Rule
 from pydolce.core.rules.rulesets import RULE_BY_REF
 
 logger = logging.getLogger(__name__)
 
 
+EVICTION_INTERVAL = 100  # Writes between response cache evictions
+
+VERDICT_TIMES_KEY = "_checked_at"  # When the LLM verdicts of an entry were cached
+
 PROJECT_ROOT_INDICATORS = [
     "pyproject.toml",
     "setup.cfg",
@@ -22,13 +30,62 @@ PROJECT_ROOT_INDICATORS = [
 ]
 
 
+def get_project_root() -> Path:
+    current_path = Path.cwd()
+    while current_path != current_path.parent:
+        if any(
+            (current_path / indicator).exists() for indicator in PROJECT_ROOT_INDICATORS
+        ):
+            return current_path
+        current_path = current_path.parent
+    raise RuntimeError(
+        "Could not determine project root. Please ensure you are running within a valid Python project."
+    )
+
+
+def segment_fingerprint(segment: CodeSegment) -> str:
+    """Key of the check results of a segment, the same for identical code
+
+    The module imports the code refers to are part of the key, since the
+    same call may have side effects under some imports and not others.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(segment.code_str.encode("utf-8"))
+    hasher.update(segment.seg_type.name.encode("utf-8"))
+    for name, target in segment.used_imports.items():
+        hasher.update(f"\n{name}={target}".encode())
+    return hasher.hexdigest()
+
+
+def merge_cache_entry(current: dict, entry: dict) -> None:
+    """Update a check cache entry with the results (and their times) of another"""
+    times = {**current.get(VERDICT_TIMES_KEY, {}), **entry.get(VERDICT_TIMES_KEY, {})}
+    current.update(entry)
+    if times:
+        current[VERDICT_TIMES_KEY] = times
+
+
+def _rule_ref(stored_ref: str) -> str:
+    return stored_ref.partition("@")[0]
+
+
 class CacheHandler:
-    def __init__(self) -> None:
-        self.project_root = self._get_project_root()
+    """Check results cached per segment fingerprint and rule
+
+    The results of rules depending on more than the code (e.g. the word list
+    of the spell checker) are stored under the `rule_versions` of that input,
+    so results of another version are not reused.
+    """
+
+    def __init__(self, rule_versions: dict[str, str] | None = None) -> None:
+        self.rule_versions = rule_versions or {}
+        self.project_root = get_project_root()
         self.cache_folder = self.project_root / ".pydolce" / "cache"
         self.cache_folder.mkdir(parents=True, exist_ok=True)
         self.cache_file = self.cache_folder / "check_cache.json"
         self.cache_data: dict = {}
+        self.updated_keys: set[str] = set()  # Entries written since loading
+        self._synced_at = time.monotonic()
 
         self.load_cache()
 
@@ -43,31 +100,23 @@ class CacheHandler:
         else:
             self.cache_data = {}
 
-    def sync_cache(self) -> None:
+    def sync_cache(self, min_interval: float = 0.0) -> None:
+        """Write the cache file, unless it was written less than `min_interval` ago"""
+        if time.monotonic() - self._synced_at < min_interval:
+            return
+        self._synced_at = time.monotonic()
         try:
             with self.cache_file.open("w", encoding="utf-8") as f:
                 json.dump(self.cache_data, f, indent=4)
         except Exception as e:
             logger.warning("Failed to write cache file: %s", e)
 
-    def _get_project_root(self) -> Path:
-        current_path = Path.cwd()
-        while current_path != current_path.parent:
-            if any(
-                (current_path / indicator).exists()
-                for indicator in PROJECT_ROOT_INDICATORS
-            ):
-                return current_path
-            current_path = current_path.parent
-        raise RuntimeError(
-            "Could not determine project root. Please ensure you are running within a valid Python project."
-        )
-
     def _get_key(self, segment: CodeSegment) -> str:
-        hasher = hashlib.sha256()
-        hasher.update(segment.code_str.encode("utf-8"))
-        hasher.update(segment.seg_type.name.encode("utf-8"))
-        return hasher.hexdigest()
+        return segment_fingerprint(segment)
+
+    def _stored_ref(self, rule: Rule) -> str:
+        version = self.rule_versions.get(rule.reference)
+        return rule.reference if version is None else f"{rule.reference}@{version}"
 
     def get_report(self, segment: CodeSegment) -> dict[Rule, list[CheckResult]]:
         key = self._get_key(segment)
@@ -77,15 +126,25 @@ class CacheHandler:
         if not cache:
             return {}
 
-        return {
-            RULE_BY_REF[rule_ref]: [
-                CheckResult(
-                    status=CheckStatus.from_str(status),
-                    issue=issue,
-                )
+        report: dict[Rule, list[CheckResult]] = {}
+        for stored_ref, entries in cache.items():
+            if stored_ref == VERDICT_TIMES_KEY:
+                continue
+            rule = RULE_BY_REF[_rule_ref(stored_ref)]
+            if stored_ref != self._stored_ref(rule):
+                continue  # Checked with another version of its input
+            report[rule] = [
+                CheckResult(status=CheckStatus.from_str(status), issue=issue)
                 for status, issue in [entry.split("::") for entry in entries]
             ]
-            for rule_ref, entries in cache.items()
+        return report
+
+    def verdict_times(self, segment: CodeSegment) -> dict[Rule, float]:
+        """When the cached LLM verdicts of a segment were checked"""
+        times = self.cache_data.get(self._get_key(segment), {})
+        return {
+            RULE_BY_REF[rule_ref]: checked_at
+            for rule_ref, checked_at in times.get(VERDICT_TIMES_KEY, {}).items()
         }
 
     def set_report(
@@ -101,11 +160,165 @@ class CacheHandler:
         if key not in self.cache_data:
             self.cache_data[key] = {}
 
+        self.updated_keys.add(key)
+        entry = self.cache_data[key]
+        now = time.time()
         for rule, results in report.items():
-            results_str = [
+            # Unknown verdicts are not cached so they are retried on next runs
+            if any(result.is_unknown for result in results):
+                continue
+            stored_ref = self._stored_ref(rule)
+            for stale in [
+                ref
+                for ref in entry
+                if ref != stored_ref and _rule_ref(ref) == rule.reference
+            ]:
+                del entry[stale]
+            entry[stored_ref] = [
                 f"{result.status.value}::{result.issue}" for result in results
             ]
-            self.cache_data[key][rule.reference] = results_str
+            if isinstance(rule, LLMRule):
+                times = self.cache_data[key].setdefault(VERDICT_TIMES_KEY, {})
+                times[rule.reference] = now
+
+        if sync:
+            self.sync_cache()
+
+    def delta(self) -> dict[str, dict]:
+        """The entries written since the cache was loaded"""
+        return {key: self.cache_data[key] for key in sorted(self.updated_keys)}
 
+    def merge(self, entries: dict[str, dict], sync: bool = False) -> None:
+        """Add the entries of another cache, e.g. the delta of a shard"""
+        for key, entry in entries.items():
+            merge_cache_entry(self.cache_data.setdefault(key, {}), entry)
+            self.updated_keys.add(key)
         if sync:
             self.sync_cache()
+
+
+class ResponseCache:
+    """On-disk memoization of LLM responses.
+
+    Entries are keyed by a hash of everything that determines a response
+    (provider, model, prompts and sampling options). Entries older than
+    `max_age` seconds are dropped, and the least recently used ones are
+    evicted once there are more than `max_entries`.
+    """
+
+    def __init__(
+        self,
+        cache_file: Path | None = None,
+        max_entries: int = 10000,
+        max_age: float | None = None,
+    ) -> None:
+        if cache_file is None:
+            cache_folder = get_project_root() / ".pydolce" / "cache"
+            cache_folder.mkdir(parents=True, exist_ok=True)
+            cache_file = cache_folder / "llm_responses.sqlite"
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(cache_file, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.evict()
+
+    @staticmethod
+    def key(**fields: Any) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps(fields, sort_keys=True, default=str).encode("utf-8"))
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created = row
+            if self.max_age is not None and now - created > self.max_age:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return response
+
+    def set(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+        if self._writes % EVICTION_INTERVAL == 0:
+            self.evict()
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def evict(self) -> None:
+        """Drop expired entries and the least recently used ones over the limit."""
+        with self._lock:
+            if self.max_age is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created < ?",
+                    (time.time() - self.max_age,),
+                )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key NOT IN ("
+                "SELECT key FROM responses ORDER BY accessed DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class PreflightCache:
+    """Remembers recently successful LLM preflight checks across runs."""
+
+    def __init__(self, ttl: float, cache_file: Path | None = None) -> None:
+        if cache_file is None:
+            cache_folder = get_project_root() / ".pydolce" / "cache"
+            cache_folder.mkdir(parents=True, exist_ok=True)
+            cache_file = cache_folder / "preflight.json"
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+    def _load(self) -> dict[str, float]:
+        try:
+            with self.cache_file.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def is_fresh(self, key: str) -> bool:
+        checked_at = self._load().get(key)
+        return checked_at is not None and time.time() - checked_at < self.ttl
+
+    def mark_ok(self, key: str) -> None:
+        now = time.time()
+        data = {k: t for k, t in self._load().items() if now - t < self.ttl}
+        data[key] = now
+        try:
+            with self.cache_file.open("w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except OSError as e:
+            logger.warning("Failed to write preflight cache: %s", e)
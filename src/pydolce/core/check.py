@@ -1,25 +1,51 @@
 from __future__ import annotations
 
-import json
 import logging
 import re
+from typing import Container, Iterable, Mapping
 
-from pydolce.core.client import LLMClient
+from pydolce.config import DEFAULT_PROFILE
+from pydolce.core.client import LLMCancelledError, LLMClient, LLMError
+from pydolce.core.compact import compact_code
 from pydolce.core.parser import (
     CodeSegment,
 )
 from pydolce.core.prompts import (
+    CHECK_HINTS_TEMPLATE,
+    CHECK_RESPONSE_SCHEMA,
     CHECK_SYSTEM_PROMPT_TEMPLATE,
     CHECK_USER_PROMPT_TEMPLATE,
 )
+from pydolce.core.router import LLMRouter
 from pydolce.core.rules.checkers.common import CheckContext, CheckResult, CheckStatus
-from pydolce.core.rules.filters import only_llm, only_static
-from pydolce.core.rules.rule import DEFAULT_PREFIX, LLMRule, Rule, StaticRule
+from pydolce.core.rules.plan import (
+    LLMRuleGroup,
+    RulePlan,
+    SegmentPlan,
+    group_llm_rules,
+)
+from pydolce.core.rules.rule import (
+    DEFAULT_PREFIX,
+    InputScope,
+    LLMRule,
+    Rule,
+)
 from pydolce.core.rules.rulesets import RULE_BY_REF, RULE_REFERENCES, RuleSet
-from pydolce.core.utils import extract_json_object
+from pydolce.core.tokens import elide_code, estimate_tokens
+from pydolce.core.utils import load_json_object
 
 logger = logging.getLogger(__name__)
 
+LLM_UNAVAILABLE_ISSUE = "LLM unavailable, only static rules were checked"
+LLM_GATED_ISSUE = "Static rules failed, LLM rules were not checked"
+LLM_DEFERRED_ISSUE = "LLM rules were deferred"
+LLM_UNSAMPLED_ISSUE = "Not in the LLM sample of this run"
+LLM_CANCELLED_ISSUE = "Run stopped, LLM rules were not checked"
+TOKEN_BUDGET_ISSUE = "Token budget of the run exhausted, LLM rules were skipped"  # noqa: S105 (not a password)
+
+# Room left for the code even when the rules alone fill the prompt cap
+MIN_CODE_TOKENS = 256
+
 
 def _report_from_llm_response(
     json_resp: dict, segment: CodeSegment, rules: list[Rule]
@@ -49,6 +75,9 @@ def _report_from_llm_response(
             # Unknown rule reference
             continue
         rule = RULE_BY_REF[ref]
+        if rule not in rules:
+            # Rule that was not asked for in this request
+            continue
         if rule not in report:
             report[rule] = []
 
@@ -76,77 +105,306 @@ def _report_from_llm_response(
     # )
 
 
-def check_llm_rules(
-    segment: CodeSegment, ctx: CheckContext, llm: LLMClient, rules: list[Rule]
-) -> dict[Rule, list[CheckResult]] | None:
-    if any(not isinstance(r, LLMRule) for r in rules):
-        raise ValueError("All llm rules must have prompts")
+def build_check_system_prompt(rule_prompts: dict[Rule, str]) -> str:
+    """Render the check system prompt with rules in a deterministic order.
 
-    filtered_rules = {r: r.validator(segment, ctx) for r in rules}
+    The same set of rules always produces the same bytes, which is what makes
+    the prompt cacheable on the provider side.
+    """
+    rules_list = [
+        f"- {rule.reference}: {rule_prompts[rule]}"
+        for rule in sorted(rule_prompts, key=lambda r: r.code)
+    ]
+    return CHECK_SYSTEM_PROMPT_TEMPLATE.format(rules="\n".join(rules_list))
 
-    for key in list(filtered_rules.keys()):
-        if not filtered_rules[key]:
-            filtered_rules.pop(key)
 
-    if not filtered_rules:
-        return {}
+def _input_scope(rules: Iterable[Rule]) -> InputScope:
+    """The widest input scope of the rules sent in a request"""
+    return max(
+        (rule.input_scope for rule in rules if isinstance(rule, LLMRule)),
+        default=InputScope.CODE,
+    )
 
-    rules_list = [
-        f"- {rule.reference}: {prompt}" for rule, prompt in filtered_rules.items()
-    ]
 
-    sys_prompt = CHECK_SYSTEM_PROMPT_TEMPLATE.format(rules="\n".join(rules_list))
-    user_prompt = CHECK_USER_PROMPT_TEMPLATE.format(code=segment.code_str)
-    response = llm.generate(
-        prompt=user_prompt,
-        system=sys_prompt,
+def _prompt_code(
+    segment: CodeSegment, ctx: CheckContext, scope: InputScope, other_prompts: str
+) -> str:
+    """Segment code to send, compacted and elided to fit the prompt token limit"""
+    code, node = segment.code_str, segment.code_node
+    if ctx.config.compact_code:
+        code, saved_tokens = compact_code(
+            code, node, keep_nested_bodies=scope >= InputScope.EFFECTS
+        )
+        if saved_tokens:
+            node = None  # Elide the compacted code, not the original one
+        ctx.stats.increment("tokens_saved_by_compaction", saved_tokens)
+    if ctx.config.max_prompt_tokens is not None:
+        code_tokens = ctx.config.max_prompt_tokens - estimate_tokens(other_prompts)
+        code, elided = elide_code(code, node, max(code_tokens, MIN_CODE_TOKENS))
+        if elided:
+            ctx.stats.increment("prompts_elided")
+    return code
+
+
+def _check_llm_rule_group(
+    segment: CodeSegment,
+    ctx: CheckContext,
+    llm: LLMClient,
+    rule_prompts: dict[Rule, str],
+    profile: str = DEFAULT_PROFILE,
+    rule_hints: dict[Rule, list[str]] | None = None,
+) -> dict[Rule, list[CheckResult]]:
+    rules = list(rule_prompts)
+    sys_prompt = build_check_system_prompt(rule_prompts)
+    hints = [
+        f"- {rule.reference}: {hint}"
+        for rule in sorted(rules, key=lambda r: r.code)
+        for hint in (rule_hints or {}).get(rule, [])
+    ]
+    hints_prompt = CHECK_HINTS_TEMPLATE.format(hints="\n".join(hints)) if hints else ""
+    code = _prompt_code(
+        segment,
+        ctx,
+        _input_scope(rules),
+        sys_prompt + CHECK_USER_PROMPT_TEMPLATE + hints_prompt,
+    )
+    user_prompt = CHECK_USER_PROMPT_TEMPLATE.format(code=code) + hints_prompt
+
+    prompt_tokens = estimate_tokens(sys_prompt) + estimate_tokens(user_prompt)
+    if not ctx.budget.reserve(prompt_tokens):
+        ctx.stats.increment("prompts_over_budget")
+        return {rule: [CheckResult.unknown(TOKEN_BUDGET_ISSUE)] for rule in rules}
+
+    try:
+        response = llm.complete(
+            prompt=user_prompt,
+            system=sys_prompt,
+            schema=CHECK_RESPONSE_SCHEMA,
+        )
+    except LLMError:
+        ctx.budget.settle(prompt_tokens, 0)
+        raise
+
+    used_tokens = 0
+    if not response.usage.cached:
+        used_tokens = response.usage.total_tokens or (
+            prompt_tokens + estimate_tokens(response.text)
+        )
+    ctx.budget.settle(prompt_tokens, used_tokens)
+    rule_set = ",".join(sorted(rule.reference for rule in rules))
+    ctx.stats.record_llm_call(
+        response.usage,
+        file=str(segment.file_path),
+        segment=segment.code_path,
+        rule_set=rule_set if profile == DEFAULT_PROFILE else f"{profile}:{rule_set}",
     )
 
-    json_resp_str = extract_json_object(response)
+    json_resp = load_json_object(response.text)
+
+    if json_resp is None or "status" not in json_resp:
+        # Unusable responses must not be served again from the response cache
+        llm.discard_cached(
+            prompt=user_prompt, system=sys_prompt, schema=CHECK_RESPONSE_SCHEMA
+        )
 
-    if json_resp_str is None:
+    if json_resp is None:
         return {
             rule: [CheckResult.unknown("No JSON object found in LLM response")]
             for rule in rules
         }
 
-    if "status" not in json_resp_str:
+    if "status" not in json_resp:
         return {
             rule: [CheckResult.unknown("No 'status' field found in LLM response JSON")]
             for rule in rules
         }
 
-    json_resp = json.loads(json_resp_str)
     return _report_from_llm_response(json_resp, segment, rules)
 
 
-def check_segment(
+def _needs_escalation(results: list[CheckResult]) -> bool:
+    return any(
+        result.status != CheckStatus.GOOD and result.issue != TOKEN_BUDGET_ISSUE
+        for result in results
+    )
+
+
+def _record_audit(
+    ctx: CheckContext,
+    rule: Rule,
+    verdict: list[CheckResult],
+    results: list[CheckResult],
+) -> None:
+    """Count the prescreen verdicts that the LLM turned from GOOD into BAD"""
+    if not results or all(result.is_unknown for result in results):
+        return
+    ref = rule.reference.lower()
+    ctx.stats.increment(f"{ref}_audited")
+    if all(result.is_good for result in verdict) and any(
+        result.is_bad for result in results
+    ):
+        ctx.stats.increment(f"{ref}_audit_misses")
+
+
+def check_llm_rules(
+    segment: CodeSegment,
+    ctx: CheckContext,
+    llm: LLMClient | LLMRouter,
+    rules: list[Rule],
+) -> dict[Rule, list[CheckResult]] | None:
+    """Check LLM rules, with one request per model profile."""
+    if any(not isinstance(r, LLMRule) for r in rules):
+        raise ValueError("All llm rules must have prompts")
+
+    router = _as_router(llm)
+    llm_rules = [rule for rule in rules if isinstance(rule, LLMRule)]
+    groups = group_llm_rules(llm_rules, router.profile_for)
+    return _check_llm_groups(segment, ctx, router, groups)
+
+
+def _as_router(llm: LLMClient | LLMRouter) -> LLMRouter:
+    return llm if isinstance(llm, LLMRouter) else LLMRouter({DEFAULT_PROFILE: llm})
+
+
+def _check_llm_groups(
     segment: CodeSegment,
-    rules: RuleSet,
     ctx: CheckContext,
-    llm: LLMClient | None = None,
+    router: LLMRouter,
+    groups: Iterable[LLMRuleGroup],
+    skip: Container[Rule] = (),
 ) -> dict[Rule, list[CheckResult]]:
+    """Check groups of LLM rules, with one request per group.
+
+    Rules resolved by their static prescreen are not sent, unless the verdict
+    is audited. Each request only carries the part of the segment its rules
+    need, plus the prescreen hints. BAD and UNKNOWN verdicts are checked again
+    with the escalation profile of the router, if any.
+    """
     report: dict[Rule, list[CheckResult]] = {}
+    hints: dict[Rule, list[str]] = {}
+    audited: dict[Rule, list[CheckResult]] = {}
+    for group in groups:
+        rule_prompts: dict[Rule, str] = {}
+        for rule in group.rules:
+            if rule in skip:
+                continue
+            prescreen = rule.prescreen(segment, ctx)
+            if prescreen.verdict is not None and prescreen.audit:
+                audited[rule] = prescreen.verdict
+            elif prescreen.verdict is not None:
+                ctx.stats.increment("llm_rules_prescreened")
+                ctx.stats.increment(f"{rule.reference.lower()}_prescreened")
+                report[rule] = prescreen.verdict
+                continue
+            prompt = rule.prompt(segment, ctx)
+            if prompt:
+                rule_prompts[rule] = prompt
+                hints[rule] = prescreen.hints
+        if rule_prompts:
+            report.update(
+                _check_escalated_group(segment, ctx, router, group, rule_prompts, hints)
+            )
+
+    for audited_rule, verdict in audited.items():
+        _record_audit(ctx, audited_rule, verdict, report.get(audited_rule, []))
+    return report
 
-    for rule in only_static(rules):
-        if rule.scopes is not None and segment.seg_type not in rule.scopes:
-            continue
 
-        assert isinstance(rule, StaticRule)
-        results = list(rule.check(segment, ctx))
+def _check_escalated_group(
+    segment: CodeSegment,
+    ctx: CheckContext,
+    router: LLMRouter,
+    group: LLMRuleGroup,
+    rule_prompts: dict[Rule, str],
+    hints: dict[Rule, list[str]],
+) -> dict[Rule, list[CheckResult]]:
+    profile = group.profile
+    report = _check_llm_rule_group(
+        segment, ctx, router.client(profile), rule_prompts, profile, hints
+    )
 
-        if not results:
-            continue
+    escalation = router.escalation_for(profile)
+    escalated = {
+        rule: prompt
+        for rule, prompt in rule_prompts.items()
+        if _needs_escalation(report.get(rule, []))
+    }
+    if escalation is not None and escalated:
+        ctx.stats.increment("escalated_prompts")
+        report.update(
+            _check_llm_rule_group(
+                segment,
+                ctx,
+                router.client(escalation),
+                escalated,
+                escalation,
+                hints,
+            )
+        )
+    return report
 
-        report.update({rule: list(results)})
 
-    if llm is None:
-        return report
+def check_segment(
+    segment: CodeSegment,
+    rules: RuleSet | RulePlan,
+    ctx: CheckContext,
+    llm: LLMClient | LLMRouter | None = None,
+    cached: Mapping[Rule, list[CheckResult]] | None = None,
+    gate: Container[Rule] = (),
+    skip_llm: str | None = None,
+) -> dict[Rule, list[CheckResult]]:
+    """Check the rules of a segment whose results are not already `cached`.
+
+    Runs should compile their rules into a RulePlan once, a plain rule set is
+    compiled on every call. When a static rule in `gate` fails, or when a
+    `skip_llm` issue is given, the LLM rules are not checked and get an
+    unknown result, which is not cached.
+    """
+    cached = cached or {}
+    router = _as_router(llm) if llm is not None else None
+    if not isinstance(rules, RulePlan):
+        rules = RulePlan(rules, router.profile_for if router is not None else None)
+    plan = rules.for_type(segment.seg_type)
 
-    llm_rules = list(only_llm(rules))
+    report: dict[Rule, list[CheckResult]] = {}
+    for rule in plan.static_rules:
+        if rule in cached:
+            continue
+        results = list(rule.check(segment, ctx))
+        if results:
+            report[rule] = results
+
+    if router is None or not plan.llm_groups or not segment.doc.strip():
+        return report
 
-    if llm_rules and segment.doc.strip():
-        llm_report = check_llm_rules(segment, ctx, llm, llm_rules)
-        if llm_report is not None:
-            report.update(llm_report)
+    if any(
+        result.is_bad
+        for rule in plan.static_rules
+        if rule in gate
+        for result in report.get(rule) or cached.get(rule, [])
+    ):
+        return report | _unknown_llm_results(plan, cached, LLM_GATED_ISSUE)
+
+    if skip_llm is not None:
+        return report | _unknown_llm_results(plan, cached, skip_llm)
+
+    try:
+        report.update(_check_llm_groups(segment, ctx, router, plan.llm_groups, cached))
+    except LLMCancelledError:
+        report.update(_unknown_llm_results(plan, cached, LLM_CANCELLED_ISSUE))
+    except LLMError as e:
+        # Degrade to static-only results, unknown ones are not cached so
+        # the LLM rules are checked again on the next run
+        logger.debug("LLM rules skipped for %s: %s", segment.code_path, e)
+        report.update(_unknown_llm_results(plan, cached, LLM_UNAVAILABLE_ISSUE))
     return report
+
+
+def _unknown_llm_results(
+    plan: SegmentPlan, cached: Container[Rule], issue: str
+) -> dict[Rule, list[CheckResult]]:
+    return {
+        rule: [CheckResult.unknown(issue)]
+        for rule in plan.llm_rules
+        if rule not in cached
+    }
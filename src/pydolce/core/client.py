@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import json
 import logging
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, List
 
 import requests
 
 from pydolce.config import DolceConfig
+from pydolce.core.breaker import CircuitBreaker
+from pydolce.core.cache import PreflightCache, ResponseCache
+from pydolce.core.endpoints import Endpoint, EndpointPool, is_endpoint_failure
+from pydolce.core.stats import LLMUsage
 
 logger = logging.getLogger(__name__)
 
@@ -36,13 +42,22 @@ class LLMConfig:
     timeout: int = 120
     max_retries: int = 3
     retry_delay: float = 1.0
+    prompt_caching: bool = True
+    keep_alive: str | None = None
+    structured_output: bool = False
+    endpoints: list[Endpoint] = field(default_factory=list)
+    max_endpoint_failures: int = 3
+    endpoint_eject_time: float = 30.0
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_reset: float = 30.0
 
     @staticmethod
     def from_dolce_config(config: DolceConfig) -> LLMConfig:
         """Create LLMConfig from DolceConfig"""
         provider = ProviderType(config.provider.lower()) if config.provider else None
+        endpoints = config.endpoints
         return LLMConfig(
-            base_url=config.url,
+            base_url=endpoints[0].url if endpoints else "",
             model=config.model,
             api_key=config.api_key,
             provider=provider,
@@ -51,28 +66,102 @@ class LLMConfig:
             timeout=config.timeout,
             max_retries=config.max_retries,
             retry_delay=config.retry_delay,
+            prompt_caching=config.prompt_caching,
+            keep_alive=config.keep_alive,
+            structured_output=config.structured_output,
+            endpoints=endpoints,
+            max_endpoint_failures=config.max_endpoint_failures,
+            endpoint_eject_time=config.endpoint_eject_time,
+            circuit_breaker_threshold=config.circuit_breaker_threshold,
+            circuit_breaker_reset=config.circuit_breaker_reset,
         )
 
 
+@dataclass
+class LLMResponse:
+    text: str
+    usage: LLMUsage
+
+
+def _schema_name(schema: dict) -> str:
+    return schema.get("title", "response")
+
+
+def _is_strict_schema(schema: dict) -> bool:
+    """Whether OpenAI can enforce the schema in strict mode
+
+    Strict mode needs every object closed and all its properties required, so
+    free form maps (like the raised exceptions of a suggestion) are left out
+    """
+    if "items" in schema and not _is_strict_schema(schema["items"]):
+        return False
+    if schema.get("type") != "object":
+        return True
+    properties = schema.get("properties", {})
+    return (
+        schema.get("additionalProperties") is False
+        and set(schema.get("required", [])) == set(properties)
+        and all(_is_strict_schema(prop) for prop in properties.values())
+    )
+
+
 class LLMError(Exception):
     """Base exception for LLM operations"""
 
     pass
 
 
+class LLMUnavailableError(LLMError):
+    """Raised without calling the LLM while its circuit breaker is open"""
+
+    pass
+
+
+class LLMCancelledError(LLMError):
+    """Raised without calling the LLM once the requests of a run are cancelled"""
+
+    pass
+
+
 class LLMClient:
     """Universal LLM client supporting multiple providers"""
 
-    def __init__(self, config: LLMConfig):
+    def __init__(
+        self,
+        config: LLMConfig,
+        response_cache: ResponseCache | None = None,
+        preflight_cache: PreflightCache | None = None,
+    ):
         self.config = config
+        self.response_cache = response_cache
+        self.preflight_cache = preflight_cache
         self.provider = self._detect_provider()
         self.headers = self._build_headers()
+        self.pool = EndpointPool(
+            config.endpoints or [Endpoint(url=config.base_url)],
+            max_failures=config.max_endpoint_failures,
+            eject_time=config.endpoint_eject_time,
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.circuit_breaker_threshold,
+            reset_timeout=config.circuit_breaker_reset,
+        )
+        self.cancelled = threading.Event()
 
     @staticmethod
     def from_dolce_config(config: DolceConfig) -> LLMClient:
         """Create LLMClient from DolceConfig"""
         llm_config = LLMConfig.from_dolce_config(config)
-        return LLMClient(llm_config)
+        response_cache = None
+        preflight_cache = None
+        try:
+            if config.llm_cache:
+                response_cache = config.response_cache
+            if config.preflight_ttl > 0:
+                preflight_cache = PreflightCache(ttl=config.preflight_ttl)
+        except Exception as e:
+            logger.debug("Not using LLM caches: %s", e)
+        return LLMClient(llm_config, response_cache, preflight_cache)
 
     def _detect_provider(self) -> ProviderType:
         """Auto-detect provider based on URL if not specified"""
@@ -111,20 +200,86 @@ class LLMClient:
         return headers
 
     def generate(self, prompt: str, **kwargs: Any) -> str:
-        """Generate text using the configured LLM"""
+        """Generate text using the configured LLM
+
+        If a JSON ``schema`` is given and structured output is enabled, the
+        provider is asked to constrain the response to it and the returned text
+        is the JSON document.
+        """
+        return self.complete(prompt, **kwargs).text
+
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        """Same as `generate` but also returns the usage reported for the call"""
+        start = time.perf_counter()
+        if not self.config.structured_output:
+            kwargs.pop("schema", None)
+
+        key = self._response_key(prompt, **kwargs)
+        if key is not None and self.response_cache is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return LLMResponse(
+                    cached,
+                    LLMUsage(latency=time.perf_counter() - start, cached=True),
+                )
+
+        if self.cancelled.is_set():
+            raise LLMCancelledError("LLM requests were cancelled")
+        if not self.breaker.allow():
+            raise LLMUnavailableError("LLM is unavailable (circuit breaker open)")
+
+        try:
+            response = self._generate_with_retries(prompt, **kwargs)
+        except LLMError:
+            raise
+        except Exception:
+            self.breaker.record_failure()  # e.g. malformed responses
+            raise
+        if key is not None and self.response_cache is not None:
+            self.response_cache.set(key, response.text)
+        response.usage.latency = time.perf_counter() - start
+        return response
+
+    def cancel(self) -> None:
+        """Refuse the requests not sent yet, memoized responses are still served
+
+        Requests already sent cannot be interrupted, but are not retried.
+        """
+        self.cancelled.set()
+
+    def discard_cached(self, prompt: str, **kwargs: Any) -> None:
+        """Forget the memoized response of a call, e.g. if it was unusable"""
+        if not self.config.structured_output:
+            kwargs.pop("schema", None)
+        key = self._response_key(prompt, **kwargs)
+        if key is not None and self.response_cache is not None:
+            self.response_cache.discard(key)
+
+    def _response_key(self, prompt: str, **kwargs: Any) -> str | None:
+        """Memoization key of a call, None if its response is not deterministic"""
+        temperature = kwargs.get("temperature", self.config.temperature)
+        if self.response_cache is None or temperature != 0:
+            return None
+        return ResponseCache.key(
+            provider=self.provider.value,
+            model=self.config.model,
+            system=kwargs.get("system"),
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=kwargs.get("max_tokens", self.config.max_tokens),
+            schema=kwargs.get("schema"),
+        )
+
+    def _generate_with_retries(self, prompt: str, **kwargs: Any) -> LLMResponse:
         for attempt in range(self.config.max_retries):
             try:
-                if self.provider == ProviderType.OLLAMA:
-                    return self._ollama_generate(prompt, **kwargs)
-                elif self.provider == ProviderType.ANTHROPIC:
-                    return self._anthropic_generate(prompt, **kwargs)
-                elif self.provider == ProviderType.GEMINI:
-                    return self._gemini_generate(prompt, **kwargs)
-                else:
-                    # OpenAI-compatible (covers OpenAI, Groq, Together, etc.)
-                    return self._openai_generate(prompt, **kwargs)
-
+                response = self._generate_on_pool(prompt, **kwargs)
             except requests.exceptions.RequestException as e:
+                self.breaker.record_failure()
+                if self.breaker.is_open:
+                    raise LLMUnavailableError(
+                        f"LLM is unavailable (circuit breaker open): {e}"
+                    ) from e
                 if attempt == self.config.max_retries - 1:
                     raise LLMError(
                         f"Failed after {self.config.max_retries} attempts: {e}"
@@ -133,12 +288,58 @@ class LLMClient:
                 time.sleep(
                     self.config.retry_delay * (2**attempt)
                 )  # Exponential backoff
+                if self.cancelled.is_set():
+                    raise LLMCancelledError("LLM requests were cancelled") from e
+            else:
+                self.breaker.record_success()
+                return response
         raise LLMError("Unreachable code reached in generate()")
 
-    def _gemini_generate(self, prompt: str, **kwargs: Any) -> str:
+    def _generate_on_pool(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        """Send the request to the least loaded endpoint
+
+        Connection errors fail over to the next healthy endpoint right away, the
+        request is only retried (with backoff) once every endpoint failed.
+        """
+        failed_urls: set[str] = set()
+        while True:
+            endpoint = None
+            try:
+                with self.pool.lease(exclude=failed_urls) as endpoint:
+                    return self._provider_generate(endpoint.url, prompt, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if endpoint is None or not is_endpoint_failure(e):
+                    raise
+                failed_urls.add(endpoint.url)
+                if not self.pool.has_alternative(exclude=failed_urls):
+                    raise
+                logger.warning("Endpoint %s failed, failing over: %s", endpoint.url, e)
+
+    def _provider_generate(
+        self, base_url: str, prompt: str, **kwargs: Any
+    ) -> LLMResponse:
+        if self.provider == ProviderType.OLLAMA:
+            return self._ollama_generate(base_url, prompt, **kwargs)
+        elif self.provider == ProviderType.ANTHROPIC:
+            return self._anthropic_generate(base_url, prompt, **kwargs)
+        elif self.provider == ProviderType.GEMINI:
+            return self._gemini_generate(base_url, prompt, **kwargs)
+        else:
+            # OpenAI-compatible (covers OpenAI, Groq, Together, etc.)
+            return self._openai_generate(base_url, prompt, **kwargs)
+
+    def _gemini_generate(
+        self, base_url: str, prompt: str, **kwargs: Any
+    ) -> LLMResponse:
         """Generate using Gemini API"""
         if "system" in kwargs:
             prompt = f"{kwargs['system']}\n\n{prompt}"
+        generation_config: Dict[str, Any] = {
+            "temperature": kwargs.get("temperature", self.config.temperature),
+        }
+        if "schema" in kwargs:
+            generation_config["responseMimeType"] = "application/json"
+
         data = {
             "contents": [
                 {
@@ -146,13 +347,11 @@ class LLMClient:
                     "parts": [{"text": prompt}],
                 },
             ],
-            "generationConfig": {
-                "temperature": kwargs.get("temperature", self.config.temperature),
-            },
+            "generationConfig": generation_config,
         }
 
         response = requests.post(
-            f"{self.config.base_url}/v1beta/models/{self.config.model}:generateContent",
+            f"{base_url}/v1beta/models/{self.config.model}:generateContent",
             headers=self.headers,
             json=data,
             timeout=self.config.timeout,
@@ -160,9 +359,19 @@ class LLMClient:
         response.raise_for_status()
 
         result = response.json()
-        return result["candidates"][0]["content"]["parts"][0]["text"]
+        usage = result.get("usageMetadata", {})
+        return LLMResponse(
+            result["candidates"][0]["content"]["parts"][0]["text"],
+            LLMUsage(
+                prompt_tokens=usage.get("promptTokenCount", 0),
+                completion_tokens=usage.get("candidatesTokenCount", 0),
+                cached_prompt_tokens=usage.get("cachedContentTokenCount", 0),
+            ),
+        )
 
-    def _ollama_generate(self, prompt: str, **kwargs: Any) -> str:
+    def _ollama_generate(
+        self, base_url: str, prompt: str, **kwargs: Any
+    ) -> LLMResponse:
         """Generate using Ollama API"""
         data = {
             "model": self.config.model,
@@ -178,8 +387,16 @@ class LLMClient:
         if "system" in kwargs:
             data["system"] = kwargs["system"]
 
+        if "schema" in kwargs:
+            data["format"] = kwargs["schema"]
+
+        # Keeping the model loaded lets Ollama reuse the KV cache of the
+        # shared system prompt prefix between requests
+        if self.config.prompt_caching and self.config.keep_alive:
+            data["keep_alive"] = self.config.keep_alive
+
         response = requests.post(
-            f"{self.config.base_url}/api/generate",
+            f"{base_url}/api/generate",
             headers=self.headers,
             json=data,
             timeout=self.config.timeout,
@@ -187,13 +404,28 @@ class LLMClient:
         response.raise_for_status()
 
         result = response.json()
-        return result["response"]
+        # Durations are reported in nanoseconds, the first token comes right
+        # after loading the model and evaluating the prompt
+        first_token_ns = result.get("load_duration", 0) + result.get(
+            "prompt_eval_duration", 0
+        )
+        return LLMResponse(
+            result["response"],
+            LLMUsage(
+                prompt_tokens=result.get("prompt_eval_count", 0),
+                completion_tokens=result.get("eval_count", 0),
+                time_to_first_token=first_token_ns / 1e9 if first_token_ns else None,
+            ),
+        )
 
-    def _openai_generate(self, prompt: str, **kwargs: Any) -> str:
+    def _openai_generate(
+        self, base_url: str, prompt: str, **kwargs: Any
+    ) -> LLMResponse:
         """Generate using OpenAI-compatible API"""
         messages = kwargs.get("messages", [{"role": "user", "content": prompt}])
 
-        # If prompt is provided directly, use it as user message
+        # If prompt is provided directly, use it as user message. The system
+        # message must stay first so the static prefix can be cached
         if isinstance(prompt, str) and "messages" not in kwargs:
             messages = [{"role": "user", "content": prompt}]
             if "system" in kwargs:
@@ -206,6 +438,16 @@ class LLMClient:
             "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
         }
 
+        if "schema" in kwargs:
+            data["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": _schema_name(kwargs["schema"]),
+                    "schema": kwargs["schema"],
+                    "strict": _is_strict_schema(kwargs["schema"]),
+                },
+            }
+
         # Add provider-specific parameters
         if self.provider == ProviderType.GROQ:
             # Groq has some specific parameters
@@ -214,11 +456,11 @@ class LLMClient:
         endpoint = "/chat/completions"
         if self.provider == ProviderType.TOGETHER:
             endpoint = "/v1/chat/completions"
-        elif not self.config.base_url.endswith(("/v1", "/api")):
+        elif not base_url.endswith(("/v1", "/api")):
             endpoint = "/v1/chat/completions"
 
         response = requests.post(
-            f"{self.config.base_url}{endpoint}",
+            f"{base_url}{endpoint}",
             headers=self.headers,
             json=data,
             timeout=self.config.timeout,
@@ -226,9 +468,21 @@ class LLMClient:
         response.raise_for_status()
 
         result = response.json()
-        return result["choices"][0]["message"]["content"]
+        usage = result.get("usage") or {}
+        return LLMResponse(
+            result["choices"][0]["message"]["content"],
+            LLMUsage(
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+                cached_prompt_tokens=(usage.get("prompt_tokens_details") or {}).get(
+                    "cached_tokens", 0
+                ),
+            ),
+        )
 
-    def _anthropic_generate(self, prompt: str, **kwargs: Any) -> str:
+    def _anthropic_generate(
+        self, base_url: str, prompt: str, **kwargs: Any
+    ) -> LLMResponse:
         """Generate using Anthropic API"""
         data = {
             "model": self.config.model,
@@ -239,9 +493,30 @@ class LLMClient:
 
         if "system" in kwargs:
             data["system"] = kwargs["system"]
+            if self.config.prompt_caching:
+                data["system"] = [
+                    {
+                        "type": "text",
+                        "text": kwargs["system"],
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ]
+
+        # Anthropic has no JSON mode, forcing a tool call whose input schema
+        # is the expected response gives the same guarantee
+        if "schema" in kwargs:
+            tool_name = _schema_name(kwargs["schema"])
+            data["tools"] = [
+                {
+                    "name": tool_name,
+                    "description": "Report the result of the analysis",
+                    "input_schema": kwargs["schema"],
+                }
+            ]
+            data["tool_choice"] = {"type": "tool", "name": tool_name}
 
         response = requests.post(
-            f"{self.config.base_url}/v1/messages",
+            f"{base_url}/v1/messages",
             headers=self.headers,
             json=data,
             timeout=self.config.timeout,
@@ -249,7 +524,19 @@ class LLMClient:
         response.raise_for_status()
 
         result = response.json()
-        return result["content"][0]["text"]
+        usage = result.get("usage", {})
+        cache_read = usage.get("cache_read_input_tokens", 0) or 0
+        llm_usage = LLMUsage(
+            prompt_tokens=usage.get("input_tokens", 0)
+            + (usage.get("cache_creation_input_tokens", 0) or 0)
+            + cache_read,
+            completion_tokens=usage.get("output_tokens", 0),
+            cached_prompt_tokens=cache_read,
+        )
+        for block in result["content"]:
+            if block.get("type") == "tool_use":
+                return LLMResponse(json.dumps(block["input"]), llm_usage)
+        return LLMResponse(result["content"][0]["text"], llm_usage)
 
     def list_models(self) -> List[str]:
         """List available models (works for Ollama and OpenAI-compatible)"""
@@ -284,22 +571,106 @@ class LLMClient:
             logger.warning("Failed to list models: %s", e)
             return []
 
+    def _models_url(self, base_url: str) -> str:
+        if self.provider == ProviderType.OLLAMA:
+            return f"{base_url}/api/tags"
+        elif self.provider == ProviderType.GEMINI:
+            return f"{base_url}/v1beta/models"
+        elif self.provider == ProviderType.ANTHROPIC:
+            return f"{base_url}/v1/models"
+        elif self.provider == ProviderType.TOGETHER or not base_url.endswith(
+            ("/v1", "/api")
+        ):
+            return f"{base_url}/v1/models"
+        return f"{base_url}/models"
+
+    def _preflight_key(self) -> str:
+        return ResponseCache.key(
+            provider=self.provider.value,
+            model=self.config.model,
+            urls=sorted(ep.url for ep in self.pool.endpoints),
+            api_key=self.config.api_key,
+        )
+
     def test_connection(self) -> bool:
-        """Test if the LLM service is available"""
+        """Test if the LLM service is available
+
+        Every endpoint is probed by listing its models, unreachable ones are
+        ejected from the pool and the test passes if at least one of them is
+        available. Successful checks are remembered for a short time.
+        """
+        key = self._preflight_key()
+        if self.preflight_cache is not None and self.preflight_cache.is_fresh(key):
+            return True
+
+        available = False
+        for endpoint in self.pool.endpoints:
+            if self._probe(endpoint.url):
+                available = True
+            else:
+                self.pool.eject(endpoint)
+
+        if available and self.preflight_cache is not None:
+            self.preflight_cache.mark_ok(key)
+        return available
+
+    def _probe(self, base_url: str) -> bool:
+        """Cheap availability check of an endpoint, no generation involved"""
         try:
-            if self.provider == ProviderType.OLLAMA:
-                response = requests.get(f"{self.config.base_url}/api/tags", timeout=5)
-                return response.status_code == 200
-            elif self.provider == ProviderType.GEMINI:
-                response = requests.get(
-                    f"{self.config.base_url}/v1beta/models",
+            response = requests.get(
+                self._models_url(base_url), headers=self.headers, timeout=5
+            )
+            if response.status_code in (404, 405):
+                # No model listing on this server, any answer means it is up
+                response = requests.head(base_url, headers=self.headers, timeout=5)
+                return response.status_code < 500
+        except requests.exceptions.RequestException:
+            return False
+
+        if response.status_code != 200:
+            return False
+
+        if self.provider == ProviderType.OLLAMA:
+            names = [m.get("name", "") for m in response.json().get("models", [])]
+            if names and not any(
+                name in (self.config.model, f"{self.config.model}:latest")
+                for name in names
+            ):
+                logger.warning(
+                    "Model %s not found in %s, it may need to be pulled",
+                    self.config.model,
+                    base_url,
+                )
+        return True
+
+    def warm_up(self) -> threading.Thread | None:
+        """Start loading the model in the background
+
+        Only Ollama needs it: an empty generation request loads the model
+        into memory, so its load time overlaps with discovery and parsing
+        instead of delaying the first checked segment.
+        """
+        if self.provider != ProviderType.OLLAMA:
+            return None
+
+        def _load(base_url: str) -> None:
+            data: Dict[str, Any] = {"model": self.config.model}
+            if self.config.keep_alive:
+                data["keep_alive"] = self.config.keep_alive
+            try:
+                requests.post(
+                    f"{base_url}/api/generate",
                     headers=self.headers,
-                    timeout=5,
+                    json=data,
+                    timeout=self.config.timeout,
                 )
-                return response.status_code == 200
-            else:
-                test_prompt = "Hi"
-                self.generate(test_prompt, max_tokens=1)
-                return True
-        except Exception:
-            return False
+            except requests.exceptions.RequestException as e:
+                logger.debug("Warm up of %s failed: %s", base_url, e)
+
+        def _load_all() -> None:
+            for endpoint in self.pool.endpoints:
+                _load(endpoint.url)
+
+        thread = threading.Thread(target=_load_all, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Coalescer(Generic[T]):
+    """Compute a value once per key for the whole run
+
+    The first caller of a key computes the value, concurrent callers of the
+    same key wait on its future instead of computing it again, and later
+    callers reuse the result. Failures are only raised to the caller that
+    computed the value: its waiters and the next callers compute it again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._futures: dict[str, Future[T]] = {}
+
+    def get(self, key: str, compute: Callable[[], T]) -> tuple[T, bool]:
+        """The value of the key and whether it was computed by another caller"""
+        while True:
+            with self._lock:
+                future = self._futures.get(key)
+                if future is None:
+                    future = self._futures[key] = Future()
+                    break
+            try:
+                return future.result(), True
+            except CancelledError:
+                continue  # Its computation failed, compute it again
+
+        try:
+            value = compute()
+        except BaseException:
+            # The failure is only raised to this caller, waiters retry
+            with self._lock:
+                del self._futures[key]
+            future.cancel()
+            raise
+        future.set_result(value)
+        return value, False
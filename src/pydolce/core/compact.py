@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import ast
+import copy
+
+from pydolce.core.tokens import estimate_tokens
+
+MAX_CONSTANT_LENGTH = 80  # Longer str/bytes constants are cut
+MAX_COLLECTION_ITEMS = 8  # Bigger literals are collapsed
+KEPT_COLLECTION_ITEMS = 3  # Items kept from a collapsed literal
+
+_Definition = ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef | ast.Module
+
+
+def _ellipsis() -> ast.Constant:
+    return ast.Constant(...)
+
+
+def _has_docstring(node: _Definition) -> bool:
+    return ast.get_docstring(node, clean=False) is not None
+
+
+class _CodeCompactor(ast.NodeTransformer):
+    """Drop the parts of a definition that do not describe its behavior
+
+    The definition itself keeps its docstring, nested functions are reduced to
+    their heads (unless `keep_nested_bodies`), nested classes lose their
+    docstrings, and long constants and big collection literals are shortened.
+    """
+
+    def __init__(self, root: ast.AST, keep_nested_bodies: bool = False) -> None:
+        self.root = root
+        self.keep_nested_bodies = keep_nested_bodies
+
+    def _visit_root(self, node: _Definition) -> _Definition:
+        start = 1 if _has_docstring(node) else 0
+        node.body[start:] = [self.visit(stmt) for stmt in node.body[start:]]
+        for field in ("decorator_list", "args", "returns", "bases", "keywords"):
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                setattr(node, field, [self.visit(item) for item in value])
+            elif isinstance(value, ast.AST):
+                setattr(node, field, self.visit(value))
+        return node
+
+    def _visit_function(
+        self, node: ast.FunctionDef | ast.AsyncFunctionDef
+    ) -> ast.FunctionDef | ast.AsyncFunctionDef:
+        if node is self.root:
+            self._visit_root(node)
+            return node
+        if not self.keep_nested_bodies:
+            node.body = [ast.Expr(_ellipsis())]
+        self.generic_visit(node)
+        return node
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
+        return self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> ast.AST:
+        return self._visit_function(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> ast.AST:
+        if node is self.root:
+            return self._visit_root(node)
+        if _has_docstring(node):
+            node.body = node.body[1:] or [ast.Expr(_ellipsis())]
+        self.generic_visit(node)
+        return node
+
+    def visit_Module(self, node: ast.Module) -> ast.AST:
+        if node is self.root:
+            return self._visit_root(node)
+        self.generic_visit(node)
+        return node
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        value = node.value
+        if isinstance(value, str) and len(value) > MAX_CONSTANT_LENGTH:
+            node.value = value[:MAX_CONSTANT_LENGTH] + "..."
+        elif isinstance(value, bytes) and len(value) > MAX_CONSTANT_LENGTH:
+            node.value = value[:MAX_CONSTANT_LENGTH] + b"..."
+        return node
+
+    def _collapse_elts(self, node: ast.List | ast.Set | ast.Tuple) -> ast.AST:
+        if len(node.elts) > MAX_COLLECTION_ITEMS and not isinstance(
+            getattr(node, "ctx", ast.Load()), ast.Store
+        ):
+            node.elts = [*node.elts[:KEPT_COLLECTION_ITEMS], _ellipsis()]
+        self.generic_visit(node)
+        return node
+
+    def visit_List(self, node: ast.List) -> ast.AST:
+        return self._collapse_elts(node)
+
+    def visit_Set(self, node: ast.Set) -> ast.AST:
+        return self._collapse_elts(node)
+
+    def visit_Tuple(self, node: ast.Tuple) -> ast.AST:
+        return self._collapse_elts(node)
+
+    def visit_Dict(self, node: ast.Dict) -> ast.AST:
+        if len(node.keys) > MAX_COLLECTION_ITEMS:
+            node.keys = [*node.keys[:KEPT_COLLECTION_ITEMS], _ellipsis()]
+            node.values = [*node.values[:KEPT_COLLECTION_ITEMS], _ellipsis()]
+        self.generic_visit(node)
+        return node
+
+
+def compact_code(
+    code: str, node: ast.AST | None, keep_nested_bodies: bool = False
+) -> tuple[str, int]:
+    """Compact the code of a segment for behavior checks
+
+    Rules looking for side effects need `keep_nested_bodies`, as nested
+    functions may be where the I/O calls are.
+
+    Returns:
+        tuple[str, int]: The compacted code and the estimated tokens saved.
+    """
+    if not isinstance(
+        node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Module)
+    ):
+        return code, 0
+
+    root = copy.deepcopy(node)
+    compacted = ast.unparse(_CodeCompactor(root, keep_nested_bodies).visit(root))
+    saved = estimate_tokens(code) - estimate_tokens(compacted)
+    if saved <= 0:
+        return code, 0
+    return compacted, saved
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import hmac
+import ipaddress
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+
+from pydolce.core.results import JsonResults
+
+logger = logging.getLogger(__name__)
+
+LEASE_TIMEOUT = 300.0  # Seconds before the items leased by a silent worker are requeued
+IDLE_TIMEOUT = 900.0  # Seconds without any worker before giving up on the work left
+MAX_ATTEMPTS = 3  # Leases of an item before giving up on it
+RETRY_AFTER = 1.0  # Seconds workers wait when every pending item is leased
+SECRET_HEADER = "X-Dolce-Secret"  # noqa: S105 (header name)
+SECRET_ENV_VAR = "DOLCE_SECRET"  # noqa: S105 (variable name)
+
+LEASES_EXPIRED_ISSUE = "No worker sent results before its lease expired"
+NO_WORKERS_ISSUE = "No worker was left to check the LLM rules"
+
+# Options of the coordinator applied by the workers, so that the prompts do not
+# depend on the configuration of the machine they run on
+REMOTE_CHECK_OPTIONS = (
+    "compact_code",
+    "max_prompt_tokens",
+    "behavior_prefilter",
+    "behavior_prefilter_audit",
+)
+
+
+@dataclass
+class WorkItem:
+    """The LLM rules of a segment to be checked by a worker"""
+
+    id: int
+    file: str  # Relative to the project root
+    segment: str  # As given by `segment_key`
+    rules: list[str]  # References of the LLM rules to check
+    attempts: int = 0
+
+
+class WorkQueue:
+    """Segments waiting for their LLM rules to be checked by remote workers
+
+    Workers lease batches of items and send their results back. Items whose
+    lease expires, or whose results say that the LLM of the worker was
+    unavailable, are leased again, so slow or dead workers do not hold up the
+    run. After `max_attempts` leases, the last results are kept, or UNKNOWN
+    ones if the lease expired again. The first results of an item are kept,
+    even if they arrive after its lease expired. If no worker is heard from
+    for `idle_timeout` seconds, the items left get UNKNOWN results with the
+    `retry_issue`.
+    """
+
+    def __init__(
+        self,
+        lease_timeout: float = LEASE_TIMEOUT,
+        max_attempts: int = MAX_ATTEMPTS,
+        retry_issue: str | None = None,
+        idle_timeout: float | None = IDLE_TIMEOUT,
+    ) -> None:
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.retry_issue = retry_issue
+        self.idle_timeout = idle_timeout
+        self.timed_out = False  # Whether the items left were given up on
+        self.vocabulary: dict | None = None  # Totals of the DCE501 prefilter
+        self.options: dict[str, Any] = {}  # Check options sent with every lease
+        self.items: dict[int, WorkItem] = {}
+        self._sources: dict[str, str] = {}
+        self._pending: deque[int] = deque()
+        self._leases: dict[int, tuple[str, float]] = {}  # id -> worker, expiry
+        self._completed: queue.Queue[tuple[WorkItem, JsonResults]] = queue.Queue()
+        self._done: set[int] = set()
+        self._last_seen = time.monotonic()  # Last request of a worker
+        self._lock = threading.Lock()
+
+    def add(self, file: str, segment: str, rules: list[str], source: str) -> WorkItem:
+        with self._lock:
+            item = WorkItem(len(self.items), file, segment, rules)
+            self.items[item.id] = item
+            self._sources[file] = source
+            self._pending.append(item.id)
+            return item
+
+    @property
+    def finished(self) -> bool:
+        with self._lock:
+            return len(self._done) == len(self.items)
+
+    def _finish(self, item: WorkItem, results: JsonResults) -> None:
+        self._done.add(item.id)
+        self._completed.put((item, results))
+
+    def _requeue_expired(self, now: float) -> None:
+        expired = [
+            item_id for item_id, (_, expiry) in self._leases.items() if expiry <= now
+        ]
+        requeued = []
+        for item_id in expired:
+            worker, _ = self._leases.pop(item_id)
+            item = self.items[item_id]
+            if item.attempts < self.max_attempts:
+                logger.info("Lease of %s by %s expired", item_id, worker)
+                requeued.append(item_id)
+                continue
+            logger.warning("Giving up on %s after %s leases", item_id, item.attempts)
+            unknown = [{"status": "unknown", "issue": LEASES_EXPIRED_ISSUE}]
+            self._finish(item, dict.fromkeys(item.rules, unknown))
+        self._pending.extendleft(reversed(requeued))
+
+    def _give_up_if_idle(self, now: float) -> None:
+        if self.idle_timeout is None or now - self._last_seen < self.idle_timeout:
+            return
+        left = [item for item in self.items.values() if item.id not in self._done]
+        if left:
+            logger.warning(
+                "No worker for %ss, giving up on %s", self.idle_timeout, len(left)
+            )
+            self.timed_out = True
+        unknown = [{"status": "unknown", "issue": self.retry_issue or NO_WORKERS_ISSUE}]
+        for item in left:
+            self._finish(item, dict.fromkeys(item.rules, unknown))
+        self._pending.clear()
+        self._leases.clear()
+
+    def lease(
+        self, worker: str, max_items: int, with_vocabulary: bool = False
+    ) -> dict[str, Any]:
+        """The next batch of a worker, with the sources of their files"""
+        now = time.monotonic()
+        with self._lock:
+            self._last_seen = now
+            self._requeue_expired(now)
+            batch: list[WorkItem] = []
+            while self._pending and len(batch) < max_items:
+                item = self.items[self._pending.popleft()]
+                item.attempts += 1
+                self._leases[item.id] = (worker, now + self.lease_timeout)
+                batch.append(item)
+            files = {item.file for item in batch}
+            lease: dict[str, Any] = {
+                "done": len(self._done) == len(self.items),
+                "retry_after": RETRY_AFTER,
+                "options": self.options,
+                "files": {file: self._sources[file] for file in sorted(files)},
+                "items": [
+                    {
+                        "id": item.id,
+                        "file": item.file,
+                        "segment": item.segment,
+                        "rules": item.rules,
+                    }
+                    for item in batch
+                ],
+            }
+            if with_vocabulary:
+                lease["vocabulary"] = self.vocabulary
+            return lease
+
+    def _should_retry(self, item: WorkItem, results: JsonResults) -> bool:
+        return item.attempts < self.max_attempts and any(
+            result["issue"] == self.retry_issue
+            for rule_results in results.values()
+            for result in rule_results
+        )
+
+    def complete(self, worker: str, results: dict[int, JsonResults]) -> None:
+        """Take the results of a worker, those of completed items are ignored"""
+        with self._lock:
+            self._last_seen = time.monotonic()
+            for item_id, item_results in results.items():
+                item = self.items.get(item_id)
+                if item is None or item_id in self._done:
+                    continue
+                lease = self._leases.get(item_id)
+                if self._should_retry(item, item_results):
+                    # Items leased again since are left to their new worker
+                    if lease is not None and lease[0] == worker:
+                        logger.info(
+                            "Retrying %s, LLM of %s unavailable", item_id, worker
+                        )
+                        del self._leases[item_id]
+                        self._pending.append(item_id)
+                    continue
+                self._leases.pop(item_id, None)
+                if item_id in self._pending:
+                    self._pending.remove(item_id)
+                self._finish(item, item_results)
+
+    def results(self) -> Iterator[tuple[WorkItem, JsonResults]]:
+        """Completed items as they arrive, until every item is completed
+
+        The idle timeout starts with the call, the time spent preparing the
+        work does not count.
+        """
+        with self._lock:
+            self._last_seen = time.monotonic()
+        received = 0
+        while received < len(self.items):
+            try:
+                yield self._completed.get(timeout=RETRY_AFTER)
+                received += 1
+            except queue.Empty:
+                with self._lock:
+                    now = time.monotonic()
+                    self._requeue_expired(now)
+                    self._give_up_if_idle(now)
+
+
+def is_loopback(host: str) -> bool:
+    """Whether a host to serve on is only reachable from this machine"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _handler_for(work: WorkQueue, secret: str | None) -> type[BaseHTTPRequestHandler]:
+    class _CoordinatorHandler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+        def _send_json(self, status: int, body: dict) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _authorized(self) -> bool:
+            if secret is None:
+                return True
+            given = self.headers.get(SECRET_HEADER, "")
+            return hmac.compare_digest(given.encode("utf-8"), secret.encode("utf-8"))
+
+        def do_POST(self) -> None:
+            if not self._authorized():
+                self._send_json(401, {"error": "invalid secret"})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                data = json.loads(self.rfile.read(length) or b"{}")
+                worker = str(data.get("worker", self.client_address[0]))
+                if self.path == "/lease":
+                    lease = work.lease(
+                        worker, int(data["max"]), bool(data.get("vocabulary"))
+                    )
+                    self._send_json(200, lease)
+                elif self.path == "/results":
+                    results = {int(k): v for k, v in data["results"].items()}
+                    work.complete(worker, results)
+                    self._send_json(200, {"done": work.finished})
+                else:
+                    self._send_json(404, {"error": "not found"})
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                self._send_json(400, {"error": str(e)})
+
+    return _CoordinatorHandler
+
+
+class Coordinator:
+    """HTTP server handing out the items of a work queue
+
+    Workers POST `{"worker", "max", "vocabulary"}` to `/lease` to get a batch
+    with the check options of the coordinator (and the vocabulary totals of
+    the project, if `vocabulary` is true), and
+    `{"worker", "results": {id: {rule: [{"status", "issue"}]}}}` to
+    `/results` once it is checked.
+
+    Since the work carries the sources of the project, requests must send the
+    `secret`, if any, in the `X-Dolce-Secret` header. Serving on other hosts
+    than the loopback one requires a secret.
+    """
+
+    def __init__(
+        self,
+        work: WorkQueue,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        secret: str | None = None,
+    ):
+        if not secret and not is_loopback(host):
+            raise ValueError(
+                f"A secret is required to serve on {host}, set {SECRET_ENV_VAR}."
+            )
+        self.work = work
+        self._server = ThreadingHTTPServer(
+            (host, port), _handler_for(work, secret or None)
+        )
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> Coordinator:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> Coordinator:
+        return self.start()
+
+    def __exit__(self, *_args: object) -> None:
+        self.stop()
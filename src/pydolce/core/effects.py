@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import ast
+from dataclasses import dataclass
+from enum import Enum
+
+from pydolce.core.parser import CodeSegment, import_aliases
+
+
+class EffectKind(Enum):
+    IO = "I/O"
+    NETWORK = "network"
+    SUBPROCESS = "subprocess"
+    FILESYSTEM = "filesystem"
+    DATABASE = "database"
+    GLOBAL_STATE = "global state"
+
+
+@dataclass(frozen=True)
+class Effect:
+    kind: EffectKind
+    name: str  # Resolved name of the call or statement causing it
+    lineno: int
+
+    def __str__(self) -> str:
+        return f"{self.kind.value} ({self.name}, line {self.lineno})"
+
+
+# Fully qualified names (or name prefixes) of calls causing each effect
+EFFECT_CALLS: dict[EffectKind, tuple[str, ...]] = {
+    EffectKind.IO: ("sys.stdout", "sys.stderr", "sys.stdin"),
+    EffectKind.NETWORK: (
+        "socket",
+        "ssl",
+        "http.client",
+        "http.server",
+        "urllib.request",
+        "urllib3",
+        "requests",
+        "httpx",
+        "aiohttp",
+        "ftplib",
+        "smtplib",
+        "poplib",
+        "imaplib",
+        "websocket",
+        "websockets",
+        "grpc",
+        "paramiko",
+        "asyncio.open_connection",
+        "asyncio.start_server",
+    ),
+    EffectKind.SUBPROCESS: (
+        "subprocess",
+        "multiprocessing",
+        "os.system",
+        "os.popen",
+        "os.fork",
+        "os.kill",
+        "os.killpg",
+        "os.execv",
+        "os.execve",
+        "os.execvp",
+        "os.execl",
+        "os.execlp",
+        "os.spawnv",
+        "os.spawnl",
+        "os.posix_spawn",
+        "pty.spawn",
+        "asyncio.create_subprocess_exec",
+        "asyncio.create_subprocess_shell",
+    ),
+    EffectKind.FILESYSTEM: (
+        "io.open",
+        "os.remove",
+        "os.unlink",
+        "os.rename",
+        "os.replace",
+        "os.mkdir",
+        "os.makedirs",
+        "os.rmdir",
+        "os.removedirs",
+        "os.chmod",
+        "os.chown",
+        "os.symlink",
+        "os.link",
+        "os.truncate",
+        "os.write",
+        "shutil",
+        "tempfile",
+        "pathlib.Path.write_text",
+        "pathlib.Path.write_bytes",
+        "pathlib.Path.unlink",
+        "pathlib.Path.mkdir",
+        "pathlib.Path.rmdir",
+        "pathlib.Path.touch",
+        "pathlib.Path.rename",
+    ),
+    EffectKind.DATABASE: (
+        "sqlite3",
+        "dbm",
+        "shelve",
+        "psycopg",
+        "psycopg2",
+        "pymysql",
+        "MySQLdb",
+        "sqlalchemy",
+        "pymongo",
+        "redis",
+        "django.db",
+        "peewee",
+    ),
+    EffectKind.GLOBAL_STATE: (
+        "os.environ.update",
+        "os.environ.pop",
+        "os.environ.setdefault",
+        "os.environ.clear",
+        "os.putenv",
+        "os.unsetenv",
+        "os.chdir",
+        "os._exit",
+        "sys.exit",
+        "sys.path.append",
+        "sys.path.insert",
+        "sys.path.extend",
+        "sys.setrecursionlimit",
+        "random.seed",
+        "signal.signal",
+        "atexit.register",
+    ),
+}
+
+BUILTIN_EFFECTS: dict[str, EffectKind] = {
+    "print": EffectKind.IO,
+    "input": EffectKind.IO,
+    "open": EffectKind.FILESYSTEM,
+}
+
+# Methods that cause an effect whatever object they are called on
+EFFECT_METHODS: dict[str, EffectKind] = {
+    "write_text": EffectKind.FILESYSTEM,
+    "write_bytes": EffectKind.FILESYSTEM,
+    "unlink": EffectKind.FILESYSTEM,
+    "mkdir": EffectKind.FILESYSTEM,
+    "rmdir": EffectKind.FILESYSTEM,
+    "execute": EffectKind.DATABASE,
+    "executemany": EffectKind.DATABASE,
+    "executescript": EffectKind.DATABASE,
+    "commit": EffectKind.DATABASE,
+    "rollback": EffectKind.DATABASE,
+    "sendall": EffectKind.NETWORK,
+    "recv": EffectKind.NETWORK,
+}
+
+# Names whose item assignment mutates global state
+GLOBAL_MAPPINGS = ("os.environ", "sys.modules", "sys.path")
+
+
+def _dotted_name(node: ast.AST) -> str | None:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return f"{value}.{node.attr}" if value else None
+    if isinstance(node, ast.Call):
+        # e.g. requests.Session().get
+        return _dotted_name(node.func)
+    return None
+
+
+def _resolve(name: str, aliases: dict[str, str]) -> str:
+    head, dot, rest = name.partition(".")
+    if head in aliases:
+        return aliases[head] + dot + rest
+    return name
+
+
+def _matches(name: str, prefixes: tuple[str, ...]) -> bool:
+    return any(name == prefix or name.startswith(prefix + ".") for prefix in prefixes)
+
+
+def _call_effect(
+    name: str, method: str | None, aliases: dict[str, str]
+) -> tuple[EffectKind, str] | None:
+    if name.split(".")[0] in aliases:
+        resolved = _resolve(name, aliases)
+        for kind, prefixes in EFFECT_CALLS.items():
+            if _matches(resolved, prefixes):
+                return kind, resolved
+    elif name in BUILTIN_EFFECTS:
+        return BUILTIN_EFFECTS[name], name
+    if method is not None and method in EFFECT_METHODS:
+        return EFFECT_METHODS[method], name
+    return None
+
+
+def _node_effect(
+    node: ast.AST, aliases: dict[str, str]
+) -> tuple[EffectKind, str] | None:
+    if isinstance(node, ast.Call):
+        name = _dotted_name(node.func)
+        if name is None:
+            return None
+        method = node.func.attr if isinstance(node.func, ast.Attribute) else None
+        return _call_effect(name, method, aliases)
+
+    if isinstance(node, (ast.Global, ast.Nonlocal)):
+        keyword = "global" if isinstance(node, ast.Global) else "nonlocal"
+        return EffectKind.GLOBAL_STATE, f"{keyword} {', '.join(node.names)}"
+
+    targets: list[ast.expr] = []
+    if isinstance(node, (ast.Assign, ast.Delete)):
+        targets = node.targets
+    elif isinstance(node, ast.AugAssign):
+        targets = [node.target]
+    for target in targets:
+        if not isinstance(target, ast.Subscript):
+            continue
+        name = _dotted_name(target.value)
+        if name is None or name.split(".")[0] not in aliases:
+            continue
+        resolved = _resolve(name, aliases)
+        if resolved in GLOBAL_MAPPINGS:
+            return EffectKind.GLOBAL_STATE, resolved
+    return None
+
+
+def has_calls(segment: CodeSegment) -> bool:
+    """Whether the code of a segment calls anything, even without known effects"""
+    node = segment.code_node
+    return node is not None and any(
+        isinstance(child, ast.Call) for child in ast.walk(node)
+    )
+
+
+def analyze_effects(segment: CodeSegment) -> list[Effect]:
+    """Detect the side effects of the code of a segment
+
+    Calls are resolved through the imports of the module and of the segment
+    itself, so `from subprocess import run as sh; sh(...)` is detected as a
+    subprocess call, while a local variable named `requests` is not. Methods
+    called on unknown objects are only reported for a few unambiguous names
+    (e.g. `write_text` or `executemany`).
+    """
+    node = segment.code_node
+    if node is None:
+        return []
+
+    aliases = {**(segment.imports or {}), **import_aliases(node)}
+    effects: set[Effect] = set()
+    for child in ast.walk(node):
+        effect = _node_effect(child, aliases)
+        if effect is not None:
+            lineno = getattr(child, "lineno", segment.lineno)
+            effects.add(Effect(effect[0], effect[1], lineno))
+    return sorted(effects, key=lambda e: (e.lineno, e.kind.value, e.name))
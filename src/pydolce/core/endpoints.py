@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator
+
+import requests
+
+
+@dataclass
+class Endpoint:
+    """An LLM server endpoint and its load/health state."""
+
+    url: str
+    weight: float = 1.0
+    outstanding: int = 0
+    failures: int = 0
+    ejected_until: float = 0.0
+
+    @property
+    def load(self) -> float:
+        return self.outstanding / self.weight
+
+    def is_healthy(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    @staticmethod
+    def from_config(value: str | dict[str, Any]) -> Endpoint:
+        """Create an Endpoint from a url string or a {url, weight} table."""
+        if isinstance(value, str):
+            return Endpoint(url=value.rstrip("/"))
+        if "url" not in value:
+            raise ValueError(f"Endpoint {value} has no url")
+        weight = float(value.get("weight", 1.0))
+        if weight <= 0:
+            raise ValueError(f"Endpoint {value['url']} must have a positive weight")
+        return Endpoint(url=str(value["url"]).rstrip("/"), weight=weight)
+
+
+def parse_endpoints(url: str | list[str | dict[str, Any]]) -> list[Endpoint]:
+    """Parse the `url` config option, a single url or a list of (weighted) urls."""
+    values: Iterable[str | dict[str, Any]] = [url] if isinstance(url, str) else url
+    return [Endpoint.from_config(value) for value in values if value]
+
+
+def is_endpoint_failure(error: requests.exceptions.RequestException) -> bool:
+    """Whether the error is caused by the endpoint rather than by the request."""
+    if isinstance(
+        error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    ):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code >= 500
+
+
+class EndpointPool:
+    """Least-outstanding-requests balancer over a set of endpoints.
+
+    Endpoints failing `max_failures` consecutive times are ejected for
+    `eject_time` seconds. Once that time passes they receive traffic again,
+    acting as a probe: a single new failure ejects them again while a success
+    brings them fully back.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        max_failures: int = 3,
+        eject_time: float = 30.0,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("At least one endpoint is required")
+        self.endpoints = endpoints
+        self.max_failures = max_failures
+        self.eject_time = eject_time
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def _candidates(self, exclude: set[str], now: float) -> list[Endpoint]:
+        allowed = [ep for ep in self.endpoints if ep.url not in exclude]
+        return [ep for ep in allowed if ep.is_healthy(now)]
+
+    def has_alternative(self, exclude: set[str]) -> bool:
+        """Whether a healthy endpoint outside `exclude` is available."""
+        with self._lock:
+            return bool(self._candidates(exclude, time.monotonic()))
+
+    def acquire(self, exclude: set[str] | None = None) -> Endpoint:
+        """Pick the healthy endpoint with the least outstanding requests.
+
+        When every endpoint is ejected (or excluded) the one that recovers
+        sooner is used, so requests are never refused by the pool itself.
+        """
+        exclude = exclude or set()
+        with self._lock:
+            now = time.monotonic()
+            candidates = self._candidates(exclude, now)
+            if candidates:
+                endpoint = min(candidates, key=lambda ep: ep.load)
+            else:
+                endpoint = min(self.endpoints, key=lambda ep: ep.ejected_until)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, failed: bool = False) -> None:
+        """Release an endpoint acquired with `acquire`, updating its health."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if not failed:
+                endpoint.failures = 0
+                endpoint.ejected_until = 0.0
+                return
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                endpoint.ejected_until = time.monotonic() + self.eject_time
+
+    def eject(self, endpoint: Endpoint) -> None:
+        """Eject an endpoint known to be unhealthy."""
+        with self._lock:
+            endpoint.failures = max(endpoint.failures, self.max_failures)
+            endpoint.ejected_until = time.monotonic() + self.eject_time
+
+    @contextmanager
+    def lease(self, exclude: set[str] | None = None) -> Iterator[Endpoint]:
+        """Acquire an endpoint for the duration of the block.
+
+        Request errors caused by the endpoint count as failures.
+        """
+        endpoint = self.acquire(exclude)
+        try:
+            yield endpoint
+        except requests.exceptions.RequestException as e:
+            self.release(endpoint, failed=is_endpoint_failure(e))
+            raise
+        except BaseException:
+            self.release(endpoint)
+            raise
+        else:
+            self.release(endpoint)
@@ -3,11 +3,18 @@ from __future__ import annotations
 import ast
 from dataclasses import dataclass
 from enum import Enum, auto
+from functools import cached_property
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Iterable
 
 import pathspec
-from docstring_parser import Docstring, ParseError, parse
+from docstring_parser import (
+    Docstring,
+    DocstringParam,
+    DocstringReturns,
+    ParseError,
+    parse,
+)
 
 
 class CodeSegmentType(Enum):
@@ -171,6 +178,23 @@ def get_node_head(node: ast.AST) -> str:
         raise TypeError(f"Unsupported node type: {type(node).__name__}")
 
 
+def import_aliases(node: ast.AST) -> dict[str, str]:
+    """Map the names bound by the imports of a tree to what they import"""
+    aliases: dict[str, str] = {}
+    for child in ast.walk(node):
+        if isinstance(child, ast.Import):
+            for alias in child.names:
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+                else:
+                    head = alias.name.split(".")[0]
+                    aliases[head] = head
+        elif isinstance(child, ast.ImportFrom) and child.module and not child.level:
+            for alias in child.names:
+                aliases[alias.asname or alias.name] = f"{child.module}.{alias.name}"
+    return aliases
+
+
 class ModuleHeaders:
     def __init__(self, filepath: str | Path) -> None:
         self.filepath = filepath if isinstance(filepath, Path) else Path(filepath)
@@ -221,6 +245,7 @@ class CodeSegmentVisitor(ast.NodeVisitor):
         self.segments: list[CodeSegment] = []
         self._inside_class: ast.ClassDef | None = None
         self._class_init_visited: ast.FunctionDef | None = None
+        self._imports: dict[str, str] = {}
 
     def _with_func_fileds(
         self, segment: CodeSegment, node: ast.FunctionDef | ast.AsyncFunctionDef
@@ -352,6 +377,7 @@ class CodeSegmentVisitor(ast.NodeVisitor):
             code_path=f"{codepath}",
             parsed_doc=parsed_doc,
             code_head=head,
+            imports=self._imports,
         )
 
         doc_loc = self.get_docstring_with_location(node)
@@ -392,6 +418,7 @@ class CodeSegmentVisitor(ast.NodeVisitor):
         self._inside_class = None
 
     def visit_Module(self, node: ast.Module) -> None:
+        self._imports = import_aliases(node)
         self.segments.append(self._get_code_segment(node))
         self.generic_visit(node)
 
@@ -425,6 +452,23 @@ class CodeSegment:
     kwargs_type: str | None = None
     returns: str | None = None
 
+    # Names bound by the imports of the module, e.g. {"sp": "subprocess"}
+    imports: dict[str, str] | None = None
+
+    @property
+    def used_imports(self) -> dict[str, str]:
+        """The module imports its code refers to, e.g. {"sp": "subprocess"}"""
+        if not self.imports or self.code_node is None:
+            return {}
+        names = {
+            child.id
+            for child in ast.walk(self.code_node)
+            if isinstance(child, ast.Name)
+        }
+        return {
+            name: self.imports[name] for name in sorted(names & self.imports.keys())
+        }
+
     @property
     def is_generator(self) -> bool:
         return self.returns is not None and self.returns.startswith("Generator")
@@ -512,38 +556,108 @@ class CodeSegment:
             and self.parsed_doc.returns.is_generator
         )
 
+    @cached_property
+    def facts(self) -> SegmentFacts:
+        """Signature and docstring facts, computed on first use"""
+        return SegmentFacts.of(self)
+
+
+def normalize_type(type_name: str | None) -> str:
+    """Type name used to compare signature and docstring types"""
+    return str(type_name).lower()
+
+
+@dataclass(frozen=True)
+class SegmentFacts:
+    """Signature and docstring facts of a segment shared by the static rules"""
+
+    has_doc: bool
+    doc_parsed: bool
+    doc_params: tuple[DocstringParam, ...]  # In docstring order
+    documented_params: frozenset[str]
+    declared_params: tuple[str, ...]  # Without self
+    param_types: dict[str, str]  # All params, "None" when not annotated
+    normalized_param_types: dict[str, str]
+    returns: str | None  # Return annotation
+    returns_none: bool
+    is_generator: bool
+    generator_type: str | None
+    doc_returns: DocstringReturns | None
+    doc_return_type: str | None
+    has_return_doc: bool
+    has_yield_doc: bool
+    is_property: bool
+
+    @staticmethod
+    def of(segment: CodeSegment) -> SegmentFacts:
+        doc = segment.parsed_doc
+        doc_params = tuple(doc.params) if doc is not None else ()
+        params = segment.params or {}
+        param_types = {
+            name: "None" if type_name is None else type_name
+            for name, type_name in params.items()
+        }
+        return SegmentFacts(
+            has_doc=bool(segment.doc),
+            doc_parsed=doc is not None,
+            doc_params=doc_params,
+            documented_params=frozenset(p.arg_name for p in doc_params),
+            declared_params=tuple(name for name in params if name != "self"),
+            param_types=param_types,
+            normalized_param_types={
+                name: normalize_type(type_name)
+                for name, type_name in param_types.items()
+            },
+            returns=segment.returns,
+            returns_none=segment.returns == "None",
+            is_generator=segment.is_generator,
+            generator_type=segment.generator_type,
+            doc_returns=doc.returns if doc is not None else None,
+            doc_return_type=segment.doc_return_type,
+            has_return_doc=segment.has_return_doc,
+            has_yield_doc=segment.has_yield_doc,
+            is_property=segment.is_property(),
+        )
+
 
 def _parse_file(filepath: Path) -> list[CodeSegment]:
-    code = filepath.read_text()
+    return code_segments_from_source(filepath.read_text(), filepath)
+
+
+def code_segments_from_source(code: str, filepath: str | Path) -> list[CodeSegment]:
+    """The segments of the source code of a file, which is not read"""
     visitor = CodeSegmentVisitor(filepath)
     visitor.visit(ast.parse(code))
     return visitor.segments
 
 
-def code_segments_from_path(
-    path: str | Path, excludes: list[str] | None
-) -> Generator[CodeSegment]:
+def python_files(path: str | Path, excludes: list[str] | None) -> list[Path]:
+    """The python files of a path, without the excluded ones"""
     path = path if isinstance(path, Path) else Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Path {path} does not exist.")
     if not path.is_file() and not path.is_dir():
         raise ValueError(f"Path {path} is neither a file nor a directory.")
 
-    spec = pathspec.PathSpec.from_lines("gitwildmatch", excludes or [])
-
     if path.is_file():
-        for seg in _parse_file(path):
-            yield seg
-        return
+        return [path]
 
+    spec = pathspec.PathSpec.from_lines("gitwildmatch", excludes or [])
     curr_path = str(path.resolve())
-    all_python_files = [
+    return [
         p
-        for p in Path(path).rglob("*.py")
+        for p in path.rglob("*.py")
         if not spec.match_file(str(p.resolve())[len(curr_path) + 1 :])
     ]
 
-    # filter out ignored ones
-    for p in all_python_files:
+
+def code_segments_from_files(files: Iterable[Path]) -> Generator[CodeSegment]:
+    for p in files:
         for seg in _parse_file(p):
             yield seg
+
+
+def code_segments_from_path(
+    path: str | Path, excludes: list[str] | None
+) -> Generator[CodeSegment]:
+    yield from code_segments_from_files(python_files(path, excludes))
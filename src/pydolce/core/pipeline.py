@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Sequence
+
+from pydolce.config import DolceConfig
+from pydolce.core.check import check_segment
+from pydolce.core.parser import CodeSegment, code_segments_from_files
+from pydolce.core.results import JsonResults, report_from_json, report_to_json
+from pydolce.core.rules.checkers.common import CheckContext, CheckResult
+from pydolce.core.rules.plan import RulePlan
+from pydolce.core.rules.rule import Rule, StaticRule
+from pydolce.core.rules.rulesets import RULE_BY_REF
+from pydolce.core.similarity import Vocabulary
+
+logger = logging.getLogger(__name__)
+
+PARSE_QUEUE_SIZE = 256  # Segments parsed ahead of the checks
+MIN_FILES_PER_PROCESS = 50  # Smaller runs are not worth starting processes
+
+_END = object()
+
+# State of the parse processes, set once by `_init_process`
+_process_ctx: CheckContext | None = None
+_process_plan: RulePlan | None = None
+
+
+def _init_process(config: DolceConfig, rule_refs: list[str]) -> None:
+    global _process_ctx, _process_plan
+    _process_ctx = CheckContext(config=config)
+    _process_plan = RulePlan(RULE_BY_REF[ref] for ref in rule_refs)
+
+
+def _parse_and_check(file: Path) -> list[tuple[CodeSegment, JsonResults]]:
+    """Parse a file and check the static rules of its segments"""
+    assert _process_ctx is not None and _process_plan is not None
+    return [
+        (segment, report_to_json(check_segment(segment, _process_plan, _process_ctx)))
+        for segment in code_segments_from_files([file])
+    ]
+
+
+def parse_processes(config: DolceConfig, files: int) -> int:
+    """Processes worth parsing a number of files with"""
+    processes = config.parse_processes or os.cpu_count() or 1
+    return max(1, min(processes, files // MIN_FILES_PER_PROCESS))
+
+
+class ParseStage:
+    """First stage of a check run, parsing files ahead of the checks
+
+    Files are parsed in a background thread and their segments handed over
+    through a bounded queue. With more than one process, files are parsed in
+    a process pool, which also checks the static rules of their segments;
+    those results are then taken with `static_results`. The segments of each
+    file are also counted in the `vocabulary`, if any, before being handed
+    over.
+    """
+
+    def __init__(
+        self,
+        files: list[Path],
+        config: DolceConfig,
+        rules: Iterable[Rule] = (),
+        keep: Callable[[CodeSegment], bool] | None = None,
+        vocabulary: Vocabulary | None = None,
+    ) -> None:
+        self.files = files
+        self.config = config
+        self.vocabulary = vocabulary
+        self.processes = parse_processes(config, len(files))
+        self.rule_refs = sorted(r.reference for r in rules if isinstance(r, StaticRule))
+        self.keep = keep
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=PARSE_QUEUE_SIZE)
+        self._static: dict[str, JsonResults] = {}  # Code path -> results
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def static_results(self, segment: CodeSegment) -> dict[Rule, list[CheckResult]]:
+        """The static results computed while parsing a segment, if any"""
+        return report_from_json(self._static.pop(segment.code_path, {}))
+
+    def _put(self, item: object) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _emit(self, segment: CodeSegment, results: JsonResults | None = None) -> bool:
+        if self.keep is not None and not self.keep(segment):
+            return True
+        if results is not None:
+            self._static[segment.code_path] = results
+        return self._put(segment)
+
+    def _emit_file(
+        self, file: Path, parsed: Sequence[tuple[CodeSegment, JsonResults | None]]
+    ) -> bool:
+        if self.vocabulary is not None:
+            self.vocabulary.add_file(file, (segment for segment, _ in parsed))
+        return all(self._emit(segment, results) for segment, results in parsed)
+
+    def _emit_next(
+        self,
+        pending: deque[tuple[Path, Future[list[tuple[CodeSegment, JsonResults]]]]],
+    ) -> bool:
+        file, future = pending.popleft()
+        return self._emit_file(file, future.result())
+
+    def _parse_in_processes(self) -> None:
+        # Config copies do not carry their cached handlers and connections
+        config = dataclasses.replace(self.config)
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_process,
+            initargs=(config, self.rule_refs),
+        ) as executor:
+            pending: deque[
+                tuple[Path, Future[list[tuple[CodeSegment, JsonResults]]]]
+            ] = deque()
+            for file in self.files:
+                pending.append((file, executor.submit(_parse_and_check, file)))
+                if len(pending) >= self.processes * 2 and not self._emit_next(pending):
+                    break
+            while pending and self._emit_next(pending):
+                pass
+            executor.shutdown(cancel_futures=True)
+
+    def _run(self) -> None:
+        try:
+            if self.processes > 1:
+                self._parse_in_processes()
+            else:
+                for file in self.files:
+                    segments = code_segments_from_files([file])
+                    if not self._emit_file(file, [(s, None) for s in segments]):
+                        return
+        except BaseException as e:  # Raised again by the consumer
+            self._put(e)
+            return
+        self._put(_END)
+
+    def __iter__(self) -> Iterator[CodeSegment]:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        try:
+            while not self._stop.is_set():
+                try:
+                    item = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                assert isinstance(item, CodeSegment)
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop parsing, the segments parsed but not yet taken are dropped"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import logging
+import math
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterable
+
+from pydolce.core.parser import CodeSegment
+
+logger = logging.getLogger(__name__)
+
+# Weights of the risk factors of a segment, changed code goes first
+CHANGED_WEIGHT = 8.0
+UNCACHED_WEIGHT = 4.0
+PUBLIC_WEIGHT = 2.0
+MAX_SIZE_WEIGHT = 2.0  # Reached by segments of 256 lines or more
+
+GIT_TIMEOUT = 10.0
+
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+LineRanges = dict[Path, list[tuple[int, int]]]
+
+
+def _git(args: list[str], cwd: Path) -> str | None:
+    try:
+        result = subprocess.run(  # noqa: S603 (fixed git command)
+            ["git", *args],  # noqa: S607 (git from PATH)
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            timeout=GIT_TIMEOUT,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug("git %s failed: %s", " ".join(args), e)
+        return None
+    return result.stdout
+
+
+def parse_diff(diff: str, root: Path) -> LineRanges:
+    """Changed line ranges of each file of a `git diff --unified=0` output"""
+    changed: LineRanges = {}
+    current: Path | None = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            name = line[4:]
+            current = None if name == "/dev/null" else (root / name[2:]).resolve()
+        elif current is not None and (match := _HUNK_RE.match(line)):
+            start = int(match.group(1))
+            count = int(match.group(2) or 1)
+            if count:
+                changed.setdefault(current, []).append((start, start + count - 1))
+    return changed
+
+
+def changed_lines(since: str = "HEAD", cwd: Path | None = None) -> LineRanges:
+    """Lines changed since a git revision, uncommitted and untracked ones included
+
+    Outside of a git repository nothing is considered changed.
+    """
+    cwd = cwd or Path.cwd()
+    root = _git(["rev-parse", "--show-toplevel"], cwd)
+    diff = _git(["diff", "--unified=0", "--no-color", "--no-ext-diff", since], cwd)
+    if root is None or diff is None:
+        return {}
+
+    top = Path(root.strip())
+    changed = parse_diff(diff, top)
+    untracked = _git(["ls-files", "--others", "--exclude-standard", "--full-name"], cwd)
+    for name in (untracked or "").splitlines():
+        changed[(top / name).resolve()] = [(1, sys.maxsize)]
+    return changed
+
+
+def is_public(segment: CodeSegment) -> bool:
+    name = getattr(segment.code_node, "name", segment.file_path.stem)
+    return not name.startswith("_") or (name.startswith("__") and name.endswith("__"))
+
+
+def _overlaps(segment: CodeSegment, ranges: Iterable[tuple[int, int]]) -> bool:
+    return any(
+        start <= segment.endlineno and end >= segment.lineno for start, end in ranges
+    )
+
+
+def risk_score(segment: CodeSegment, changed: LineRanges, cached: bool) -> float:
+    """How urgently the LLM rules of a segment should be checked
+
+    Recently changed code comes first, then code never checked before, public
+    definitions and longer ones.
+    """
+    score = 0.0
+    if _overlaps(segment, changed.get(segment.file_path.resolve(), ())):
+        score += CHANGED_WEIGHT
+    if not cached:
+        score += UNCACHED_WEIGHT
+    if is_public(segment):
+        score += PUBLIC_WEIGHT
+    lines = max(segment.endlineno - segment.lineno + 1, 1)
+    score += MAX_SIZE_WEIGHT * min(math.log2(lines) / 8, 1.0)
+    return score
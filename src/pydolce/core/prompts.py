@@ -1,3 +1,6 @@
+# The system prompt is shared by every segment checked with the same set of
+# rules. Its static part goes first and the rules list last so that providers
+# supporting prefix caching (Anthropic, OpenAI, Ollama) can reuse it.
 CHECK_SYSTEM_PROMPT_TEMPLATE = """You are an expert Python docstring analyzer. Your task is to analyze if a Python function docstring follows a set of defined rules.
 
 Analysis scopes:
@@ -9,9 +12,6 @@ Analysis scopes:
 - PARAMS: The parameters in the function signature.
 - CODE: The actual code of the function.
 
-RULES TO CHECK:
-{rules}
-
 Go rule by rule, and check if the docstring violates any of them independently of the others. For each rule use only the scope information provided in the rule description to determine if the rule is violated or not.
 
 EXACT OUTPUT FORMAT IN JSON:
@@ -24,9 +24,31 @@ EXACT OUTPUT FORMAT IN JSON:
 }}
 ```
 
-VERY IMPORTANT: NEVER ADD ANY EXTRA COMENTARY OR DESCRIPTION. STICK TO THE EXACT OUTPUT FORMAT."""
+VERY IMPORTANT: NEVER ADD ANY EXTRA COMENTARY OR DESCRIPTION. STICK TO THE EXACT OUTPUT FORMAT.
+
+RULES TO CHECK:
+{rules}"""
 
 CHECK_USER_PROMPT_TEMPLATE = """Check this code:
 ```python
 {code}
 ```"""
+
+# Facts found statically go with the code, not in the system prompt, so that
+# the system prompt stays the same for every segment
+CHECK_HINTS_TEMPLATE = """
+
+Facts found by static analysis of this code:
+{hints}"""
+
+CHECK_RESPONSE_SCHEMA = {
+    "title": "check_report",
+    "type": "object",
+    "properties": {
+        "status": {"type": "string", "enum": ["GOOD", "BAD"]},
+        "issues": {"type": "array", "items": {"type": "string"}},
+        "descr": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["status", "issues", "descr"],
+    "additionalProperties": False,
+}
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from pydolce.core.cache import merge_cache_entry
+from pydolce.core.rules.checkers.common import CheckResult, CheckStatus
+from pydolce.core.rules.rule import Rule
+from pydolce.core.rules.rulesets import RULE_BY_REF
+
+REPORT_VERSION = 1
+
+JsonResults = dict[str, list[dict[str, str]]]  # Rule reference -> results
+
+
+def report_to_json(report: dict[Rule, list[CheckResult]]) -> JsonResults:
+    return {
+        rule.reference: [
+            {"status": result.status.value, "issue": result.issue} for result in results
+        ]
+        for rule, results in report.items()
+    }
+
+
+def report_from_json(data: JsonResults) -> dict[Rule, list[CheckResult]]:
+    return {
+        RULE_BY_REF[ref]: [
+            CheckResult(CheckStatus.from_str(r["status"]), r["issue"]) for r in results
+        ]
+        for ref, results in data.items()
+    }
+
+
+@dataclass
+class RunReport:
+    """Results of a check run, or of one of its shards, as written to JSON
+
+    Segments and files are keyed by paths relative to the project root, so
+    the reports of shards run on different machines can be merged.
+    """
+
+    shard: str | None = None
+    elapsed: float = 0.0
+    files: dict[str, float] = field(default_factory=dict)  # Seconds spent per file
+    segments: dict[str, JsonResults] = field(default_factory=dict)
+    counters: Counter[str] = field(default_factory=Counter)
+    cache: dict[str, dict] = field(default_factory=dict)  # Check cache entries written
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_time(self, file: str, seconds: float) -> None:
+        with self._lock:
+            self.files[file] = self.files.get(file, 0.0) + seconds
+
+    def add_results(self, segment: str, report: dict[Rule, list[CheckResult]]) -> None:
+        self.segments.setdefault(segment, {}).update(report_to_json(report))
+
+    def results(self, segment: str) -> dict[Rule, list[CheckResult]]:
+        return report_from_json(self.segments[segment])
+
+    def count(self, status: CheckStatus) -> int:
+        """Number of segments with at least one result of the status"""
+        return sum(
+            any(r["status"] == status.value for rs in results.values() for r in rs)
+            for results in self.segments.values()
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": REPORT_VERSION,
+            "shard": self.shard,
+            "elapsed": self.elapsed,
+            "files": self.files,
+            "segments": self.segments,
+            "counters": dict(self.counters),
+            "cache": self.cache,
+        }
+
+    def write_json(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=4))
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> RunReport:
+        if data.get("version") != REPORT_VERSION:
+            raise ValueError(f"Unsupported report version: {data.get('version')}")
+        return RunReport(
+            shard=data["shard"],
+            elapsed=data["elapsed"],
+            files=data["files"],
+            segments=data["segments"],
+            counters=Counter(data["counters"]),
+            cache=data["cache"],
+        )
+
+    @staticmethod
+    def load(path: str | Path) -> RunReport:
+        return RunReport.from_dict(json.loads(Path(path).read_text("utf-8")))
+
+    @staticmethod
+    def merge(reports: Iterable[RunReport]) -> RunReport:
+        """One report of all the shards, timed by the slowest one"""
+        merged = RunReport()
+        for report in reports:
+            merged.elapsed = max(merged.elapsed, report.elapsed)
+            for file, seconds in report.files.items():
+                merged.add_time(file, seconds)
+            for segment, results in report.segments.items():
+                merged.segments.setdefault(segment, {}).update(results)
+            merged.counters.update(report.counters)
+            for key, entry in report.cache.items():
+                merge_cache_entry(merged.cache.setdefault(key, {}), entry)
+        return merged
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pydolce.config import DEFAULT_PROFILE, DolceConfig
+from pydolce.core.client import LLMClient
+from pydolce.core.rules.rule import Rule
+
+
+class LLMRouter:
+    """Route LLM rules to the client of their model profile
+
+    Rules are routed by reference (e.g. "DCE501") or by group name (e.g.
+    "content"), unrouted ones go to the default profile. When an escalation
+    profile is set, BAD and UNKNOWN verdicts from the other profiles are checked
+    again with it.
+    """
+
+    def __init__(
+        self,
+        clients: dict[str, LLMClient],
+        routing: dict[str, str] | None = None,
+        escalate_to: str | None = None,
+    ) -> None:
+        if DEFAULT_PROFILE not in clients:
+            raise ValueError("A client for the default profile is required")
+        self.clients = clients
+        self.routing = {key.lower(): value for key, value in (routing or {}).items()}
+        self.escalate_to = escalate_to
+
+    @staticmethod
+    def from_dolce_config(config: DolceConfig) -> LLMRouter:
+        """Create the router and one LLMClient per used profile"""
+        default = LLMClient.from_dolce_config(config)
+        clients = {DEFAULT_PROFILE: default}
+        used = set((config.routing or {}).values())
+        if config.escalate_to:
+            used.add(config.escalate_to)
+        for name in sorted(used - {DEFAULT_PROFILE}):
+            client = LLMClient.from_dolce_config(config.profile_config(name))
+            # Share a single connection to the on-disk response cache
+            client.response_cache = default.response_cache
+            clients[name] = client
+        return LLMRouter(clients, config.routing, config.escalate_to)
+
+    @property
+    def default(self) -> LLMClient:
+        return self.clients[DEFAULT_PROFILE]
+
+    def profile_for(self, rule: Rule) -> str:
+        return (
+            self.routing.get(rule.reference.lower())
+            or self.routing.get(rule.group.name.lower())
+            or DEFAULT_PROFILE
+        )
+
+    def client(self, profile: str) -> LLMClient:
+        return self.clients[profile]
+
+    def escalation_for(self, profile: str) -> str | None:
+        """Profile re-checking the BAD and UNKNOWN verdicts of a profile"""
+        if self.escalate_to is None or self.escalate_to == profile:
+            return None
+        return self.escalate_to
+
+    def test_connection(self) -> bool:
+        return all(client.test_connection() for client in self.clients.values())
+
+    def warm_up(self) -> None:
+        for client in self.clients.values():
+            client.warm_up()
+
+    def cancel(self) -> None:
+        for client in self.clients.values():
+            client.cancel()
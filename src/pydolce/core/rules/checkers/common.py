@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import TYPE_CHECKING, Generator, Iterable
 
+from pydolce.core.stats import RunStats
+from pydolce.core.tokens import TokenBudget
+
 if TYPE_CHECKING:
     from pydolce.config import DolceConfig
+    from pydolce.core.similarity import Vocabulary
 
 
 class CheckStatus(Enum):
@@ -69,6 +73,30 @@ class CheckResult:
         return CheckResult.bad(issue)
 
 
+@dataclass
+class Prescreen:
+    """Outcome of checking an LLM rule statically before prompting the LLM"""
+
+    verdict: list[CheckResult] | None = None  # Final results, skips the LLM
+    hints: list[str] = field(default_factory=list)  # Facts added to the prompt
+    audit: bool = False  # Ask the LLM anyway to measure the verdict accuracy
+
+    @staticmethod
+    def resolved(*results: CheckResult) -> Prescreen:
+        return Prescreen(verdict=list(results))
+
+    @staticmethod
+    def audited(*results: CheckResult) -> Prescreen:
+        return Prescreen(verdict=list(results), audit=True)
+
+    @staticmethod
+    def ask(*hints: str) -> Prescreen:
+        return Prescreen(hints=list(hints))
+
+
 @dataclass
 class CheckContext:
     config: DolceConfig
+    stats: RunStats = field(default_factory=RunStats)
+    budget: TokenBudget = field(default_factory=TokenBudget)
+    vocabulary: Vocabulary | None = None  # Code terms of the checked project
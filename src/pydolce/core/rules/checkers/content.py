@@ -1,26 +1,69 @@
+from typing import Generator, Iterable
+
 from pydolce.core.parser import CodeSegment
-from pydolce.core.rules.checkers.common import CheckContext
+from pydolce.core.rules.checkers.common import CheckContext, CheckResult
+from pydolce.core.spelling import (
+    code_identifiers,
+    get_spell_checker,
+    identifier_words,
+)
 
 
-def description_spelling(segment: CodeSegment, _ctx: CheckContext) -> str | None:
-    """Docstring description contains typos"""
-    return (
-        "The docstring DESCRIPTION contains TYPOS. Examples: 'functon' instead of 'function', "
-        "'retrun' instead of 'return'. Report the specific typos. Scopes: [DESCRIPTION]"
+def _ignored_words(segment: CodeSegment) -> set[str]:
+    """Words of the identifiers of a segment, which are never typos"""
+    names = code_identifiers(segment.code_node)
+    names.update(segment.params or {})
+    if segment.parsed_doc is not None:
+        for param in segment.parsed_doc.params:
+            names.add(param.arg_name)
+            if param.type_name:
+                names.update(param.type_name.replace(",", " ").split())
+    return identifier_words(names)
+
+
+def _check_spelling(
+    texts: Iterable[str | None], segment: CodeSegment, ctx: CheckContext
+) -> Generator[CheckResult]:
+    checker = get_spell_checker(
+        tuple(ctx.config.spelling_dictionaries or ()),
+        tuple(ctx.config.spelling_words or ()),
     )
+    ignore = _ignored_words(segment)
+    typos = [
+        f"'{word}' (did you mean '{suggestion}'?)"
+        for text in texts
+        if text
+        for word, suggestion in checker.typos(text, ignore)
+    ]
+    if not typos:
+        yield CheckResult.good()
+    for typo in typos:
+        yield CheckResult.bad(typo)
 
 
-def param_desc_spelling(segment: CodeSegment, _ctx: CheckContext) -> str | None:
+def description_spelling(
+    segment: CodeSegment, ctx: CheckContext
+) -> Generator[CheckResult]:
+    """Docstring description contains typos"""
+    doc = segment.parsed_doc
+    texts = [doc.short_description, doc.long_description] if doc else [segment.doc]
+    yield from _check_spelling(texts, segment, ctx)
+
+
+def param_desc_spelling(
+    segment: CodeSegment, ctx: CheckContext
+) -> Generator[CheckResult]:
     """Parameter description contains typos"""
-    return (
-        "The description of some PARAMETERS contains TYPOS. Examples: 'functon' instead of 'function', "
-        "'retrun' instead of 'return'. Report the specific typos. Scopes: [PARAM_DESCRIPTION]"
-    )
+    if segment.parsed_doc is None:
+        return
+    texts = [param.description for param in segment.parsed_doc.params]
+    yield from _check_spelling(texts, segment, ctx)
 
 
-def return_desc_spelling(segment: CodeSegment, _ctx: CheckContext) -> str | None:
+def return_desc_spelling(
+    segment: CodeSegment, ctx: CheckContext
+) -> Generator[CheckResult]:
     """Return value description contains typos"""
-    return (
-        "The description of the RETURN VALUE contains TYPOS. Examples: 'functon' instead of 'function', "
-        "'retrun' instead of 'return'. Report the specific typos. Scopes: [RETURN_DESCRIPTION]"
-    )
+    if segment.parsed_doc is None or segment.parsed_doc.returns is None:
+        return
+    yield from _check_spelling([segment.parsed_doc.returns.description], segment, ctx)
@@ -1,5 +1,7 @@
+from pydolce.core.effects import analyze_effects, has_calls
 from pydolce.core.parser import CodeSegment
-from pydolce.core.rules.checkers.common import CheckContext
+from pydolce.core.rules.checkers.common import CheckContext, CheckResult, Prescreen
+from pydolce.core.similarity import agreement, in_audit_sample
 
 
 def func_behavior_mismatch(segment: CodeSegment, _ctx: CheckContext) -> str | None:
@@ -10,6 +12,19 @@ def func_behavior_mismatch(segment: CodeSegment, _ctx: CheckContext) -> str | No
     )
 
 
+def behavior_mismatch_prescreen(segment: CodeSegment, ctx: CheckContext) -> Prescreen:
+    """Code whose terms echo the docstring summary does what the docstring says"""
+    threshold = ctx.config.behavior_prefilter
+    if threshold is None:
+        return Prescreen()
+    score = agreement(segment, ctx.vocabulary)
+    if score is None or score < threshold:
+        return Prescreen()
+    if in_audit_sample(segment, ctx.config.behavior_prefilter_audit):
+        return Prescreen.audited(CheckResult.good())
+    return Prescreen.resolved(CheckResult.good())
+
+
 def func_critical_behavior_omited(
     segment: CodeSegment, _ctx: CheckContext
 ) -> str | None:
@@ -18,3 +33,19 @@ def func_critical_behavior_omited(
         "The code performs a CRITICAL behavior X, but the docstring does not mention this behavior. "
         "CRITICAL means heavy tasks. Non critical behavior may no be documented. Scopes: [DESCRIPTION, CODE]"
     )
+
+
+def critical_behavior_prescreen(segment: CodeSegment, _ctx: CheckContext) -> Prescreen:
+    """Only code with side effects can perform a critical behavior
+
+    Calls on unknown objects may have effects that are not detected, so only
+    code without any call is settled without the LLM.
+    """
+    effects = analyze_effects(segment)
+    if not effects and not has_calls(segment):
+        return Prescreen.resolved(CheckResult.good())
+    if not effects:
+        return Prescreen()
+    return Prescreen.ask(
+        "Detected side effects: " + "; ".join(str(effect) for effect in effects)
+    )
@@ -1,6 +1,6 @@
 from typing import Generator
 
-from pydolce.core.parser import CodeSegment
+from pydolce.core.parser import CodeSegment, normalize_type
 from pydolce.core.rules.checkers.common import CheckContext, CheckResult
 
 # ----------------------------------------------------------------
@@ -12,13 +12,11 @@ from pydolce.core.rules.checkers.common import CheckContext, CheckResult
 
 def missing_param(segment: CodeSegment, ctx: CheckContext) -> Generator[CheckResult]:
     """Function parameter is not documented"""
-    if not segment.doc or segment.parsed_doc is None:
+    facts = segment.facts
+    if not facts.has_doc or not facts.doc_parsed:
         return
 
-    func_params = list(segment.params.keys()) if segment.params else []
-    if "self" in func_params:
-        func_params.remove("self")
-
+    func_params = list(facts.declared_params)
     if not ctx.config.ignore_args and segment.args_name:
         func_params.append(segment.args_name)
     if not ctx.config.ignore_kwargs and segment.kwargs_name:
@@ -27,11 +25,10 @@ def missing_param(segment: CodeSegment, ctx: CheckContext) -> Generator[CheckRes
     if not func_params:
         yield CheckResult.good()
 
-    documented_params = {param.arg_name for param in segment.parsed_doc.params}
     yield from CheckResult.from_issues(
         f"Parameter '{p_name}' is not documented."
         for p_name in func_params
-        if p_name not in documented_params
+        if p_name not in facts.documented_params
     )
 
 
@@ -39,12 +36,13 @@ def missing_param_type(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function parameter is missing type in the docstring"""
-    if not segment.params or segment.parsed_doc is None or not segment.doc:
+    facts = segment.facts
+    if not facts.param_types or not facts.doc_parsed or not facts.has_doc:
         return
 
     yield from CheckResult.from_issues(
         f"Parameter '{p.arg_name}' is missing a type in the docstring."
-        for p in segment.parsed_doc.params
+        for p in facts.doc_params
         if p.type_name is None
     )
 
@@ -53,11 +51,12 @@ def wrong_param_type(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function parameter has a different type documented"""
-    if segment.params is None or not segment.params or segment.parsed_doc is None:
+    facts = segment.facts
+    if not facts.param_types or not facts.doc_parsed:
         return
 
     errors = []
-    for param in segment.parsed_doc.params:
+    for param in facts.doc_params:
         p_name = param.arg_name
         p_type = param.type_name
         if p_type is None:
@@ -65,18 +64,14 @@ def wrong_param_type(
             # There is another rule to check for missing types
             continue
 
-        if p_name not in segment.params:
+        if p_name not in facts.param_types:
             # Parameter documented but not in signature
             # There is another rule to check for missing parameters
             continue
 
-        sig_type = segment.params.get(p_name)
-        if sig_type is None:
-            sig_type = "None"
-
-        if str(sig_type).lower() != p_type.lower():
+        if facts.normalized_param_types[p_name] != normalize_type(p_type):
             errors.append(
-                f"Parameter '{p_name}' has type '{sig_type}' in signature but '{p_type}' in docstring."
+                f"Parameter '{p_name}' has type '{facts.param_types[p_name]}' in signature but '{p_type}' in docstring."
             )
 
     yield from CheckResult.from_issues(errors)
@@ -86,12 +81,13 @@ def missing_param_description(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function parameter is missing description in the docstring"""
-    if not segment.doc or segment.parsed_doc is None:
+    facts = segment.facts
+    if not facts.has_doc or not facts.doc_parsed:
         return
 
     yield from CheckResult.from_issues(
         f"Parameter '{param.arg_name}' is missing a description."
-        for param in segment.parsed_doc.params
+        for param in facts.doc_params
         if param.description is None or not param.description.strip()
     )
 
@@ -100,18 +96,14 @@ def params_does_not_exist(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function parameter is documented but does not exist in the signature"""
-    if (
-        segment.params is None
-        or not segment.params
-        or segment.parsed_doc is None
-        or not segment.doc
-    ):
+    facts = segment.facts
+    if not facts.param_types or not facts.doc_parsed or not facts.has_doc:
         return
 
     yield from CheckResult.from_issues(
         f"Parameter '{param.arg_name}' documented but not in signature."
-        for param in segment.parsed_doc.params
-        if param.arg_name not in segment.params
+        for param in facts.doc_params
+        if param.arg_name not in facts.param_types
     )
 
 
@@ -119,12 +111,13 @@ def duplicate_params(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function parameter is documented multiple times in the docstring"""
-    if segment.parsed_doc is None:
+    facts = segment.facts
+    if not facts.doc_parsed:
         return
 
     errors = []
     checked_params = set()
-    for param in segment.parsed_doc.params:
+    for param in facts.doc_params:
         p_name = param.arg_name
 
         if p_name in checked_params:
@@ -146,33 +139,34 @@ def duplicate_params(
 
 def missing_return(segment: CodeSegment, _ctx: CheckContext) -> Generator[CheckResult]:
     """Function return is not documented"""
-    if segment.parsed_doc is None or not segment.doc or segment.is_generator:
+    facts = segment.facts
+    if not facts.doc_parsed or not facts.has_doc or facts.is_generator:
         return
 
-    if segment.returns is not None and segment.returns == "None":
+    if facts.returns_none:
         yield CheckResult.good()
 
     # Properties do not need return sections
-    if segment.is_property():
+    if facts.is_property:
         yield CheckResult.good()
 
-    yield CheckResult.check(segment.parsed_doc.returns is not None)
+    yield CheckResult.check(facts.doc_returns is not None)
 
 
 def missing_return_description(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function return is missing description in the docstring"""
+    facts = segment.facts
     if (
-        segment.parsed_doc is None
-        or segment.parsed_doc.returns is None
-        or (segment.returns is not None and segment.returns == "None")
-        or segment.is_generator
-        or not segment.has_return_doc
+        facts.doc_returns is None
+        or facts.returns_none
+        or facts.is_generator
+        or not facts.has_return_doc
     ):
         return
 
-    ret = segment.parsed_doc.returns
+    ret = facts.doc_returns
     yield CheckResult.check(
         ret.description is not None and ret.description.strip() != ""
     )
@@ -182,19 +176,13 @@ def wrong_return_type(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function return has a different type documented"""
-    if (
-        segment.real_return_type is None
-        or not segment.has_return_doc
-        or segment.parsed_doc is None
-        or segment.parsed_doc.returns is None
-        or segment.parsed_doc.returns.is_generator
-        or segment.is_generator
-    ):
+    facts = segment.facts
+    if facts.returns is None or not facts.has_return_doc or facts.is_generator:
         return
 
     yield CheckResult.check(
-        segment.real_return_type == segment.doc_return_type,
-        f"Return type is '{segment.real_return_type}' but declared '{segment.doc_return_type}' in docstring.",
+        facts.returns == facts.doc_return_type,
+        f"Return type is '{facts.returns}' but declared '{facts.doc_return_type}' in docstring.",
     )
 
 
@@ -202,25 +190,23 @@ def unnecessary_return(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function has return documented but does not return anything"""
-    if (
-        segment.doc_return_type is None
-        or not segment.has_return_doc
-        or segment.is_generator
-    ):
+    facts = segment.facts
+    if facts.doc_return_type is None or not facts.has_return_doc or facts.is_generator:
         return
 
-    yield CheckResult.check(segment.returns != "None")
+    yield CheckResult.check(not facts.returns_none)
 
 
 def return_on_property(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Property has return section documented"""
-    if segment.parsed_doc is None or not segment.has_return_doc:
+    facts = segment.facts
+    if not facts.has_return_doc:
         return
 
     yield CheckResult.check(
-        not segment.is_property(), "Properties should not have return sections."
+        not facts.is_property, "Properties should not have return sections."
     )
 
 
@@ -233,35 +219,23 @@ def return_on_property(
 
 def missing_yield(segment: CodeSegment, _ctx: CheckContext) -> Generator[CheckResult]:
     """Function yield is not documented"""
-    if (
-        segment.real_return_type is None
-        or segment.parsed_doc is None
-        or not segment.is_generator
-    ):
+    facts = segment.facts
+    if facts.returns is None or not facts.doc_parsed or not facts.is_generator:
         return
 
-    yield CheckResult.check(
-        not segment.is_generator
-        or (
-            segment.parsed_doc.returns is not None
-            and segment.parsed_doc.returns.is_generator
-        )
-    )
+    yield CheckResult.check(facts.has_yield_doc)
 
 
 def missing_yield_description(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function yield is missing description in the docstring"""
-    if (
-        segment.parsed_doc is None
-        or not segment.is_generator
-        or segment.parsed_doc.returns is None
-        or not segment.parsed_doc.returns.is_generator
-    ):
+    facts = segment.facts
+    if not facts.is_generator or not facts.has_yield_doc:
         return
 
-    ret = segment.parsed_doc.returns
+    ret = facts.doc_returns
+    assert ret is not None
     yield CheckResult.check(
         ret.description is not None and ret.description.strip() != ""
     )
@@ -271,21 +245,19 @@ def wrong_yield_type(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function yield has a different type documented"""
+    facts = segment.facts
     if (
-        segment.real_return_type is None
-        or segment.parsed_doc is None
-        or segment.parsed_doc.returns is None
-        or not segment.parsed_doc.returns.is_generator
-        or not segment.is_generator
-        or (
-            segment.is_generator and segment.generator_type is None
-        )  # No type specified
+        facts.returns is None
+        or not facts.has_yield_doc
+        or not facts.is_generator
+        or facts.generator_type is None  # No type specified
     ):
         return
 
+    assert facts.doc_returns is not None
     yield CheckResult.check(
-        segment.generator_type == segment.parsed_doc.returns.type_name,
-        f"Yield type is '{segment.generator_type}' but declared '{segment.parsed_doc.returns.type_name}' in docstring.",
+        facts.generator_type == facts.doc_returns.type_name,
+        f"Yield type is '{facts.generator_type}' but declared '{facts.doc_returns.type_name}' in docstring.",
     )
 
 
@@ -293,4 +265,5 @@ def unnecessary_yield(
     segment: CodeSegment, _ctx: CheckContext
 ) -> Generator[CheckResult]:
     """Function has yield documented but is not a generator"""
-    yield CheckResult.check(not segment.has_yield_doc or segment.is_generator)
+    facts = segment.facts
+    yield CheckResult.check(not facts.has_yield_doc or facts.is_generator)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+from pydolce.config import DEFAULT_PROFILE
+from pydolce.core.parser import CodeSegmentType
+from pydolce.core.rules.rule import LLMRule, Rule, StaticRule
+
+ProfileFor = Callable[[Rule], str]
+
+
+@dataclass(frozen=True)
+class LLMRuleGroup:
+    """LLM rules sent together, to the same model"""
+
+    profile: str
+    rules: tuple[LLMRule, ...]
+
+
+@dataclass(frozen=True)
+class SegmentPlan:
+    """Rules to check on one type of segment"""
+
+    static_rules: tuple[StaticRule, ...] = ()
+    llm_groups: tuple[LLMRuleGroup, ...] = ()
+
+    @property
+    def llm_rules(self) -> tuple[LLMRule, ...]:
+        return tuple(rule for group in self.llm_groups for rule in group.rules)
+
+
+def group_llm_rules(
+    rules: Iterable[LLMRule], profile_for: ProfileFor | None = None
+) -> tuple[LLMRuleGroup, ...]:
+    """Group LLM rules by model profile, in a stable order
+
+    The rules of a group share one request, which costs fewer tokens than a
+    second request with the same code. The request sees the widest input
+    scope of the rules left once their prescreens ran.
+    """
+    groups: dict[str, list[LLMRule]] = {}
+    for rule in sorted(rules, key=lambda r: r.code):
+        profile = profile_for(rule) if profile_for is not None else DEFAULT_PROFILE
+        groups.setdefault(profile, []).append(rule)
+    return tuple(
+        LLMRuleGroup(profile, tuple(group)) for profile, group in sorted(groups.items())
+    )
+
+
+class RulePlan:
+    """The rules of a run compiled into one dispatch table per segment type
+
+    Rule scopes, rule kinds and LLM request groups are resolved once, so
+    checking a segment only looks up the plan of its type. The profiles of the
+    LLM groups are the ones of the router given by `profile_for`.
+    """
+
+    def __init__(self, rules: Iterable[Rule], profile_for: ProfileFor | None = None):
+        self.rules = frozenset(rules)
+        ordered = sorted(self.rules, key=lambda r: r.code)
+        self._plans: dict[CodeSegmentType, SegmentPlan] = {}
+        for seg_type in CodeSegmentType:
+            applicable = [
+                rule
+                for rule in ordered
+                if rule.scopes is None or seg_type in rule.scopes
+            ]
+            self._plans[seg_type] = SegmentPlan(
+                static_rules=tuple(r for r in applicable if isinstance(r, StaticRule)),
+                llm_groups=group_llm_rules(
+                    (r for r in applicable if isinstance(r, LLMRule)), profile_for
+                ),
+            )
+
+    def for_type(self, seg_type: CodeSegmentType) -> SegmentPlan:
+        return self._plans[seg_type]
+
+    @property
+    def has_llm_rules(self) -> bool:
+        return any(plan.llm_groups for plan in self._plans.values())
+
+    def __contains__(self, rule: object) -> bool:
+        return rule in self.rules
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
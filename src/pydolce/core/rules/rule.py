@@ -4,8 +4,8 @@ from enum import IntEnum
 from typing import Generator
 
 from pydolce.core.parser import CodeSegment, CodeSegmentType
-from pydolce.core.rules.checkers.common import CheckContext, CheckResult
-from pydolce.types import LLMRulePrompter, RuleChecker
+from pydolce.core.rules.checkers.common import CheckContext, CheckResult, Prescreen
+from pydolce.types import LLMRulePrescreener, LLMRulePrompter, RuleChecker
 
 DEFAULT_PREFIX = "DCE"
 
@@ -18,6 +18,13 @@ class RuleGroup(IntEnum):
     SEMANTIC = 5
 
 
+class InputScope(IntEnum):
+    """Part of a segment an LLM rule needs to see, from narrowest to widest"""
+
+    CODE = 1  # Nested function bodies may be compacted away
+    EFFECTS = 2  # Every nested body, side effects may hide in them
+
+
 class Rule:
     def __init__(
         self,
@@ -46,7 +53,8 @@ class Rule:
         return RuleGroup(self.code // 100)
 
     def __hash__(self) -> int:
-        return hash((self.reference, self.description))
+        # Rules are looked up in reports for every segment, codes are unique
+        return hash(self.code)
 
     def __repr__(self) -> str:
         return f"<Rule {self.reference}: {self.name}>"
@@ -73,8 +81,18 @@ class LLMRule(Rule):
         code: int,
         prompter: LLMRulePrompter,
         scopes: list[CodeSegmentType] | None = None,
+        input_scope: InputScope = InputScope.CODE,
+        prescreen: LLMRulePrescreener | None = None,
     ):
         super().__init__(code, prompter, scopes)
+        self.input_scope = input_scope
+        self.prescreener = prescreen
+
+    def prescreen(self, segment: CodeSegment, ctx: CheckContext) -> Prescreen:
+        """Check the rule statically, the LLM is only asked if there is no verdict"""
+        if self.prescreener is None:
+            return Prescreen()
+        return self.prescreener(segment, ctx)
 
     def prompt(self, segment: CodeSegment, ctx: CheckContext) -> str | None:
         result = self.validator(segment, ctx)
@@ -8,6 +8,8 @@ from pydolce.core.rules.checkers.content import (
     return_desc_spelling,
 )
 from pydolce.core.rules.checkers.semantic import (
+    behavior_mismatch_prescreen,
+    critical_behavior_prescreen,
     func_behavior_mismatch,
     func_critical_behavior_omited,
 )
@@ -36,7 +38,7 @@ from pydolce.core.rules.checkers.structural import (
     missing_module_docstring,
 )
 from pydolce.core.rules.checkers.style import invalid_docstring_style
-from pydolce.core.rules.rule import LLMRule, Rule, StaticRule
+from pydolce.core.rules.rule import InputScope, LLMRule, Rule, StaticRule
 
 RuleSet = Iterable[Rule]
 
@@ -74,12 +76,23 @@ ALL_RULES: RuleSet = {
     StaticRule(343, wrong_yield_type, callable_scope),
     StaticRule(344, unnecessary_yield, callable_scope),
     # Content (4xx)
-    LLMRule(401, description_spelling, all_scopes),
-    LLMRule(402, param_desc_spelling, callable_scope),
-    LLMRule(403, return_desc_spelling, callable_scope),
+    StaticRule(401, description_spelling, all_scopes),
+    StaticRule(402, param_desc_spelling, callable_scope),
+    StaticRule(403, return_desc_spelling, callable_scope),
     # Semantic (5xx)
-    LLMRule(501, func_behavior_mismatch, callable_scope),
-    LLMRule(502, func_critical_behavior_omited, callable_scope),
+    LLMRule(
+        501,
+        func_behavior_mismatch,
+        callable_scope,
+        prescreen=behavior_mismatch_prescreen,
+    ),
+    LLMRule(
+        502,
+        func_critical_behavior_omited,
+        callable_scope,
+        input_scope=InputScope.EFFECTS,
+        prescreen=critical_behavior_prescreen,
+    ),
 }
 
 
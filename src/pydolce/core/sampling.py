@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from pydolce.core.cache import segment_fingerprint
+from pydolce.core.parser import CodeSegment
+from pydolce.core.rules.rule import Rule
+
+logger = logging.getLogger(__name__)
+
+
+class SampleRotation:
+    """Deterministic slices of the segments, a different one on each run
+
+    Segments are spread over `ceil(1 / rate)` slots by a seeded hash of their
+    code, and each run takes the next slot, so every segment is in the sample
+    once every that many runs. A run only counts once it is `save`d, so runs
+    stopped early take the same slot again.
+    """
+
+    def __init__(self, rate: float, seed: int = 0, run: int = 0) -> None:
+        self.rate = rate
+        self.seed = seed
+        self.run = run
+        self.slots = max(1, math.ceil(1 / rate))
+
+    def slot(self, segment: CodeSegment) -> int:
+        hasher = hashlib.sha256(str(self.seed).encode("utf-8"))
+        hasher.update(segment_fingerprint(segment).encode("utf-8"))
+        return int.from_bytes(hasher.digest()[:8], "big") % self.slots
+
+    def __contains__(self, segment: CodeSegment) -> bool:
+        return self.slot(segment) == self.run % self.slots
+
+    @staticmethod
+    def next_run(rate: float, seed: int, state_file: Path) -> SampleRotation:
+        """The rotation of a new run, after the last one saved in `state_file`"""
+        run = 0
+        try:
+            state = json.loads(state_file.read_text("utf-8"))
+            if state.get("seed") == seed:
+                run = int(state["run"]) + 1
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug("Starting a new sample rotation: %s", e)
+        return SampleRotation(rate, seed, run)
+
+    def save(self, state_file: Path) -> None:
+        """Count the run as done, the next one takes the next slot"""
+        try:
+            state_file.write_text(
+                json.dumps({"seed": self.seed, "run": self.run}), "utf-8"
+            )
+        except OSError as e:
+            logger.warning("Failed to write sampling state: %s", e)
+
+
+def stale_rules(
+    times: Mapping[Rule, float], rules: Iterable[Rule], max_age: float
+) -> set[Rule]:
+    """Rules whose verdict is older than `max_age` seconds, or of unknown age"""
+    now = time.time()
+    return {rule for rule in rules if rule not in times or now - times[rule] > max_age}
+
+
+@dataclass
+class Coverage:
+    """How many segments have a cached verdict for all their LLM rules"""
+
+    segments: int = 0
+    covered: int = 0
+    oldest: float | None = None  # Timestamp of the oldest verdict
+
+    def add(self, times: Mapping[Rule, float], rules: Iterable[Rule]) -> None:
+        rules = list(rules)
+        if not rules:
+            return
+        self.segments += 1
+        if any(rule not in times for rule in rules):
+            return
+        self.covered += 1
+        first = min(times[rule] for rule in rules)
+        self.oldest = first if self.oldest is None else min(self.oldest, first)
+
+    @property
+    def ratio(self) -> float:
+        return self.covered / self.segments if self.segments else 1.0
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import mean
+from typing import Iterable, Iterator, Mapping
+
+from pydolce.core.parser import CodeSegment
+
+SHARD_UNITS = ("file", "segment")
+
+_SHARD_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+
+
+def file_key(path: Path, root: Path) -> str:
+    """Name of a file that is the same on every machine, relative to the root"""
+    try:
+        return path.resolve().relative_to(root.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def segment_key(segment: CodeSegment, root: Path) -> str:
+    """Code path of a segment with its file name relative to the root"""
+    path = segment.code_path.removeprefix(str(segment.file_path))
+    return file_key(segment.file_path, root) + path
+
+
+def _bucket(key: str, count: int) -> int:
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def weighted_buckets(weights: Mapping[str, float | None], count: int) -> dict[str, int]:
+    """Spread keys over `count` buckets of about the same total weight
+
+    Heaviest keys are placed first, each in the lightest bucket so far. Keys
+    without a weight get the mean of the known ones.
+    """
+    known = [w for w in weights.values() if w is not None]
+    default = mean(known) if known else 1.0
+    loads = [0.0] * count
+    buckets = {}
+    for key, weight in sorted(
+        ((k, default if w is None else w) for k, w in weights.items()),
+        key=lambda item: (-item[1], item[0]),
+    ):
+        bucket = loads.index(min(loads))
+        buckets[key] = bucket
+        loads[bucket] += weight
+    return buckets
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One of `count` deterministic parts of the files (or segments) of a path"""
+
+    index: int  # From 0
+    count: int
+    unit: str = "file"
+
+    @staticmethod
+    def parse(spec: str, unit: str = "file") -> Shard:
+        """Parse a 1-based `i/N` shard specification"""
+        match = _SHARD_RE.match(spec)
+        if match is None:
+            raise ValueError(f"Invalid shard '{spec}', expected 'i/N'.")
+        number, count = int(match.group(1)), int(match.group(2))
+        if not 1 <= number <= count:
+            raise ValueError(f"Invalid shard '{spec}', i must be between 1 and N.")
+        if unit not in SHARD_UNITS:
+            raise ValueError(f"Invalid shard unit '{unit}'.")
+        return Shard(number - 1, count, unit)
+
+    def __str__(self) -> str:
+        return f"{self.index + 1}/{self.count}"
+
+    def files(
+        self,
+        files: Iterable[Path],
+        root: Path,
+        timings: Mapping[str, float] | None = None,
+    ) -> list[Path]:
+        """The files of this shard, balanced by the `timings` of a previous run"""
+        files = list(files)
+        if self.unit != "file":
+            return files
+        keys = {file: file_key(file, root) for file in files}
+        if timings:
+            buckets = weighted_buckets(
+                {key: timings.get(key) for key in keys.values()}, self.count
+            )
+            return [file for file in files if buckets[keys[file]] == self.index]
+        return [file for file in files if _bucket(keys[file], self.count) == self.index]
+
+    def segments(
+        self, segments: Iterable[CodeSegment], root: Path
+    ) -> Iterator[CodeSegment]:
+        """The segments of this shard, all of them when sharding files"""
+        return (segment for segment in segments if self.includes(segment, root))
+
+    def includes(self, segment: CodeSegment, root: Path) -> bool:
+        """Whether a segment of the files of this shard is in it"""
+        return (
+            self.unit != "segment"
+            or _bucket(segment_key(segment, root), self.count) == self.index
+        )
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import logging
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+from pydolce.core.parser import CodeSegment, CodeSegmentType
+from pydolce.core.spelling import code_identifiers, identifier_words
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+MIN_SUMMARY_TERMS = 2  # Shorter summaries are not scored
+VOCABULARY_VERSION = 2
+
+# Classes and modules would count the terms of their methods again
+DOCUMENT_TYPES = (CodeSegmentType.Function, CodeSegmentType.Method)
+
+_WORD_RE = re.compile(r"[A-Za-z]+")
+_STEM_SUFFIXES = ("ations", "ation", "ings", "ing", "ers", "er", "ed", "es", "s", "ly")
+
+# Words of docstring summaries that say nothing about the behavior of the code
+STOPWORDS = frozenset(
+    """
+    a about above after all also an and any are as at be been being by can
+    could do does each either else for from given has have how if in into is
+    it its may might more most must no not of on one only or other otherwise
+    over same should so some such than that the their them then there these
+    they this those through to too under until up upon use used uses using
+    very was were what when where whether which while who will with within
+    without would yet you your
+
+    argument arguments attribute attributes class code data default defaults
+    function functions get gets helper instance method methods none object
+    objects optional optionally param parameter parameters property provided
+    return returned returns self specified true false value values
+    """.split()
+)
+
+
+def stem(word: str) -> str:
+    """Strip the most common suffixes of a lowercase word"""
+    for suffix in _STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            break
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def _terms(words: Iterable[str]) -> list[str]:
+    return [
+        stem(word)
+        for word in (w.lower() for w in words)
+        if len(word) > 2 and word not in STOPWORDS
+    ]
+
+
+def summary_terms(segment: CodeSegment) -> set[str]:
+    """Stemmed content words of the docstring summary"""
+    doc = segment.parsed_doc
+    summary = doc.short_description if doc is not None else None
+    return set(_terms(_WORD_RE.findall(summary or segment.doc)))
+
+
+def _called_names(node: ast.AST) -> list[str]:
+    names = []
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            if isinstance(child.func, ast.Name):
+                names.append(child.func.id)
+            elif isinstance(child.func, ast.Attribute):
+                names.append(child.func.attr)
+    return names
+
+
+def code_terms(segment: CodeSegment) -> Counter[str]:
+    """Stemmed words of the identifiers, called names and strings of the code
+
+    Called names count twice, as they tell the most about what the code does.
+    """
+    node = segment.code_node
+    if node is None:
+        return Counter()
+
+    words = list(identifier_words(code_identifiers(node)))
+    words.extend(identifier_words(_called_names(node)))
+    docstring = None
+    if isinstance(
+        node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Module)
+    ):
+        docstring = ast.get_docstring(node, clean=False)
+    for child in ast.walk(node):
+        if isinstance(child, ast.Constant) and isinstance(child.value, str):
+            if child.value != docstring:
+                words.extend(_WORD_RE.findall(child.value))
+    return Counter(_terms(words))
+
+
+class Vocabulary:
+    """Document frequencies of code terms over the functions of a project
+
+    The frequencies are kept per file and updated with the segments of each
+    file as a run parses it. They are stored in `.pydolce/cache/vocabulary.json`
+    so that the segments checked before the end of parsing are already scored
+    against the previous frequencies of the whole project.
+    """
+
+    def __init__(self, files: dict[str, dict] | None = None) -> None:
+        # path -> {"docs", "length", "df"}
+        self.files: dict[str, dict] = files or {}
+        self.n_docs = 0
+        self.length = 0
+        self.df: Counter[str] = Counter()
+        for entry in self.files.values():
+            self._count(entry, 1)
+
+    @property
+    def avg_length(self) -> float:
+        return self.length / self.n_docs if self.n_docs else 0.0
+
+    def _count(self, entry: dict, sign: int) -> None:
+        self.n_docs += sign * entry["docs"]
+        self.length += sign * entry["length"]
+        for term, df in entry["df"].items():
+            self.df[term] += sign * df
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency, terms never seen get the highest"""
+        df = max(self.df.get(term, 0), 0)
+        return math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+    def add_file(self, path: Path, segments: Iterable[CodeSegment]) -> None:
+        """Count the segments of a file, replacing its previous counts"""
+        df: Counter[str] = Counter()
+        docs = 0
+        length = 0
+        for segment in segments:
+            if segment.seg_type not in DOCUMENT_TYPES:
+                continue
+            terms = code_terms(segment)
+            docs += 1
+            length += sum(terms.values())
+            df.update(terms.keys())
+
+        key = str(path.resolve())
+        entry = {"docs": docs, "length": length, "df": dict(df)}
+        previous = self.files.get(key)
+        if previous is not None:
+            self._count(previous, -1)
+        self.files[key] = entry
+        self._count(entry, 1)
+
+    def totals(self) -> dict:
+        """The counts of every file together, as an entry of a single file"""
+        df = {term: count for term, count in self.df.items() if count > 0}
+        return {"docs": self.n_docs, "length": self.length, "df": df}
+
+    @staticmethod
+    def load(cache_file: Path) -> Vocabulary:
+        """The vocabulary stored by a previous run, empty if there is none"""
+        if cache_file.exists():
+            try:
+                data = json.loads(cache_file.read_text("utf-8"))
+                if data.get("version") == VOCABULARY_VERSION:
+                    return Vocabulary(data["files"])
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Failed to load vocabulary file: %s", e)
+        return Vocabulary()
+
+    def save(self, cache_file: Path) -> None:
+        data = {"version": VOCABULARY_VERSION, "files": self.files}
+        try:
+            cache_file.write_text(json.dumps(data), "utf-8")
+        except OSError as e:
+            logger.warning("Failed to write vocabulary file: %s", e)
+
+
+def in_audit_sample(segment: CodeSegment, rate: float) -> bool:
+    """Whether a segment is in the audit sample, the same one on every run"""
+    digest = hashlib.sha256(segment.code_str.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") < rate * 2**32
+
+
+def agreement(
+    segment: CodeSegment, vocabulary: Vocabulary | None = None
+) -> float | None:
+    """How much of the docstring summary is reflected in the code, from 0 to 1
+
+    Summary terms are weighted by their BM25 IDF and scored with the BM25 term
+    frequency saturation, capped so that a term found once in a segment of
+    average length counts fully. Summaries with too few content words cannot
+    be scored and give None.
+    """
+    query = summary_terms(segment)
+    if len(query) < MIN_SUMMARY_TERMS:
+        return None
+
+    vocabulary = vocabulary or Vocabulary()
+    doc = code_terms(segment)
+    length_norm = 1.0
+    if vocabulary.avg_length:
+        length_norm = 1 - B + B * sum(doc.values()) / vocabulary.avg_length
+
+    score = 0.0
+    total = 0.0
+    for term in query:
+        idf = vocabulary.idf(term)
+        tf = doc.get(term, 0)
+        score += idf * min(1.0, tf * (K1 + 1) / (tf + K1 * length_norm))
+        total += idf
+    return score / total
@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import ast
+import functools
+import hashlib
+import logging
+import re
+from importlib import resources
+from pathlib import Path
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+MAX_EDIT_DISTANCE = 1
+PREFIX_LENGTH = 7
+SPELLING_VERSION = 2  # Of the rules accepting words, part of the fingerprint
+
+_CODE_RE = re.compile(
+    r"``.*?``"  # Inline literals
+    r"|`[^`]*`"  # Inline code and references
+    r"|:\w+:"  # Sphinx roles and fields
+    r"|\w+://\S+"  # URLs
+    r"|^\s*(>>>|\.\.\.).*$",  # Doctest lines
+    re.MULTILINE,
+)
+_STRIP_CHARS = "\"'()[]{},.;:!?*"
+_NOT_PROSE = re.compile(r"[^A-Za-z'\-]")
+_IDENTIFIER_PART_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])")
+
+_SUFFIXES = (
+    "'s",
+    "s",
+    "es",
+    "ed",
+    "d",
+    "ing",
+    "er",
+    "ers",
+    "ly",
+    "ness",
+    "ment",
+    "able",
+    "ably",
+    "ible",
+    "ibly",
+    "ation",
+    "al",
+    "y",
+)
+_PREFIXES = ("un", "re", "pre", "non", "sub", "de", "multi", "over", "in")
+_VOWELS = frozenset("aeiou")
+# Suffixes spelled either way depending on the stem, e.g. "readable" and
+# "accessible"
+_SUFFIX_VARIANTS = {
+    "able": ("able", "ible"),
+    "ible": ("able", "ible"),
+    "ably": ("ably", "ibly"),
+    "ibly": ("ably", "ibly"),
+}
+# British spellings and their American counterpart, of which the bundled word
+# list mostly has the latter, e.g. "authorised", "colour" or "centre"
+_BRITISH_SPELLINGS = (
+    (re.compile(r"is(e|ed|es|ing|er|ers|ation|ations)$"), r"iz\1"),
+    (re.compile(r"ys(e|ed|es|ing|er|ers)$"), r"yz\1"),
+    (re.compile(r"our"), "or"),
+    (re.compile(r"tre(s|d)?$"), r"ter\1"),
+    (re.compile(r"ogue(s)?$"), r"og\1"),
+    (re.compile(r"ence(s)?$"), r"ense\1"),
+)
+
+
+def _ends_with_consonant_y(stem: str) -> bool:
+    return len(stem) > 1 and stem[-1] == "y" and stem[-2] not in _VOWELS
+
+
+def _ends_with_cvc(stem: str) -> bool:
+    """Whether the final consonant of a stem may be doubled (as in occurred)"""
+    return (
+        len(stem) > 2
+        and stem[-1] not in _VOWELS | {"w", "x", "y"}
+        and stem[-2] in _VOWELS
+        and stem[-3] not in _VOWELS
+    )
+
+
+def _with_vowel_suffix(stem: str, suffix: str) -> set[str]:
+    if _ends_with_consonant_y(stem) and not suffix.startswith("i"):
+        return {stem[:-1] + "i" + suffix}
+    if stem.endswith("ie") and suffix == "ing":
+        return {stem[:-2] + "ying"}
+    if stem.endswith("e"):
+        if suffix.startswith("e"):
+            return {stem + suffix[1:]}
+        if stem.endswith(("ee", "ye", "oe")):
+            return {stem + suffix}
+        if stem.endswith(("ce", "ge")) and suffix.startswith("a"):
+            return {stem + suffix, stem[:-1] + suffix}  # e.g. "manageable"
+        return {stem[:-1] + suffix}
+    if _ends_with_cvc(stem):
+        return {stem + suffix, stem + stem[-1] + suffix}
+    return {stem + suffix}
+
+
+def _with_s(stem: str) -> set[str]:
+    if stem.endswith(("s", "x", "z", "ch", "sh")):
+        return {stem + "es"}
+    if _ends_with_consonant_y(stem):
+        return {stem[:-1] + "ies"}
+    return {stem + "s", stem + "es"} if stem.endswith("o") else {stem + "s"}
+
+
+def _with_ly(stem: str) -> set[str]:
+    if stem.endswith("le") and stem[-3:-2] not in _VOWELS:
+        return {stem[:-1] + "y"}  # e.g. "simply"
+    if _ends_with_consonant_y(stem):
+        return {stem[:-1] + "ily"}
+    if stem.endswith("ic"):
+        return {stem + "ally"}
+    if stem.endswith("ll"):
+        return {stem + "y"}
+    return {stem + "ly"}
+
+
+def _inflections(stem: str, suffix: str) -> set[str]:
+    """Spellings of a stem with a suffix that follow English rules
+
+    Whether a final consonant is doubled depends on stress, which is unknown,
+    so both spellings are returned.
+    """
+    if suffix == "'s":
+        return {stem + suffix}
+    if suffix in ("s", "es"):
+        return _with_s(stem)
+    if suffix == "ly":
+        return _with_ly(stem)
+    if suffix == "ness":
+        if _ends_with_consonant_y(stem):
+            return {stem[:-1] + "iness"}
+        return {stem + suffix}
+    if suffix == "ment":
+        return {stem + suffix}
+    if suffix == "ers":
+        return {form + "s" for form in _with_vowel_suffix(stem, "er")}
+    suffix = "ed" if suffix == "d" else suffix
+    forms: set[str] = set()
+    for variant in _SUFFIX_VARIANTS.get(suffix, (suffix,)):
+        forms |= _with_vowel_suffix(stem, variant)
+    return forms
+
+
+def _stems(base: str) -> set[str]:
+    """Stems a word may come from once a suffix is removed"""
+    stems = {base, base + "e", base + "le"}
+    if len(base) > 1 and base[-1] == base[-2]:
+        stems.add(base[:-1])  # Doubled final consonant
+    if base.endswith("i"):
+        stems.add(base[:-1] + "y")
+    if base.endswith("al"):
+        stems.add(base[:-2])  # e.g. "basically"
+    return stems
+
+
+def _deletes(word: str, distance: int) -> set[str]:
+    deletes = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        deletes |= frontier
+    return deletes
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance (Levenshtein with transpositions)"""
+    prev_prev: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev_prev[j - 2] + 1)
+        prev_prev, prev = prev, cur
+    return prev[-1]
+
+
+class SpellChecker:
+    """Dictionary lookups with symmetric delete suggestions
+
+    Every dictionary word is indexed by the strings obtained deleting up to
+    `max_distance` characters of its prefix. The candidates for an unknown word
+    are the words sharing one of its own deletes, which are then ranked by edit
+    distance. The index is only built when the first unknown word shows up.
+    """
+
+    def __init__(
+        self,
+        words: Iterable[str],
+        max_distance: int = MAX_EDIT_DISTANCE,
+        prefix_length: int = PREFIX_LENGTH,
+    ) -> None:
+        # Words come most frequent first, their rank breaks suggestion ties
+        self.words: dict[str, int] = {}
+        for word in words:
+            self.words.setdefault(word.lower(), len(self.words))
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.fingerprint = hashlib.sha256(
+            "\n".join([str(SPELLING_VERSION), *self.words]).encode("utf-8")
+        ).hexdigest()[:16]
+        self._index: dict[str, list[str]] | None = None
+
+    def _build_index(self) -> dict[str, list[str]]:
+        index: dict[str, list[str]] = {}
+        for word in self.words:
+            for delete in _deletes(word[: self.prefix_length], self.max_distance):
+                index.setdefault(delete, []).append(word)
+        return index
+
+    def _is_inflection(self, word: str, suffix: str) -> bool:
+        """Whether the word is a known stem correctly spelled with a suffix
+
+        When the dictionary has another spelling of the stem with the suffix
+        (e.g. "occurred" for "occured"), that one is the right spelling, unless
+        it is a final "l" that British and American English double differently.
+        """
+        base = word.removesuffix(suffix)
+        if base == word:
+            return False
+        for stem in _stems(base):
+            if len(stem) > 2 and stem in self.words:
+                forms = _inflections(stem, suffix)
+                if word in forms and (
+                    stem.endswith("l") or not any(form in self.words for form in forms)
+                ):
+                    return True
+        return False
+
+    def is_known(self, word: str) -> bool:
+        """Whether the word, or its American spelling, is known"""
+        if self._is_known_spelling(word):
+            return True
+        for pattern, replacement in _BRITISH_SPELLINGS:
+            american = pattern.sub(replacement, word)
+            if american != word and self._is_known_spelling(american):
+                return True
+        return False
+
+    def _is_known_spelling(self, word: str) -> bool:
+        """Whether the word, or the word without a common affix, is known"""
+        if word in self.words:
+            return True
+        if any(self._is_inflection(word, suffix) for suffix in _SUFFIXES):
+            return True
+        for prefix in _PREFIXES:
+            stem = word.removeprefix(prefix)
+            if stem != word and len(stem) > 4 and self._is_known_spelling(stem):
+                return True
+        return False
+
+    def suggest(self, word: str) -> str | None:
+        """The closest known word within the maximum edit distance
+
+        Missing, extra or swapped letters are more common typos than wrong
+        ones, so they are preferred, e.g. "which" for "wich" over "with".
+        """
+        if self._index is None:
+            self._index = self._build_index()
+
+        candidates: set[str] = set()
+        for delete in _deletes(word[: self.prefix_length], self.max_distance):
+            candidates.update(self._index.get(delete, ()))
+
+        best: tuple[int, bool, int, str] | None = None
+        for candidate in candidates:
+            if abs(len(candidate) - len(word)) > self.max_distance:
+                continue
+            distance = edit_distance(word, candidate)
+            if distance > self.max_distance:
+                continue
+            replaced = len(candidate) == len(word) and sorted(candidate) != sorted(word)
+            key = (distance, replaced, self.words[candidate], candidate)
+            if best is None or key < best:
+                best = key
+        return best[-1] if best is not None else None
+
+    def typos(
+        self, text: str, ignore: set[str] | None = None
+    ) -> Iterator[tuple[str, str]]:
+        """Misspelled words of a text and their suggestions
+
+        Words looking like code (identifiers, inline code, URLs, doctests) or
+        in `ignore` are skipped. Unknown words without a close suggestion are
+        considered names or jargon rather than typos.
+        """
+        ignore = ignore or set()
+        seen: set[str] = set()
+        for word in prose_words(text):
+            lower = word.lower()
+            if lower in seen or lower in ignore or self.is_known(lower):
+                continue
+            seen.add(lower)
+            suggestion = self.suggest(lower)
+            if suggestion is not None:
+                yield word, suggestion
+
+
+def prose_words(text: str) -> Iterator[str]:
+    """Words of a docstring text that are not code nor names"""
+    text = _CODE_RE.sub(" ", text)
+    sentence_start = True
+    for raw_token in text.split():
+        token = raw_token.strip(_STRIP_CHARS)
+        is_start = sentence_start
+        sentence_start = raw_token.endswith((".", "!", "?", ":"))
+        if _NOT_PROSE.search(token):
+            continue
+        # camelCase and ALLCAPS words are names, and so are capitalized words
+        # in the middle of a sentence
+        if any(c.isupper() for c in token[1:]) or (
+            token[:1].isupper() and not is_start
+        ):
+            continue
+        for word in token.split("-"):
+            word = word.strip("'").removesuffix("'s")
+            # Contractions are not in the word list
+            if len(word) >= 2 and "'" not in word:
+                yield word
+
+
+def identifier_words(names: Iterable[str]) -> set[str]:
+    """Lowercase words of identifiers, split on underscores and camel case"""
+    words: set[str] = set()
+    for name in names:
+        words.add(name.lower())
+        words.update(part.lower() for part in _IDENTIFIER_PART_RE.findall(name))
+    return words
+
+
+def code_identifiers(node: ast.AST | None) -> set[str]:
+    """Names defined or used in the code of a segment"""
+    if node is None:
+        return set()
+    names: set[str] = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            names.add(child.id)
+        elif isinstance(child, ast.Attribute):
+            names.add(child.attr)
+        elif isinstance(child, ast.arg):
+            names.add(child.arg)
+        elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(child.name)
+        elif isinstance(child, ast.alias):
+            names.update((child.asname or child.name).split("."))
+        elif isinstance(child, ast.keyword) and child.arg is not None:
+            names.add(child.arg)
+    return names
+
+
+def _read_words(text: str) -> list[str]:
+    return [
+        line.strip()
+        for line in text.splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
+
+
+@functools.lru_cache(maxsize=8)
+def get_spell_checker(
+    dictionaries: tuple[str, ...] = (), extra_words: tuple[str, ...] = ()
+) -> SpellChecker:
+    """The spell checker of the bundled word list and the project dictionaries"""
+    words = _read_words(
+        resources.files("pydolce").joinpath("data/words.txt").read_text("utf-8")
+    )
+    for dictionary in dictionaries:
+        try:
+            words.extend(_read_words(Path(dictionary).read_text("utf-8")))
+        except OSError as e:
+            logger.warning("Could not read dictionary %s: %s", dictionary, e)
+    words.extend(extra_words)
+    return SpellChecker(words)
+
+
+def spelling_fingerprint(
+    dictionaries: tuple[str, ...] = (), extra_words: tuple[str, ...] = ()
+) -> str:
+    """Hash of the words of the spell checker, which versions cached verdicts"""
+    return get_spell_checker(dictionaries, extra_words).fingerprint
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import rich
+
+
+@dataclass
+class LLMUsage:
+    """Tokens and timings of a single LLM call, as reported by the provider"""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0  # Prompt tokens served from the provider cache
+    latency: float = 0.0
+    time_to_first_token: float | None = None
+    cached: bool = False  # Served from the local response cache
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    cached_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    latency: float = 0.0
+    time_to_first_token: float = 0.0
+    ttft_samples: int = 0
+
+    def add(self, usage: LLMUsage) -> None:
+        self.calls += 1
+        self.cached_calls += usage.cached
+        self.prompt_tokens += usage.prompt_tokens
+        self.completion_tokens += usage.completion_tokens
+        self.cached_prompt_tokens += usage.cached_prompt_tokens
+        self.latency += usage.latency
+        if usage.time_to_first_token is not None:
+            self.time_to_first_token += usage.time_to_first_token
+            self.ttft_samples += 1
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "cached_calls": self.cached_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "latency": self.latency,
+            "mean_latency": self.latency / self.calls if self.calls else 0.0,
+            "mean_time_to_first_token": (
+                self.time_to_first_token / self.ttft_samples
+                if self.ttft_samples
+                else None
+            ),
+        }
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+@dataclass
+class RunStats:
+    """LLM usage and segment counters of a whole run
+
+    LLM calls are aggregated per run, per rule set (the rules sent together in
+    one prompt), per file and per segment. Counters track run events, such as
+    checked or skipped segments.
+    """
+
+    run: UsageTotals = field(default_factory=UsageTotals)
+    by_rule_set: dict[str, UsageTotals] = field(default_factory=dict)
+    by_file: dict[str, UsageTotals] = field(default_factory=dict)
+    by_segment: dict[str, UsageTotals] = field(default_factory=dict)
+    counters: Counter[str] = field(default_factory=Counter)
+    latencies: list[float] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_llm_call(
+        self, usage: LLMUsage, file: str, segment: str, rule_set: str
+    ) -> None:
+        with self._lock:
+            self.run.add(usage)
+            self.by_rule_set.setdefault(rule_set, UsageTotals()).add(usage)
+            self.by_file.setdefault(file, UsageTotals()).add(usage)
+            self.by_segment.setdefault(segment, UsageTotals()).add(usage)
+            if not usage.cached:
+                self.latencies.append(usage.latency)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += amount
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "elapsed": self.elapsed,
+                "counters": dict(self.counters),
+                "run": self.run.to_dict(),
+                "latency_p50": _percentile(self.latencies, 50),
+                "latency_p90": _percentile(self.latencies, 90),
+                "latency_p99": _percentile(self.latencies, 99),
+                "by_rule_set": {k: v.to_dict() for k, v in self.by_rule_set.items()},
+                "by_file": {k: v.to_dict() for k, v in self.by_file.items()},
+                "by_segment": {k: v.to_dict() for k, v in self.by_segment.items()},
+            }
+
+    def write_json(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=4))
+
+    def print_summary(self, top: int = 5) -> None:
+        data = self.to_dict()
+        run = data["run"]
+        rich.print("\n[bold]Stats:[/bold]")
+        rich.print(f"  Elapsed: {data['elapsed']:.2f}s")
+        for counter, value in sorted(data["counters"].items()):
+            rich.print(f"  {counter.replace('_', ' ').capitalize()}: {value}")
+        rich.print(
+            f"  LLM calls: {run['calls']} ({run['cached_calls']} from cache), "
+            f"prompt tokens: {run['prompt_tokens']} "
+            f"({run['cached_prompt_tokens']} cached by the provider), "
+            f"completion tokens: {run['completion_tokens']}"
+        )
+        if self.latencies:
+            rich.print(
+                f"  Latency p50 {data['latency_p50']:.2f}s, "
+                f"p90 {data['latency_p90']:.2f}s, p99 {data['latency_p99']:.2f}s"
+            )
+            if run["mean_time_to_first_token"] is not None:
+                rich.print(
+                    f"  Mean time to first token: "
+                    f"{run['mean_time_to_first_token']:.2f}s"
+                )
+
+        for title, totals in (
+            ("rule sets", self.by_rule_set),
+            ("files", self.by_file),
+            ("segments", self.by_segment),
+        ):
+            if not totals:
+                continue
+            rich.print(f"  [bold]Most expensive {title}:[/bold]")
+            ranked = sorted(
+                totals.items(), key=lambda kv: kv[1].total_tokens, reverse=True
+            )
+            for name, usage in ranked[:top]:
+                rich.print(
+                    f"    {name}: {usage.total_tokens} tokens, "
+                    f"{usage.calls} calls, {usage.latency:.2f}s"
+                )
@@ -1,5 +1,4 @@
 import ast
-import json
 
 import docstring_parser
 
@@ -7,7 +6,7 @@ from pydolce.config import DolceConfig
 from pydolce.core.client import LLMClient
 from pydolce.core.errors import LLMResponseError
 from pydolce.core.parser import CodeSegment, CodeSegmentType, ModuleHeaders
-from pydolce.core.utils import doc_style_from_str, extract_json_object
+from pydolce.core.utils import doc_style_from_str, load_json_object
 
 SYSTEM_DOC_SUGGESTION_TEMPLATE = """You are an expert Python understander. Your task is to suggest a description of certain elements of a given Python code.
 
@@ -33,7 +32,7 @@ USER_DOC_SUGGESTION_TEMPLATE = """```python
 
 def _extract_items_to_describe(
     segment: CodeSegment,
-) -> list[str] | None:
+) -> dict[str, str] | None:
     assert isinstance(
         segment.code_node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
     )
@@ -43,39 +42,57 @@ def _extract_items_to_describe(
     if node.name.startswith("_"):
         return None  # Skip private or protected functions
 
-    items = [
-        '"code_simple_description": [Header of the docstring. A brief short description of what it is this code for (not saying what does it do).]',
-    ]
+    items = {
+        "code_simple_description": "[Header of the docstring. A brief short description of what it is this code for (not saying what does it do).]",
+    }
 
     if segment.is_property() or segment.seg_type == CodeSegmentType.Class:
         return items
 
     for param in segment.params or {}:
-        items.append(f'"param_{param}": "[description of the parameter {param}]"')
+        items[f"param_{param}"] = f'"[description of the parameter {param}]"'
 
     if segment.is_generator and segment.generator_type:
-        items.append('"yields": "[description of the yielded value]"')
+        items["yields"] = '"[description of the yielded value]"'
     elif segment.returns and segment.returns != "None":
-        items.append('"return": "[description of the return value]"')
+        items["return"] = '"[description of the return value]"'
 
     # Dummy heuristic but good enough for now
     if "raise" in segment.code_str:
-        items.append(
-            '"raises": {dictionary with exception that the functions explicitly raises. Keys are the exception names and values are their descriptions. If no exceptions are raised, use an empty dictionary.}'
+        items["raises"] = (
+            "{dictionary with exception that the functions explicitly raises. Keys are the exception names and values are their descriptions. If no exceptions are raised, use an empty dictionary.}"
         )
 
     return items
 
 
+def _suggestion_schema(items_to_describe: dict[str, str]) -> dict:
+    properties: dict[str, dict] = {
+        key: {"type": "string"} for key in items_to_describe if key != "raises"
+    }
+    if "raises" in items_to_describe:
+        properties["raises"] = {
+            "type": "object",
+            "additionalProperties": {"type": "string"},
+        }
+    return {
+        "title": "docstring_suggestion",
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
 def _suggest(
     llm: LLMClient,
     segment: CodeSegment,
-    items_to_describe: list[str],
+    items_to_describe: dict[str, str],
     module_headers: ModuleHeaders | None = None,
 ) -> str:
     items_to_describe_str = (
         "{\n    "
-        + (",\n    ".join(items_to_describe) if items_to_describe else "")
+        + ",\n    ".join(f'"{key}": {hint}' for key, hint in items_to_describe.items())
         + "\n}"
     )
 
@@ -86,12 +103,17 @@ def _suggest(
     if module_headers is not None:
         user_prompt += f"\n\nModule context:\n```python\n{module_headers}\n```\n"
 
+    system_prompt = SYSTEM_DOC_SUGGESTION_TEMPLATE.format(
+        items_to_describe=items_to_describe_str
+    )
+    schema = _suggestion_schema(items_to_describe)
     suggestion = llm.generate(
-        prompt=user_prompt,
-        system=SYSTEM_DOC_SUGGESTION_TEMPLATE.format(
-            items_to_describe=items_to_describe_str
-        ),
+        prompt=user_prompt, system=system_prompt, schema=schema
     ).strip()
+
+    if load_json_object(suggestion) is None:
+        # Unusable responses must not be served again from the response cache
+        llm.discard_cached(prompt=user_prompt, system=system_prompt, schema=schema)
     return suggestion
 
 
@@ -172,12 +194,10 @@ def suggest_from_segment(
         module_headers=module_headers,
     )
 
-    sugg_json_str = extract_json_object(suggestion)
-    if not sugg_json_str:
+    sugg_json = load_json_object(suggestion)
+    if not sugg_json:
         raise LLMResponseError("No JSON object found in LLM response")
 
-    sugg_json = json.loads(sugg_json_str)
-
     _docstring_str = _build_temporal_docstring(segment, sugg_json)
 
     if not _docstring_str.find("\n"):
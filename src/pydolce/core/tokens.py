@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import ast
+import copy
+import re
+import threading
+
+# Words are split in chunks of about four characters by BPE tokenizers, while
+# punctuation and operators are usually a token on their own
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_CHARS_PER_TOKEN = 4
+
+ELIDED_MARKER = "# ... {lines} lines elided ..."
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens of a text without a tokenizer"""
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece[0].isalnum() or piece[0] == "_":
+            tokens += -(-len(piece) // _CHARS_PER_TOKEN)
+        else:
+            tokens += 1
+    return tokens
+
+
+class _BodyEliderTransformer(ast.NodeTransformer):
+    """Replace the body of nested functions by their docstring and `...`"""
+
+    def _elide(
+        self, node: ast.FunctionDef | ast.AsyncFunctionDef
+    ) -> ast.FunctionDef | ast.AsyncFunctionDef:
+        body: list[ast.stmt] = []
+        if ast.get_docstring(node, clean=False) is not None:
+            body.append(node.body[0])
+        body.append(ast.Expr(ast.Constant(...)))
+        node.body = body
+        return node
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.FunctionDef:
+        elided = self._elide(node)
+        assert isinstance(elided, ast.FunctionDef)
+        return elided
+
+    def visit_AsyncFunctionDef(
+        self, node: ast.AsyncFunctionDef
+    ) -> ast.AsyncFunctionDef:
+        elided = self._elide(node)
+        assert isinstance(elided, ast.AsyncFunctionDef)
+        return elided
+
+
+def _elide_nested_bodies(node: ast.ClassDef | ast.Module) -> str:
+    node = copy.deepcopy(node)
+    node.body = [_BodyEliderTransformer().visit(stmt) for stmt in node.body]
+    return ast.unparse(node)
+
+
+def _elide_lines(code: str, max_tokens: int) -> str:
+    """Keep the start (head and docstring) and the end of the code"""
+    lines = code.splitlines()
+    head_budget = max_tokens * 3 // 4
+    tail_budget = max_tokens - head_budget
+
+    head: list[str] = []
+    used = 0
+    for line in lines:
+        used += estimate_tokens(line) + 1
+        if used > head_budget:
+            break
+        head.append(line)
+
+    tail: list[str] = []
+    used = 0
+    for line in reversed(lines[len(head) :]):
+        used += estimate_tokens(line) + 1
+        if used > tail_budget:
+            break
+        tail.insert(0, line)
+
+    elided = len(lines) - len(head) - len(tail)
+    if elided <= 0:
+        return code
+    indent = ""
+    if tail:
+        indent = tail[0][: len(tail[0]) - len(tail[0].lstrip())]
+    marker = indent + ELIDED_MARKER.format(lines=elided)
+    return "\n".join([*head, marker, *tail])
+
+
+def elide_code(code: str, node: ast.AST | None, max_tokens: int) -> tuple[str, bool]:
+    """Shorten the code of a segment to fit in `max_tokens`
+
+    Classes and modules first lose the bodies of their methods and functions,
+    then the middle lines of whatever is left are dropped.
+
+    Returns:
+        tuple[str, bool]: The code and whether anything was elided.
+    """
+    if estimate_tokens(code) <= max_tokens:
+        return code, False
+
+    if isinstance(node, (ast.ClassDef, ast.Module)):
+        code = _elide_nested_bodies(node)
+        if estimate_tokens(code) <= max_tokens:
+            return code, True
+
+    return _elide_lines(code, max_tokens), True
+
+
+class TokenBudget:
+    """Tokens that the LLM calls of a run may spend
+
+    Calls reserve their estimated prompt tokens before being issued and settle
+    the reservation with the tokens actually used. Reservations that would
+    take the budget past its limit are refused, while smaller ones may still be
+    granted. A budget without limit grants every one.
+    """
+
+    def __init__(self, max_tokens: int | None = None) -> None:
+        self.max_tokens = max_tokens
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_tokens is not None and self.used >= self.max_tokens
+
+    def reserve(self, tokens: int) -> bool:
+        with self._lock:
+            if self.max_tokens is not None and self.used + tokens > self.max_tokens:
+                return False
+            self.used += tokens
+            return True
+
+    def settle(self, reserved: int, used: int) -> None:
+        with self._lock:
+            self.used += used - reserved
@@ -1,3 +1,5 @@
+import json
+
 from docstring_parser import DocstringStyle
 
 
@@ -34,6 +36,25 @@ def extract_json_object(text: str) -> str | None:
     return None
 
 
+def load_json_object(text: str) -> dict | None:
+    """Load the JSON object of an LLM response.
+
+    Structured responses are parsed directly, otherwise the first JSON object
+    found in the text is used.
+    """
+    try:
+        loaded = json.loads(text)
+    except json.JSONDecodeError:
+        json_str = extract_json_object(text)
+        if json_str is None:
+            return None
+        try:
+            loaded = json.loads(json_str)
+        except json.JSONDecodeError:
+            return None
+    return loaded if isinstance(loaded, dict) else None
+
+
 def doc_style_from_str(style_name: str) -> DocstringStyle | None:
     style_name = style_name.lower()
     if style_name in ["google", "google style"]:
@@ -1,16 +1,28 @@
-from typing import Annotated
+import json
+from pathlib import Path
+from typing import Annotated, Any
 
 import rich
 import typer
 
 import pydolce
 from pydolce.config import DolceConfig
+from pydolce.core.distributed import IDLE_TIMEOUT, LEASE_TIMEOUT, SECRET_ENV_VAR
 from pydolce.core.rules.rule import RuleGroup
 from pydolce.core.rules.rulesets import ALL_RULES
 
 app = typer.Typer()
 
 
+def _update_config(config: DolceConfig, **options: Any) -> None:
+    """Set the options given on the command line, validated with the others"""
+    config.update(**options)
+    try:
+        config.validate()
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+
+
 @app.command(help="Check docstrings in the specified Python file or directory")
 def check(
     path: Annotated[
@@ -35,17 +47,181 @@ def check(
             show_default=True,
         ),
     ] = None,
+    time_budget: Annotated[
+        float | None,
+        typer.Option(
+            help="Seconds to spend on the run, pending LLM checks are then deferred",
+        ),
+    ] = None,
+    fail_fast: Annotated[
+        bool,
+        typer.Option(
+            "--fail-fast",
+            help="Stop at the first segment with errors, same as --max-errors 1",
+            is_flag=True,
+        ),
+    ] = False,
+    max_errors: Annotated[
+        int | None,
+        typer.Option(help="Stop once this many segments have errors"),
+    ] = None,
+    sample: Annotated[
+        float | None,
+        typer.Option(
+            help="Share of the segments whose LLM rules are checked, rotating between runs",
+        ),
+    ] = None,
+    shard: Annotated[
+        str | None,
+        typer.Option(help="Check only the i-th of N parts of the project, as 'i/N'"),
+    ] = None,
+    shard_timings: Annotated[
+        str | None,
+        typer.Option(
+            help="JSON report of a previous run, its file timings balance the shards",
+        ),
+    ] = None,
+    stats: Annotated[
+        bool,
+        typer.Option(
+            "--stats",
+            help="Show token usage and latency of the LLM calls",
+            is_flag=True,
+        ),
+    ] = False,
+    stats_json: Annotated[
+        str | None,
+        typer.Option(help="Write token usage and latency stats as JSON to this path"),
+    ] = None,
+    report_json: Annotated[
+        str | None,
+        typer.Option(
+            help="Write the results and new cache entries as JSON to this path"
+        ),
+    ] = None,
 ) -> None:
     _config = DolceConfig.from_pyproject()
-    _config.update(ignore_missing=ignore_missing, model=model)
-    if no_llm:
-        _config.update(url="")
+    _update_config(
+        _config,
+        ignore_missing=ignore_missing,
+        model=model,
+        time_budget=time_budget,
+        max_errors=1 if fail_fast else max_errors,
+        sample=sample,
+        shard=shard,
+        shard_timings=shard_timings,
+        url="" if no_llm else None,
+    )
     pydolce.check(
         path=path,
         config=_config,
+        show_stats=stats,
+        stats_json=stats_json,
+        report_json=report_json,
+    )
+
+
+@app.command(
+    name="merge-results",
+    help="Merge the JSON reports of sharded check runs, and their cache entries",
+)
+def merge_results(
+    reports: Annotated[
+        list[str],
+        typer.Argument(help="JSON reports written by `check --report-json`"),
+    ],
+    output: Annotated[
+        str | None,
+        typer.Option("--output", "-o", help="Write the merged report to this path"),
+    ] = None,
+    update_cache: Annotated[
+        bool,
+        typer.Option(help="Add the cache entries of the reports to the local cache"),
+    ] = True,
+) -> None:
+    pydolce.merge_results(reports, DolceConfig.from_pyproject(), output, update_cache)
+
+
+@app.command(
+    help="Check the static rules, then serve the LLM checks to `dolce worker` processes",
+)
+def coordinate(
+    path: Annotated[
+        str,
+        typer.Argument(
+            help="Path to the Python file or directory to check",
+        ),
+    ] = ".",
+    host: Annotated[
+        str, typer.Option(help="Address to serve the work on")
+    ] = "127.0.0.1",
+    port: Annotated[int, typer.Option(help="Port to serve the work on")] = 8765,
+    lease_timeout: Annotated[
+        float,
+        typer.Option(
+            help="Seconds before the work of a silent worker is handed out again"
+        ),
+    ] = LEASE_TIMEOUT,
+    idle_timeout: Annotated[
+        float,
+        typer.Option(
+            help="Seconds without any worker before the work left is given up on"
+        ),
+    ] = IDLE_TIMEOUT,
+    secret: Annotated[
+        str | None,
+        typer.Option(
+            envvar=SECRET_ENV_VAR,
+            help="Secret workers must send, required unless serving on localhost",
+        ),
+    ] = None,
+    stats: Annotated[
+        bool,
+        typer.Option("--stats", help="Print run stats", is_flag=True),
+    ] = False,
+    report_json: Annotated[
+        str | None,
+        typer.Option(
+            help="Write the results and new cache entries as JSON to this path"
+        ),
+    ] = None,
+) -> None:
+    pydolce.coordinate(
+        path,
+        DolceConfig.from_pyproject(),
+        host=host,
+        port=port,
+        lease_timeout=lease_timeout,
+        idle_timeout=idle_timeout,
+        show_stats=stats,
+        report_json=report_json,
+        secret=secret,
     )
 
 
+@app.command(help="Check the LLM rules of the segments served by `dolce coordinate`")
+def worker(
+    url: Annotated[
+        str, typer.Argument(help="URL of the coordinator, e.g. http://host:8765")
+    ],
+    batch_size: Annotated[int, typer.Option(help="Segments leased at once")] = 8,
+    name: Annotated[
+        str | None, typer.Option(help="Name of the worker, host and pid by default")
+    ] = None,
+    model: Annotated[
+        str | None,
+        typer.Option("--model", help="Model name to use"),
+    ] = None,
+    secret: Annotated[
+        str | None,
+        typer.Option(envvar=SECRET_ENV_VAR, help="Secret of the coordinator"),
+    ] = None,
+) -> None:
+    _config = DolceConfig.from_pyproject()
+    _update_config(_config, model=model)
+    pydolce.worker(url, _config, batch_size=batch_size, name=name, secret=secret)
+
+
 @app.command(
     help="Suggest docstrings for functions/methods without docstrings",
 )
@@ -65,7 +241,7 @@ def suggest(
     ] = None,
 ) -> None:
     _config = DolceConfig.from_pyproject()
-    _config.update(ensure_style=style)
+    _update_config(_config, ensure_style=style)
 
     if not _config.url:
         rich.print(
@@ -113,7 +289,7 @@ def format_docs(
             )
             return
         style = _config.ensure_style
-    _config.update(ensure_style=style)
+    _update_config(_config, ensure_style=style)
     pydolce.format_docs(path, _config)
 
 
@@ -133,6 +309,87 @@ def rules() -> None:
         )
 
 
+@app.command(
+    help="Benchmark dolce throughput against a mock LLM over a synthetic repository",
+)
+def bench(
+    provider: Annotated[
+        str,
+        typer.Option(help="Wire format of the mock LLM: ollama, openai or anthropic"),
+    ] = "ollama",
+    files: Annotated[int, typer.Option(help="Number of synthetic files")] = 20,
+    segments_per_file: Annotated[
+        int, typer.Option(help="Top level definitions per synthetic file")
+    ] = 10,
+    latency: Annotated[
+        str,
+        typer.Option(
+            help="Mock latency distribution in seconds, e.g. 'constant:0.05', "
+            "'uniform:0.02,0.2', 'normal:0.1,0.02' or 'lognormal:-3,0.5'"
+        ),
+    ] = "constant:0.05",
+    error_rate: Annotated[
+        float, typer.Option(help="Fraction of mock requests that fail")
+    ] = 0.0,
+    concurrency: Annotated[
+        int | None, typer.Option(help="Parallel LLM requests")
+    ] = None,
+    seed: Annotated[int, typer.Option(help="Seed of the synthetic data")] = 0,
+    json_output: Annotated[
+        str | None,
+        typer.Option("--json", help="Write the results as JSON to this path"),
+    ] = None,
+) -> None:
+    from pydolce.bench.runner import print_benchmark, run_benchmark
+
+    results = run_benchmark(
+        provider=provider,
+        files=files,
+        segments_per_file=segments_per_file,
+        latency=latency,
+        error_rate=error_rate,
+        concurrency=concurrency,
+        seed=seed,
+    )
+    print_benchmark(results)
+    if json_output:
+        Path(json_output).write_text(
+            json.dumps([result.to_dict() for result in results], indent=4)
+        )
+
+
+@app.command(
+    name="mock-server",
+    help="Serve a mock LLM speaking the Ollama, OpenAI and Anthropic APIs",
+)
+def mock_server(
+    port: Annotated[int, typer.Option(help="Port to listen on")] = 11434,
+    latency: Annotated[
+        str, typer.Option(help="Mock latency distribution in seconds")
+    ] = "constant:0.05",
+    error_rate: Annotated[
+        float, typer.Option(help="Fraction of requests that fail")
+    ] = 0.0,
+) -> None:
+    from pydolce.bench.mock_server import (
+        LatencyDistribution,
+        MockLLMServer,
+        MockServerConfig,
+    )
+
+    server = MockLLMServer(
+        MockServerConfig(
+            latency=LatencyDistribution.from_str(latency), error_rate=error_rate
+        ),
+        port=port,
+    )
+    rich.print(f"[green]Mock LLM listening on {server.url}[/green]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
 @app.callback()
 def main_callback() -> None:
     version = pydolce.__version__
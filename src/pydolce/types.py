@@ -3,7 +3,8 @@ from __future__ import annotations
 from typing import Callable, Generator
 
 from pydolce.core.parser import CodeSegment
-from pydolce.core.rules.checkers.common import CheckContext, CheckResult
+from pydolce.core.rules.checkers.common import CheckContext, CheckResult, Prescreen
 
 RuleChecker = Callable[[CodeSegment, CheckContext], Generator[CheckResult]]
 LLMRulePrompter = Callable[[CodeSegment, CheckContext], str | None]
+LLMRulePrescreener = Callable[[CodeSegment, CheckContext], Prescreen]
@@ -351,3 +351,34 @@ def test_unnecessary_yield(func_code_segments: Callable, ctx: CheckContext) -> N
     for result in unnecessary_yield(segment, ctx):
         assert result is not None
         assert result.is_bad
+
+
+def test_segment_facts_are_computed_once(
+    property_code_segments: Callable, ctx: CheckContext
+) -> None:
+    code = '''
+    class A:
+        @property
+        def value(self, scale: Int) -> int:
+            """The value.
+
+            Args:
+                scale (int): The scale.
+                offset (int): The offset.
+            """
+            return 1
+    '''
+    segment = property_code_segments(code)[0]
+
+    facts = segment.facts
+    assert segment.facts is facts
+    assert facts.declared_params == ("scale",)
+    assert facts.documented_params == {"scale", "offset"}
+    assert facts.normalized_param_types["scale"] == "int"
+    assert facts.is_property
+    assert not facts.has_return_doc
+
+    assert list(wrong_param_type(segment, ctx)) == []
+    assert [r.issue for r in params_does_not_exist(segment, ctx)] == [
+        "Parameter 'offset' documented but not in signature."
+    ]
@@ -0,0 +1,151 @@
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from pydolce.config import DolceConfig
+from pydolce.core.cache import CacheHandler
+from pydolce.core.rules.checkers.content import (
+    description_spelling,
+    param_desc_spelling,
+    return_desc_spelling,
+)
+from pydolce.core.rules.rule import CheckContext
+from pydolce.core.rules.rulesets import RULE_BY_REF
+from pydolce.core.spelling import SpellChecker, get_spell_checker
+
+
+def test_description_spelling(func_code_segments: Callable, ctx: CheckContext) -> None:
+    def func_with_typos(a: int) -> int:
+        """Retrun the dobule of an intger."""
+        return a * 2
+
+    segment = func_code_segments(func_with_typos)[0]
+
+    issues = [r.issue for r in description_spelling(segment, ctx) if r.is_bad]
+
+    assert issues == [
+        "'Retrun' (did you mean 'return'?)",
+        "'dobule' (did you mean 'double'?)",
+        "'intger' (did you mean 'integer'?)",
+    ]
+
+
+def test_spelling_skips_code_and_names(
+    func_code_segments: Callable, ctx: CheckContext
+) -> None:
+    def parse_cfg(cfg_txt: str) -> dict:
+        """Parse the cfg txt with ``tomlib`` into a dict, see https://tomll.io.
+
+        Uses parseCfg from Ollama and returns CFGS.
+        """
+        return {}
+
+    segment = func_code_segments(parse_cfg)[0]
+
+    assert all(r.is_good for r in description_spelling(segment, ctx))
+
+
+def test_param_and_return_desc_spelling(
+    func_code_segments: Callable, ctx: CheckContext
+) -> None:
+    def add(a: int, b: int) -> int:
+        """Add two integers.
+
+        Args:
+            a (int): Te first integer.
+            b (int): The second integer.
+
+        Returns:
+            int: The sum of the two integres.
+        """
+        return a + b
+
+    segment = func_code_segments(add)[0]
+
+    param_issues = [r.issue for r in param_desc_spelling(segment, ctx) if r.is_bad]
+    return_issues = [r.issue for r in return_desc_spelling(segment, ctx) if r.is_bad]
+
+    assert param_issues == ["'Te' (did you mean 'the'?)"]
+    assert return_issues == ["'integres' (did you mean 'integers'?)"]
+
+
+def test_project_dictionary(func_code_segments: Callable, tmp_path: Path) -> None:
+    def run() -> None:
+        """Run the dolcer."""
+
+    dictionary = tmp_path / "words.txt"
+    dictionary.write_text("# Project words\ndolcer\n")
+    segment = func_code_segments(run)[0]
+    ctx = CheckContext(config=DolceConfig(spelling_dictionaries=[str(dictionary)]))
+
+    assert not any(r.is_bad for r in description_spelling(segment, ctx))
+
+
+def test_symmetric_delete_suggestions() -> None:
+    checker = SpellChecker(["the", "parameter", "return", "ta"])
+
+    assert checker.suggest("retrun") == "return"
+    assert checker.suggest("paramter") == "parameter"
+    assert checker.suggest("te") == "the"
+    assert checker.suggest("xyz") is None
+    assert checker.is_known("returned")
+
+
+def test_inflections_follow_english_rules() -> None:
+    checker = get_spell_checker()
+    misspellings = {
+        "occured": "occurred",
+        "begining": "beginning",
+        "refered": "referred",
+        "transfered": "transferred",
+        "definitly": "definitely",
+        "accessable": "accessible",
+    }
+
+    assert not any(checker.is_known(word) for word in misspellings)
+    assert {word: checker.suggest(word) for word in misspellings} == misspellings
+    assert checker.suggest("wich") == "which"
+    for word in ["stopped", "running", "definitely", "labelled", "canceled"]:
+        assert checker.is_known(word), word
+
+
+def test_british_spellings_are_known(
+    func_code_segments: Callable, ctx: CheckContext
+) -> None:
+    def authorise(user: str) -> None:
+        """Check the behaviour of the authorised user at the centre of the organisation.
+
+        Args:
+            user (str): The user whose favourite colour is catalogued.
+        """
+
+    checker = get_spell_checker()
+    segment = func_code_segments(authorise)[0]
+
+    for word in ["optimise", "analysed", "licence", "catalogue", "centres"]:
+        assert checker.is_known(word), word
+    assert not [r for r in description_spelling(segment, ctx) if r.is_bad]
+    assert not [r for r in param_desc_spelling(segment, ctx) if r.is_bad]
+    assert not checker.is_known("behavour")
+    assert not checker.is_known("seperate")
+
+
+def test_cached_verdicts_depend_on_spelling_words(
+    func_code_segments: Callable, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def run() -> None:
+        """Run the dolcer."""
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    segment = func_code_segments(run)[0]
+    rule = RULE_BY_REF["DCE401"]
+    config = DolceConfig(target=["DCE401"])
+    results = list(description_spelling(segment, CheckContext(config=config)))
+    config.cache_handler.set_report(segment, {rule: results})
+    config.cache_handler.sync_cache()
+
+    assert CacheHandler(config.rule_versions).get_report(segment) == {rule: results}
+    config = DolceConfig(target=["DCE401"], spelling_words=["dolcer"])
+    assert not CacheHandler(config.rule_versions).get_report(segment)
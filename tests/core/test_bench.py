@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from pydolce.bench.mock_server import (
+    MOCK_MODEL,
+    LatencyDistribution,
+    MockLLMServer,
+    MockServerConfig,
+)
+from pydolce.bench.runner import run_benchmark
+from pydolce.core.check import build_check_system_prompt
+from pydolce.core.client import LLMClient, LLMConfig, LLMError, ProviderType
+from pydolce.core.prompts import CHECK_RESPONSE_SCHEMA
+from pydolce.core.rules.rulesets import RULE_BY_REF
+
+
+@pytest.mark.parametrize(
+    "provider", [ProviderType.OLLAMA, ProviderType.OPENAI, ProviderType.ANTHROPIC]
+)
+def test_mock_server_speaks_provider_formats(provider: ProviderType) -> None:
+    system = build_check_system_prompt({RULE_BY_REF["DCE501"]: "Prompt"})
+    config = MockServerConfig(rules=[("sends_sms", '{"status": "BAD"}')])
+
+    with MockLLMServer(config) as server:
+        client = LLMClient(
+            LLMConfig(
+                base_url=server.url,
+                model=MOCK_MODEL,
+                provider=provider,
+                structured_output=True,
+            )
+        )
+        good = client.generate(
+            "def f(): pass", system=system, schema=CHECK_RESPONSE_SCHEMA
+        )
+        bad = client.generate("def sends_sms(): pass", system=system)
+
+    assert json.loads(good)["status"] == "GOOD"
+    assert json.loads(bad)["status"] == "BAD"
+    assert len(server.latencies) == 2
+
+
+def test_mock_server_error_rate() -> None:
+    with MockLLMServer(MockServerConfig(error_rate=1.0)) as server:
+        client = LLMClient(
+            LLMConfig(
+                base_url=server.url,
+                model=MOCK_MODEL,
+                provider=ProviderType.OLLAMA,
+                max_retries=2,
+                retry_delay=0.0,
+            )
+        )
+        with pytest.raises(LLMError):
+            client.generate("Hi")
+
+    assert server.errors == 2
+
+
+def test_latency_distribution_from_str() -> None:
+    assert LatencyDistribution.from_str("uniform:0.1,0.2").params == (0.1, 0.2)
+    with pytest.raises(ValueError):
+        LatencyDistribution.from_str("uniform:0.1")
+
+
+def test_run_benchmark() -> None:
+    results = run_benchmark(files=2, segments_per_file=3, latency="constant:0")
+
+    cold, warm, suggest = results
+    assert cold.segments == warm.segments > 0
+    assert cold.requests > 0
+    assert warm.requests == 0
+    assert suggest.requests == suggest.segments
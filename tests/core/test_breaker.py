@@ -0,0 +1,83 @@
+from typing import Callable
+
+import pytest
+import requests
+from pytest_mock import MockerFixture
+
+from pydolce.core.breaker import CircuitBreaker, CircuitState
+from pydolce.core.check import LLM_UNAVAILABLE_ISSUE, check_segment
+from pydolce.core.client import LLMClient, LLMConfig, LLMUnavailableError, ProviderType
+from pydolce.core.rules.rule import CheckContext, LLMRule
+from pydolce.core.rules.rulesets import ALL_RULES
+
+
+def test_breaker_opens_and_probes() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow()
+
+    breaker.reset_timeout = 0.0
+    assert breaker.allow()  # Half-open probe
+    assert not breaker.allow()  # Only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.fixture
+def down_client(mocker: MockerFixture) -> LLMClient:
+    mocker.patch(
+        "pydolce.core.client.requests.post",
+        side_effect=requests.exceptions.ConnectionError("down"),
+    )
+    mocker.patch("pydolce.core.client.time.sleep")
+    return LLMClient(
+        LLMConfig(
+            base_url="http://localhost:11434",
+            model="qwen3:8b",
+            provider=ProviderType.OLLAMA,
+            max_retries=3,
+            circuit_breaker_threshold=2,
+        )
+    )
+
+
+def test_open_breaker_fails_fast(down_client: LLMClient) -> None:
+    with pytest.raises(LLMUnavailableError):
+        down_client.generate("Hi")
+    with pytest.raises(LLMUnavailableError):
+        down_client.generate("Hi")
+
+    assert down_client.breaker.is_open
+
+
+def test_check_segment_degrades_to_static_rules(
+    down_client: LLMClient, func_code_segments: Callable, ctx: CheckContext
+) -> None:
+    def documented(a: int) -> int:
+        """Return the argument.
+
+        Args:
+            a (int): The argument.
+
+        Returns:
+            int: The argument.
+        """
+        return a
+
+    segment = func_code_segments(documented)[0]
+
+    report = check_segment(segment, ALL_RULES, ctx, down_client)
+
+    llm_results = [
+        result
+        for rule, results in report.items()
+        if isinstance(rule, LLMRule)
+        for result in results
+    ]
+    assert llm_results
+    assert all(result.issue == LLM_UNAVAILABLE_ISSUE for result in llm_results)
+    assert any(not isinstance(rule, LLMRule) for rule in report)
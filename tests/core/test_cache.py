@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from pydolce.core.cache import ResponseCache
+from pydolce.core.client import LLMClient, LLMConfig, ProviderType
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite", max_entries=2)
+    cache.set("a", "response a")
+    cache.set("b", "response b")
+    cache.set("c", "response c")
+    assert cache.get("a") == "response a"  # Makes "b" the least recently used
+
+    cache.evict()
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "response a"
+
+
+def test_response_cache_expires_entries(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite", max_age=-1)
+    cache.set("a", "response a")
+
+    assert cache.get("a") is None
+
+
+def test_client_memoizes_deterministic_calls(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    post = mocker.patch("pydolce.core.client.requests.post")
+    post.return_value.json.return_value = {"response": "ok"}
+    config = LLMConfig(
+        base_url="http://localhost:11434",
+        model="qwen3:8b",
+        provider=ProviderType.OLLAMA,
+        temperature=0.0,
+    )
+    client = LLMClient(config, ResponseCache(tmp_path / "responses.sqlite"))
+
+    assert client.generate("Hi", system="System") == "ok"
+    assert client.generate("Hi", system="System") == "ok"
+    assert post.call_count == 1
+
+    client.generate("Hi", system="Other system")
+    client.generate("Hi", system="System", temperature=0.5)
+    assert post.call_count == 3
+
+    client.discard_cached("Hi", system="System")
+    client.generate("Hi", system="System")
+    assert post.call_count == 4
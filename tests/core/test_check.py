@@ -0,0 +1,160 @@
+from typing import Callable
+
+import pytest
+from pytest_mock import MockerFixture
+
+from pydolce.config import DolceConfig
+from pydolce.core.check import (
+    LLM_GATED_ISSUE,
+    TOKEN_BUDGET_ISSUE,
+    build_check_system_prompt,
+    check_llm_rules,
+    check_segment,
+)
+from pydolce.core.client import LLMResponse
+from pydolce.core.parser import CodeSegment
+from pydolce.core.rules.checkers.common import CheckContext, CheckResult
+from pydolce.core.rules.rule import LLMRule
+from pydolce.core.rules.rulesets import ALL_RULES, RULE_BY_REF
+from pydolce.core.stats import LLMUsage
+from pydolce.core.tokens import TokenBudget
+
+
+def test_check_system_prompt_is_deterministic() -> None:
+    llm_rules = [rule for rule in ALL_RULES if isinstance(rule, LLMRule)]
+    prompts = {rule: f"Prompt of {rule.reference}" for rule in llm_rules}
+    reversed_prompts = {rule: prompts[rule] for rule in reversed(llm_rules)}
+
+    prompt = build_check_system_prompt(prompts)
+
+    assert prompt == build_check_system_prompt(reversed_prompts)
+    assert prompt.index("DCE501") < prompt.index("DCE502")
+    assert prompt.endswith("- DCE502: Prompt of DCE502")
+
+
+def test_llm_rules_skipped_once_budget_is_exhausted(
+    mocker: MockerFixture,
+    ctx: CheckContext,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    segment = func_code_segments('def f():\n    """Do f."""\n    pass')[0]
+    llm = mocker.Mock()
+    ctx.budget = TokenBudget(1)
+    ctx.budget.reserve(1)
+    rules = [rule for rule in ALL_RULES if isinstance(rule, LLMRule)]
+
+    report = check_llm_rules(segment, ctx, llm, rules)
+
+    assert report is not None
+    assert report[RULE_BY_REF["DCE501"]][0].issue == TOKEN_BUDGET_ISSUE
+    # Code without side effects is cleared by the static prescreen of DCE502
+    assert report[RULE_BY_REF["DCE502"]][0].is_good
+    assert ctx.stats.counters["prompts_over_budget"] == 1
+    llm.complete.assert_not_called()
+
+
+def test_side_effect_rules_see_nested_bodies(
+    mocker: MockerFixture,
+    ctx: CheckContext,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    table = ", ".join(str(i) for i in range(100))
+    segment = func_code_segments(
+        f'''def f(a):
+    """Send a in the background."""
+    table = [{table}]
+
+    def helper(b):
+        import requests
+
+        requests.post(URL, data=b)
+
+    return threading.Thread(target=helper, args=(table[a],))
+'''
+    )[-1]
+    llm = mocker.Mock()
+    llm.complete.return_value = LLMResponse(
+        '{"status": "GOOD", "issues": [], "descr": []}', LLMUsage()
+    )
+
+    check_llm_rules(segment, ctx, llm, [RULE_BY_REF["DCE502"]])
+
+    prompt = llm.complete.call_args.kwargs["prompt"]
+    assert "requests.post(URL, data=b)" in prompt
+    assert "table = [0, 1, 2, ...]" in prompt
+
+
+def test_prescreened_side_effect_rules_leave_nested_bodies_compacted(
+    mocker: MockerFixture,
+    ctx: CheckContext,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    segment = func_code_segments(
+        '''def f(a):
+    """Build a function scaling numbers by a."""
+
+    def scale(b):
+        total = b * a
+        return total + 1
+
+    return scale
+'''
+    )[-1]
+    llm = mocker.Mock()
+    llm.complete.return_value = LLMResponse(
+        '{"status": "GOOD", "issues": [], "descr": []}', LLMUsage()
+    )
+
+    report = check_llm_rules(
+        segment, ctx, llm, [RULE_BY_REF["DCE501"], RULE_BY_REF["DCE502"]]
+    )
+
+    assert report is not None and report[RULE_BY_REF["DCE502"]][0].is_good
+    llm.complete.assert_called_once()
+    prompt = llm.complete.call_args.kwargs["prompt"]
+    assert "def scale(b)" in prompt
+    assert "total = b * a" not in prompt
+
+
+UNDOCUMENTED_PARAM = '''
+def send(address: str, body: str) -> None:
+    """Send an email.
+
+    Args:
+        address (str): The address.
+    """
+    smtp.send(address, body)
+'''
+
+
+def test_failing_gate_rules_skip_the_llm_rules(
+    mocker: MockerFixture,
+    ctx: CheckContext,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    segment = func_code_segments(UNDOCUMENTED_PARAM)[0]
+    llm = mocker.Mock()
+    gate = DolceConfig(llm_gate="skip").gate_rules
+
+    report = check_segment(segment, ALL_RULES, ctx, llm, gate=gate)
+
+    assert report[RULE_BY_REF["DCE301"]][0].is_bad
+    assert report[RULE_BY_REF["DCE501"]][0].issue == LLM_GATED_ISSUE
+    assert report[RULE_BY_REF["DCE502"]][0].issue == LLM_GATED_ISSUE
+    llm.complete.assert_not_called()
+
+    # Cached failures of gate rules gate the LLM rules too
+    cached = {RULE_BY_REF["DCE301"]: [CheckResult.bad("Undocumented")]}
+    report = check_segment(segment, ALL_RULES, ctx, llm, cached, gate)
+    assert RULE_BY_REF["DCE301"] not in report
+    assert report[RULE_BY_REF["DCE501"]][0].issue == LLM_GATED_ISSUE
+
+
+def test_llm_gate_validation() -> None:
+    assert DolceConfig().gate_rules == frozenset()
+    assert RULE_BY_REF["DCE301"] in DolceConfig(llm_gate="defer").gate_rules
+
+    with pytest.raises(ValueError, match="Invalid LLM gate policy"):
+        DolceConfig(llm_gate="later").validate()
+    with pytest.raises(ValueError, match="must be static rules"):
+        DolceConfig(llm_gate="skip", llm_gate_rules=["DCE501"]).validate()
@@ -0,0 +1,192 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+from pydolce.core.cache import PreflightCache
+from pydolce.core.client import LLMClient, LLMConfig, ProviderType
+from pydolce.core.prompts import CHECK_RESPONSE_SCHEMA
+from pydolce.core.suggest import _suggestion_schema
+
+
+def _mock_post(mocker: MockerFixture, response: dict) -> Any:
+    post = mocker.patch("pydolce.core.client.requests.post")
+    post.return_value.json.return_value = response
+    return post
+
+
+@pytest.fixture
+def anthropic_client() -> LLMClient:
+    return LLMClient(
+        LLMConfig(
+            base_url="https://api.anthropic.com",
+            model="claude",
+            provider=ProviderType.ANTHROPIC,
+            structured_output=True,
+        )
+    )
+
+
+def test_anthropic_caches_system_prompt(
+    mocker: MockerFixture, anthropic_client: LLMClient
+) -> None:
+    post = _mock_post(mocker, {"content": [{"type": "text", "text": "ok"}]})
+
+    assert anthropic_client.generate("Hi", system="System prompt") == "ok"
+
+    data = post.call_args.kwargs["json"]
+    assert data["system"][0]["text"] == "System prompt"
+    assert data["system"][0]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_anthropic_structured_output_forces_tool(
+    mocker: MockerFixture, anthropic_client: LLMClient
+) -> None:
+    post = _mock_post(
+        mocker,
+        {"content": [{"type": "tool_use", "input": {"status": "GOOD"}}]},
+    )
+
+    response = anthropic_client.generate("Hi", schema=CHECK_RESPONSE_SCHEMA)
+
+    data = post.call_args.kwargs["json"]
+    assert data["tools"][0]["input_schema"] == CHECK_RESPONSE_SCHEMA
+    assert data["tool_choice"] == {"type": "tool", "name": "check_report"}
+    assert response == '{"status": "GOOD"}'
+
+
+def test_ollama_structured_output_and_keep_alive(mocker: MockerFixture) -> None:
+    post = _mock_post(mocker, {"response": '{"status": "GOOD"}'})
+    client = LLMClient(
+        LLMConfig(
+            base_url="http://localhost:11434",
+            model="qwen3:8b",
+            provider=ProviderType.OLLAMA,
+            keep_alive="30m",
+            structured_output=True,
+        )
+    )
+
+    client.generate("Hi", system="System prompt", schema=CHECK_RESPONSE_SCHEMA)
+
+    data = post.call_args.kwargs["json"]
+    assert data["format"] == CHECK_RESPONSE_SCHEMA
+    assert data["keep_alive"] == "30m"
+
+
+def test_openai_structured_output_is_strict(mocker: MockerFixture) -> None:
+    post = _mock_post(mocker, {"choices": [{"message": {"content": "{}"}}]})
+    client = LLMClient(
+        LLMConfig(
+            base_url="https://api.openai.com/v1",
+            model="gpt",
+            provider=ProviderType.OPENAI,
+            structured_output=True,
+        )
+    )
+
+    client.generate("Hi", schema=CHECK_RESPONSE_SCHEMA)
+    json_schema = post.call_args.kwargs["json"]["response_format"]["json_schema"]
+    assert json_schema["schema"] == CHECK_RESPONSE_SCHEMA
+    assert json_schema["strict"] is True
+
+    client.generate("Hi", schema=_suggestion_schema({"raises": "..."}))
+    json_schema = post.call_args.kwargs["json"]["response_format"]["json_schema"]
+    assert json_schema["strict"] is False
+
+
+def test_schema_ignored_without_structured_output(mocker: MockerFixture) -> None:
+    post = _mock_post(mocker, {"choices": [{"message": {"content": "{}"}}]})
+    client = LLMClient(
+        LLMConfig(
+            base_url="http://localhost:8000/v1",
+            model="gpt",
+            provider=ProviderType.GENERIC_OPENAI,
+        )
+    )
+
+    client.generate("Hi", schema=CHECK_RESPONSE_SCHEMA)
+
+    assert "response_format" not in post.call_args.kwargs["json"]
+
+
+def test_preflight_lists_models_and_is_memoized(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    get = mocker.patch("pydolce.core.client.requests.get")
+    get.return_value.status_code = 200
+    post = mocker.patch("pydolce.core.client.requests.post")
+    client = LLMClient(
+        LLMConfig(
+            base_url="https://api.openai.com/v1",
+            model="gpt",
+            provider=ProviderType.OPENAI,
+        ),
+        preflight_cache=PreflightCache(ttl=60, cache_file=tmp_path / "pf.json"),
+    )
+
+    assert client.test_connection()
+    assert client.test_connection()
+
+    get.assert_called_once()
+    assert get.call_args.args[0] == "https://api.openai.com/v1/models"
+    post.assert_not_called()
+
+
+def test_preflight_falls_back_to_head(mocker: MockerFixture) -> None:
+    mocker.patch("pydolce.core.client.requests.get").return_value.status_code = 404
+    head = mocker.patch("pydolce.core.client.requests.head")
+    head.return_value.status_code = 200
+    client = LLMClient(
+        LLMConfig(
+            base_url="http://localhost:8000",
+            model="local",
+            provider=ProviderType.GENERIC_OPENAI,
+        )
+    )
+
+    assert client.test_connection()
+    head.assert_called_once()
+
+
+def test_anthropic_usage_includes_cached_prompt_tokens(
+    mocker: MockerFixture, anthropic_client: LLMClient
+) -> None:
+    _mock_post(
+        mocker,
+        {
+            "content": [{"type": "text", "text": "ok"}],
+            "usage": {
+                "input_tokens": 10,
+                "cache_read_input_tokens": 90,
+                "output_tokens": 5,
+            },
+        },
+    )
+
+    usage = anthropic_client.complete("Hi").usage
+
+    assert usage.prompt_tokens == 100
+    assert usage.cached_prompt_tokens == 90
+    assert usage.completion_tokens == 5
+    assert not usage.cached
+
+
+def test_ollama_usage_and_time_to_first_token(mocker: MockerFixture) -> None:
+    _mock_post(
+        mocker,
+        {
+            "response": "ok",
+            "prompt_eval_count": 42,
+            "eval_count": 7,
+            "load_duration": 100_000_000,
+            "prompt_eval_duration": 400_000_000,
+        },
+    )
+    client = LLMClient(LLMConfig(base_url="http://localhost:11434", model="m"))
+
+    usage = client.complete("Hi").usage
+
+    assert (usage.prompt_tokens, usage.completion_tokens) == (42, 7)
+    assert usage.time_to_first_token == pytest.approx(0.5)
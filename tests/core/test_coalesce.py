@@ -0,0 +1,118 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+import pydolce
+from pydolce.bench.mock_server import MOCK_MODEL, MockLLMServer, MockServerConfig
+from pydolce.config import DolceConfig
+from pydolce.core.coalesce import Coalescer
+
+HELPER = '''
+def send(address) -> bool:
+    """Send a message over the network.
+
+    Returns:
+        bool: Whether the message was sent.
+    """
+    return requests.post(address).ok
+'''
+
+
+def test_concurrent_callers_share_one_computation() -> None:
+    coalescer: Coalescer[int] = Coalescer()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 42
+
+    results: list[tuple[int, bool]] = []
+    first = threading.Thread(target=lambda: results.append(coalescer.get("k", compute)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(
+        target=lambda: results.append(coalescer.get("k", compute))
+    )
+    second.start()
+    release.set()
+    first.join()
+    second.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [(42, False), (42, True)]
+    assert coalescer.get("k", compute) == (42, True)
+
+
+def test_failures_are_not_shared() -> None:
+    coalescer: Coalescer[int] = Coalescer()
+
+    def fail() -> int:
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        coalescer.get("k", fail)
+    assert coalescer.get("k", lambda: 1) == (1, False)
+
+
+def test_waiters_compute_again_when_the_owner_fails() -> None:
+    coalescer: Coalescer[int] = Coalescer()
+    started = threading.Event()
+    release = threading.Event()
+
+    def interrupted() -> int:
+        started.set()
+        release.wait(5)
+        raise KeyboardInterrupt
+
+    errors: list[BaseException] = []
+
+    def _owner() -> None:
+        try:
+            coalescer.get("k", interrupted)
+        except BaseException as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=_owner)
+    owner.start()
+    started.wait(5)
+    results: list[tuple[int, bool]] = []
+    waiter = threading.Thread(
+        target=lambda: results.append(coalescer.get("k", lambda: 1))
+    )
+    waiter.start()
+    release.set()
+    owner.join()
+    waiter.join()
+
+    assert [type(e) for e in errors] == [KeyboardInterrupt]
+    assert results == [(1, False)]
+
+
+def test_identical_segments_are_checked_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    for i in range(3):
+        (tmp_path / f"copy{i}.py").write_text(f'"""Copy {i}."""\n{HELPER}')
+
+    with MockLLMServer(MockServerConfig()) as server:
+        config = DolceConfig(
+            url=server.url,
+            model=MOCK_MODEL,
+            provider="ollama",
+            concurrency=3,
+            llm_cache=False,
+            warm_up=False,
+        )
+        pydolce.check(".", config, stats_json="stats.json")
+
+    stats = (tmp_path / "stats.json").read_text()
+    assert '"duplicate_segments": 2' in stats
+    # One request for the helper, module docstrings have no LLM rules
+    assert len(server.latencies) == 1
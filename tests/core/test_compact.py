@@ -0,0 +1,71 @@
+from typing import Callable
+
+from pydolce.core.compact import compact_code
+from pydolce.core.parser import CodeSegment
+
+
+def test_compact_code(func_code_segments: Callable[[str], list[CodeSegment]]) -> None:
+    long_text = "x" * 200
+    table = ", ".join(str(i) for i in range(100))
+    mapping = ", ".join(f"'k{i}': {i}" for i in range(20))
+    code = f'''def f(a):
+    """Look up a in the table."""
+    table = [{table}]
+    mapping = {{{mapping}}}
+    message = "{long_text}"
+
+    def helper(b):
+        """Helper docstring."""
+        return b * 2
+
+    return helper(table[a]) + mapping.get(message, 0)
+'''
+    # Nested functions are visited first, the outer one comes last
+    segment = func_code_segments(code)[-1]
+
+    compacted, saved = compact_code(segment.code_str, segment.code_node)
+
+    assert saved > 0
+    assert '"""Look up a in the table."""' in compacted
+    assert "table = [0, 1, 2, ...]" in compacted
+    assert "mapping = {'k0': 0, 'k1': 1, 'k2': 2, ...: ...}" in compacted
+    assert "x" * 80 + "..." in compacted
+    assert "x" * 81 not in compacted
+    assert "def helper(b):\n        ..." in compacted
+    assert "Helper docstring" not in compacted
+    assert "return helper(table[a]) + mapping.get(message, 0)" in compacted
+
+
+def test_compact_code_keeps_small_code(
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    segment = func_code_segments("def f(a):\n    return [a, 1, 2]")[0]
+
+    assert compact_code(segment.code_str, segment.code_node) == (
+        segment.code_str,
+        0,
+    )
+
+
+def test_compact_code_can_keep_nested_bodies(
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    table = ", ".join(str(i) for i in range(100))
+    code = f'''def f(a):
+    """Send a in the background."""
+    table = [{table}]
+
+    def helper(b):
+        requests.post(URL, data=b)
+
+    return threading.Thread(target=helper, args=(table[a],))
+'''
+    segment = func_code_segments(code)[-1]
+
+    compacted, saved = compact_code(
+        segment.code_str, segment.code_node, keep_nested_bodies=True
+    )
+
+    assert saved > 0
+    assert "table = [0, 1, 2, ...]" in compacted
+    assert "requests.post(URL, data=b)" in compacted
@@ -0,0 +1,197 @@
+import json
+import secrets
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+import requests
+
+import pydolce
+from pydolce.bench.mock_server import MOCK_MODEL, MockLLMServer, MockServerConfig
+from pydolce.commands.worker import _lease_context
+from pydolce.config import DolceConfig
+from pydolce.core.distributed import (
+    LEASES_EXPIRED_ISSUE,
+    SECRET_HEADER,
+    Coordinator,
+    WorkQueue,
+)
+
+HELPER = '''
+def send_{i}(address) -> bool:
+    """Send a message over the network.
+
+    Returns:
+        bool: Whether the message was sent.
+    """
+    return requests.post(address).ok
+'''
+
+UNAVAILABLE = {"DCE501": [{"status": "unknown", "issue": "down"}]}
+GOOD = {"DCE501": [{"status": "good", "issue": ""}]}
+
+
+def test_leases_are_batched_and_expire() -> None:
+    work = WorkQueue(lease_timeout=0.0)
+    for i in range(3):
+        work.add("mod.py", f"mod.py:{i} f", ["DCE501"], "source")
+
+    first = work.lease("a", 2)
+    assert [item["id"] for item in first["items"]] == [0, 1]
+    assert first["files"] == {"mod.py": "source"}
+    # The lease of "a" expired, so its items are handed out again first
+    assert [item["id"] for item in work.lease("b", 5)["items"]] == [0, 1, 2]
+
+    work.complete("b", {0: GOOD, 1: GOOD, 2: GOOD})
+    work.complete("a", {0: GOOD})  # Late duplicate
+    assert work.finished
+    assert [item.id for item, _ in work.results()] == [0, 1, 2]
+
+
+def test_items_retried_when_the_llm_of_a_worker_is_unavailable() -> None:
+    work = WorkQueue(max_attempts=2, retry_issue="down")
+    work.add("mod.py", "mod.py:1 f", ["DCE501"], "source")
+
+    work.lease("a", 1)
+    work.complete("a", {0: UNAVAILABLE})
+    assert not work.finished
+    work.lease("b", 1)
+    work.complete("b", {0: UNAVAILABLE})  # Out of attempts, kept as unknown
+    assert work.finished
+
+
+def test_items_given_up_after_max_attempts() -> None:
+    work = WorkQueue(lease_timeout=0.0, max_attempts=2)
+    work.add("mod.py", "mod.py:1 f", ["DCE501"], "source")
+
+    assert work.lease("a", 1)["items"]
+    assert work.lease("b", 1)["items"]  # The lease of "a" expired
+    assert not work.lease("c", 1)["items"]  # So did the one of "b"
+    assert work.finished
+    [(_, results)] = list(work.results())
+    assert results["DCE501"][0]["issue"] == LEASES_EXPIRED_ISSUE
+
+
+def test_late_results_of_pending_items_are_kept() -> None:
+    work = WorkQueue(lease_timeout=0.0)
+    work.add("mod.py", "mod.py:1 f", ["DCE501"], "source")
+
+    work.lease("a", 1)
+    work.lease("b", 0)  # Requeues the expired lease of "a"
+    work.complete("a", {0: GOOD})
+    assert work.finished
+    assert not work.lease("b", 1)["items"]
+    assert [results for _, results in work.results()] == [GOOD]
+
+
+def test_items_left_are_given_up_without_workers() -> None:
+    work = WorkQueue(retry_issue="down", idle_timeout=0.0)
+    work.add("mod.py", "mod.py:1 f", ["DCE501"], "source")
+    work.add("mod.py", "mod.py:2 g", ["DCE501"], "source")
+
+    work.lease("a", 1)  # Never sends its results
+
+    assert [results for _, results in work.results()] == [UNAVAILABLE] * 2
+    assert work.timed_out
+
+
+def test_coordinator_fails_when_no_worker_connects(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    (tmp_path / "mod.py").write_text('"""Module."""\n' + HELPER.format(i=0))
+
+    with pytest.raises(SystemExit):
+        pydolce.coordinate(
+            ".", DolceConfig(), idle_timeout=0.0, report_json="report.json"
+        )
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    [key] = [key for key in report["segments"] if "send_0" in key]
+    assert report["segments"][key]["DCE501"][0]["status"] == "unknown"
+
+
+def test_workers_use_the_check_options_of_the_coordinator() -> None:
+    work = WorkQueue()
+    work.add("a.py", "a.py::f", ["DCE501"], "")
+    work.options = {"compact_code": False, "max_prompt_tokens": 100}
+
+    lease = work.lease("a", 1) | {"vocabulary": None}
+    lease["options"]["temperature"] = 1.0  # Not a check option, ignored
+    ctx = _lease_context(DolceConfig(max_prompt_tokens=8000), lease)
+
+    assert not ctx.config.compact_code
+    assert ctx.config.max_prompt_tokens == 100
+    assert ctx.config.temperature == 0.0
+
+
+def test_coordinator_requires_its_secret() -> None:
+    work = WorkQueue()
+    work.add("mod.py", "mod.py:1 f", ["DCE501"], "source")
+    with pytest.raises(ValueError):
+        Coordinator(work, host="0.0.0.0")  # noqa: S104
+
+    secret = secrets.token_hex(8)
+    with Coordinator(work, secret=secret) as coordinator:
+        url = f"{coordinator.url}/lease"
+        denied = requests.post(url, json={"max": 1}, timeout=5)
+        leased = requests.post(
+            url, json={"max": 1}, headers={SECRET_HEADER: secret}, timeout=5
+        )
+
+    assert denied.status_code == 401
+    assert leased.json()["files"] == {"mod.py": "source"}
+
+
+def test_leases_carry_the_vocabulary_when_asked() -> None:
+    work = WorkQueue()
+    work.add("a.py", "a.py::f", ["DCE501"], "")
+    work.vocabulary = {"docs": 1, "length": 3, "df": {"send": 1}}
+
+    assert "vocabulary" not in work.lease("a", 1)
+    assert work.lease("a", 1, with_vocabulary=True)["vocabulary"] == work.vocabulary
+
+
+def test_workers_check_the_llm_rules_of_the_coordinator(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    for i in range(3):
+        (tmp_path / f"mod{i}.py").write_text(
+            f'"""Module {i}."""\n' + HELPER.format(i=2 * i) + HELPER.format(i=2 * i + 1)
+        )
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    with MockLLMServer(MockServerConfig()) as server:
+        worker_config = DolceConfig(
+            url=server.url,
+            model=MOCK_MODEL,
+            provider="ollama",
+            llm_cache=False,
+            warm_up=False,
+        )
+        workers = [
+            threading.Thread(
+                target=pydolce.worker,
+                args=(f"http://127.0.0.1:{port}", worker_config),
+                kwargs={"batch_size": 2, "name": f"w{i}"},
+            )
+            for i in range(2)
+        ]
+        for thread in workers:
+            thread.start()
+        pydolce.coordinate(".", DolceConfig(), port=port, report_json="report.json")
+        for thread in workers:
+            thread.join(10)
+
+    assert len(server.latencies) == 6
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["counters"]["remote_llm_checks"] == 6
+    functions = [key for key in report["segments"] if "send_" in key]
+    assert len(functions) == 6
+    assert all("DCE501" in report["segments"][key] for key in functions)
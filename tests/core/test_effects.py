@@ -0,0 +1,114 @@
+from typing import Any, Callable
+
+from pytest_mock import MockerFixture
+
+from pydolce.core.cache import segment_fingerprint
+from pydolce.core.check import check_llm_rules
+from pydolce.core.client import LLMResponse
+from pydolce.core.effects import EffectKind, analyze_effects
+from pydolce.core.parser import CodeSegment
+from pydolce.core.rules.checkers.common import CheckContext, CheckStatus
+from pydolce.core.rules.rulesets import RULE_BY_REF
+from pydolce.core.stats import LLMUsage
+
+GOOD = '{"status": "GOOD", "issues": [], "descr": []}'
+
+
+def _client(mocker: MockerFixture) -> Any:
+    client = mocker.Mock()
+    client.complete.return_value = LLMResponse(GOOD, LLMUsage())
+    return client
+
+
+def test_aliased_imports_are_resolved(
+    code_segment: Callable[[str], list[CodeSegment]],
+) -> None:
+    code = (
+        "import os as system\n"
+        "from subprocess import run as sh\n"
+        "def f(cmd):\n"
+        '    """Run a command."""\n'
+        "    system.environ['X'] = '1'\n"
+        "    return sh(cmd)\n"
+    )
+    segment = code_segment(code)[-1]
+
+    effects = analyze_effects(segment)
+
+    assert [(e.kind, e.name) for e in effects] == [
+        (EffectKind.GLOBAL_STATE, "os.environ"),
+        (EffectKind.SUBPROCESS, "subprocess.run"),
+    ]
+
+
+def test_unimported_names_are_not_effects(
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    code = (
+        "def f(requests):\n"
+        '    """Count the requests."""\n'
+        "    return len(requests.get('items', []))\n"
+    )
+    assert analyze_effects(func_code_segments(code)[0]) == []
+
+
+def test_pure_functions_are_resolved_statically(
+    mocker: MockerFixture,
+    ctx: CheckContext,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    segment = func_code_segments('def f(a):\n    """Double a."""\n    return 2 * a')[0]
+    llm = _client(mocker)
+
+    report = check_llm_rules(segment, ctx, llm, [RULE_BY_REF["DCE502"]])
+
+    assert report is not None
+    assert report[RULE_BY_REF["DCE502"]][0].status == CheckStatus.GOOD
+    llm.complete.assert_not_called()
+    assert ctx.stats.counters["llm_rules_prescreened"] == 1
+
+
+def test_detected_effects_are_sent_as_hints(
+    mocker: MockerFixture,
+    ctx: CheckContext,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    segment = func_code_segments(
+        'def f(path):\n    """Read a file."""\n    open(path).close()'
+    )[0]
+    llm = _client(mocker)
+
+    check_llm_rules(segment, ctx, llm, [RULE_BY_REF["DCE502"]])
+
+    kwargs = llm.complete.call_args.kwargs
+    assert "filesystem (open, line 3)" in kwargs["prompt"]
+    assert "filesystem" not in kwargs["system"]
+
+
+def test_calls_on_unknown_objects_are_sent_to_the_llm(
+    mocker: MockerFixture,
+    ctx: CheckContext,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    segment = func_code_segments(
+        'def f(self, data):\n    """Store data."""\n    self.session.post(data)'
+    )[0]
+    llm = _client(mocker)
+
+    check_llm_rules(segment, ctx, llm, [RULE_BY_REF["DCE502"]])
+
+    llm.complete.assert_called_once()
+    assert ctx.stats.counters["llm_rules_prescreened"] == 0
+
+
+def test_fingerprints_depend_on_the_imports_used(
+    code_segment: Callable[[str], list[CodeSegment]],
+) -> None:
+    code = 'def f(cmd):\n    """Run a command."""\n    return run(cmd)\n'
+    local = code_segment("from tasks import run\n" + code)[-1]
+    subprocess = code_segment("from subprocess import run\n" + code)[-1]
+    unused = code_segment("from subprocess import run, call\n" + code)[-1]
+
+    assert local.code_str == subprocess.code_str
+    assert segment_fingerprint(local) != segment_fingerprint(subprocess)
+    assert segment_fingerprint(unused) == segment_fingerprint(subprocess)
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+import requests
+from pytest_mock import MockerFixture
+
+from pydolce.core.client import LLMClient, LLMConfig, ProviderType
+from pydolce.core.endpoints import Endpoint, EndpointPool, parse_endpoints
+
+
+def test_parse_weighted_endpoints() -> None:
+    endpoints = parse_endpoints(
+        ["http://cpu:11434/", {"url": "http://gpu:11434", "weight": 4}]
+    )
+
+    assert [ep.url for ep in endpoints] == ["http://cpu:11434", "http://gpu:11434"]
+    assert [ep.weight for ep in endpoints] == [1.0, 4.0]
+
+    with pytest.raises(ValueError):
+        parse_endpoints([{"url": "http://gpu:11434", "weight": 0}])
+
+
+def test_least_outstanding_requests() -> None:
+    pool = EndpointPool([Endpoint("http://a"), Endpoint("http://b", weight=2)])
+
+    acquired = [pool.acquire().url for _ in range(3)]
+
+    assert acquired.count("http://b") == 2
+    assert acquired.count("http://a") == 1
+
+
+def test_failing_endpoint_is_ejected_and_reprobed() -> None:
+    a, b = Endpoint("http://a"), Endpoint("http://b")
+    pool = EndpointPool([a, b], max_failures=2, eject_time=60.0)
+
+    for _ in range(2):
+        pool.release(pool.acquire(exclude={"http://b"}), failed=True)
+
+    assert not a.is_healthy(time.monotonic())
+    assert all(pool.acquire().url == "http://b" for _ in range(3))
+
+    a.ejected_until = 0.0  # Ejection time elapsed
+    endpoint = pool.acquire()
+    assert endpoint is a
+    pool.release(endpoint)
+    assert a.failures == 0
+
+
+def test_client_fails_over_on_connection_error(mocker: MockerFixture) -> None:
+    def _post(url: str, **_kwargs: object) -> object:
+        if url.startswith("http://down"):
+            raise requests.exceptions.ConnectionError("down")
+        response = mocker.Mock()
+        response.json.return_value = {"response": "ok"}
+        return response
+
+    mocker.patch("pydolce.core.client.requests.post", side_effect=_post)
+    sleep = mocker.patch("pydolce.core.client.time.sleep")
+    client = LLMClient(
+        LLMConfig(
+            base_url="http://down:11434",
+            model="qwen3:8b",
+            provider=ProviderType.OLLAMA,
+            endpoints=parse_endpoints(["http://down:11434", "http://up:11434"]),
+            max_endpoint_failures=1,
+        )
+    )
+
+    assert client.generate("Hi") == "ok"
+    assert client.generate("Hi") == "ok"
+    assert client.pool.endpoints[0].failures == 1
+    sleep.assert_not_called()
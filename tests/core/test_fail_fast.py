@@ -0,0 +1,101 @@
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from pytest_mock import MockerFixture
+from typer.testing import CliRunner
+
+import pydolce
+from pydolce.config import DolceConfig
+from pydolce.core.check import LLM_CANCELLED_ISSUE, check_segment
+from pydolce.core.client import LLMCancelledError, LLMClient, LLMConfig, ProviderType
+from pydolce.core.rules.rule import CheckContext, LLMRule
+from pydolce.core.rules.rulesets import ALL_RULES
+from pydolce.main import app
+
+MODULE = '''"""Module {i}."""
+
+
+def f{i}(x: int) -> int:
+    """Double x.
+
+    Args:
+        y (int): The number.
+
+    Returns:
+        int: The double.
+    """
+    return x * 2
+'''
+
+
+def test_run_stops_at_max_errors(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    for i in range(20):
+        (tmp_path / f"mod{i:02}.py").write_text(MODULE.format(i=i))
+
+    with pytest.raises(SystemExit):
+        pydolce.check(".", DolceConfig(url="", max_errors=3))
+
+    output = " ".join(capsys.readouterr().out.split())
+    assert output.count("[ ERROR ]") == 3
+    assert "Stopped after 3 segments with errors" in output
+    # The results computed before stopping are flushed to the cache
+    cache_file = tmp_path / ".pydolce" / "cache" / "check_cache.json"
+    assert cache_file.read_text().count('"DCE305"') == 3
+
+
+def test_max_errors_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        DolceConfig(max_errors=0).validate()
+
+
+def test_cancelled_client_sends_no_requests(
+    mocker: MockerFixture, func_code_segments: Callable, ctx: CheckContext
+) -> None:
+    post = mocker.patch("pydolce.core.client.requests.post")
+    client = LLMClient(
+        LLMConfig(
+            base_url="http://localhost:11434",
+            model="qwen3:8b",
+            provider=ProviderType.OLLAMA,
+        )
+    )
+    client.cancel()
+
+    with pytest.raises(LLMCancelledError):
+        client.generate("Hi")
+
+    def documented(a: int) -> int:
+        """Return the argument.
+
+        Args:
+            a (int): The argument.
+
+        Returns:
+            int: The argument.
+        """
+        return a
+
+    report = check_segment(func_code_segments(documented)[0], ALL_RULES, ctx, client)
+    assert all(
+        results == [results[0]] and results[0].issue == LLM_CANCELLED_ISSUE
+        for rule, results in report.items()
+        if isinstance(rule, LLMRule)
+    )
+    post.assert_not_called()
+
+
+def test_cli_max_errors_is_validated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(app, ["check", "--no-llm", "--max-errors", "0"])
+
+    assert result.exit_code == 2
+    assert "Max errors must be a positive integer" in result.output
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+
+import pydolce
+from pydolce.config import DolceConfig
+from pydolce.core import pipeline
+from pydolce.core.cache import CacheHandler
+from pydolce.core.pipeline import ParseStage
+from pydolce.core.rules.rulesets import RULE_BY_REF
+
+MODULE = '''
+def f{i}(x: int) -> int:
+    """Double x.
+
+    Args:
+        y (int): The number.
+
+    Returns:
+        int: The double.
+    """
+    return x * 2
+'''
+
+
+def _write_modules(root: Path, count: int) -> list[Path]:
+    files = [root / f"mod{i:03}.py" for i in range(count)]
+    for i, file in enumerate(files):
+        file.write_text(MODULE.format(i=i))
+    return files
+
+
+def test_parse_stage_yields_segments_in_order(tmp_path: Path) -> None:
+    files = _write_modules(tmp_path, 5)
+    stage = ParseStage(files, DolceConfig(), keep=lambda s: s.code_path[-1] in "013")
+
+    segments = list(stage)
+    assert [s.code_path.split()[-1] for s in segments] == ["f0", "f1", "f3"]
+    assert not stage.static_results(segments[0])  # Parsed in this process
+
+
+def test_parse_stage_raises_parse_errors(tmp_path: Path) -> None:
+    missing = tmp_path / "missing.py"
+    with pytest.raises(OSError):
+        list(ParseStage([missing], DolceConfig()))
+
+
+def test_parse_processes_check_static_rules(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(pipeline, "MIN_FILES_PER_PROCESS", 2)
+    files = _write_modules(tmp_path, 6)
+    rule = RULE_BY_REF["DCE305"]
+    stage = ParseStage(files, DolceConfig(parse_processes=2), [rule])
+    assert stage.processes == 2
+
+    functions = [s for s in stage if not s.code_path.endswith("(module)")]
+    assert [s.file_path for s in functions] == files
+    for segment in functions:
+        results = stage.static_results(segment)
+        assert list(results) == [rule]
+        assert results[rule][0].is_bad
+
+
+def test_cache_syncs_are_batched(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    _write_modules(tmp_path, 5)
+    syncs: list[float] = []
+    sync_cache = CacheHandler.sync_cache
+
+    def _sync(self: CacheHandler, min_interval: float = 0.0) -> None:
+        if min_interval == 0.0:
+            syncs.append(min_interval)
+        sync_cache(self, min_interval)
+
+    monkeypatch.setattr(CacheHandler, "sync_cache", _sync)
+    with pytest.raises(SystemExit):
+        pydolce.check(".", DolceConfig(url=""))
+
+    assert len(syncs) == 1
+    cache_file = tmp_path / ".pydolce" / "cache" / "check_cache.json"
+    assert cache_file.read_text().count('"DCE305"') == 5
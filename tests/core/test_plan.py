@@ -0,0 +1,85 @@
+from typing import Any, Callable
+
+from pytest_mock import MockerFixture
+
+from pydolce.config import DolceConfig
+from pydolce.core.check import check_segment
+from pydolce.core.client import LLMResponse
+from pydolce.core.parser import CodeSegment, CodeSegmentType
+from pydolce.core.router import LLMRouter
+from pydolce.core.rules.checkers.common import CheckContext
+from pydolce.core.rules.plan import RulePlan
+from pydolce.core.rules.rulesets import ALL_RULES, RULE_BY_REF
+from pydolce.core.stats import LLMUsage
+
+GOOD = '{"status": "GOOD", "issues": [], "descr": []}'
+
+
+def _client(mocker: MockerFixture) -> Any:
+    client = mocker.Mock()
+    client.complete.return_value = LLMResponse(GOOD, LLMUsage())
+    return client
+
+
+def test_plan_dispatches_rules_by_segment_type() -> None:
+    plan = RulePlan(ALL_RULES)
+
+    module = plan.for_type(CodeSegmentType.Module)
+    function = plan.for_type(CodeSegmentType.Function)
+
+    assert RULE_BY_REF["DCE102"] in module.static_rules
+    assert RULE_BY_REF["DCE102"] not in function.static_rules
+    assert module.llm_groups == ()
+    assert [rule.code for rule in function.static_rules] == sorted(
+        rule.code for rule in function.static_rules
+    )
+    assert {rule.reference for rule in function.llm_rules} == {"DCE501", "DCE502"}
+
+
+def test_plan_groups_llm_rules_by_profile(
+    mocker: MockerFixture,
+) -> None:
+    router = LLMRouter(
+        {"default": mocker.Mock(), "small": mocker.Mock()}, {"DCE502": "small"}
+    )
+
+    groups = (
+        RulePlan(ALL_RULES, router.profile_for)
+        .for_type(CodeSegmentType.Method)
+        .llm_groups
+    )
+
+    assert [(g.profile, g.rules) for g in groups] == [
+        ("default", (RULE_BY_REF["DCE501"],)),
+        ("small", (RULE_BY_REF["DCE502"],)),
+    ]
+    # Rules of a profile share one request
+    (group,) = RulePlan(ALL_RULES).for_type(CodeSegmentType.Method).llm_groups
+    assert group.rules == (RULE_BY_REF["DCE501"], RULE_BY_REF["DCE502"])
+
+
+def test_filtered_rule_set_can_be_iterated_again() -> None:
+    config = DolceConfig(target=["DCE101", "DCE501"], disable=["DCE501"])
+
+    assert {rule.reference for rule in config.rule_set} == {"DCE101"}
+    assert {rule.reference for rule in config.rule_set} == {"DCE101"}
+
+
+def test_check_segment_skips_rules_and_out_of_scope_llm_rules(
+    mocker: MockerFixture,
+    ctx: CheckContext,
+    class_code_segments: Callable[[str], list[CodeSegment]],
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    llm = _client(mocker)
+    plan = RulePlan(ALL_RULES)
+
+    segment = class_code_segments('class A:\n    """An A."""\n    x = 1')[0]
+    check_segment(segment, plan, ctx, llm)
+    llm.complete.assert_not_called()
+
+    segment = func_code_segments('def f(a):\n    """Print a."""\n    print(a)')[0]
+    cached = {RULE_BY_REF["DCE101"]: [], RULE_BY_REF["DCE501"]: []}
+    report = check_segment(segment, plan, ctx, llm, cached=cached)
+    assert not set(cached) & set(report)
+    assert RULE_BY_REF["DCE502"] in report
@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from typer.testing import CliRunner
+
+import pydolce
+from pydolce.bench.mock_server import MOCK_MODEL, MockLLMServer, MockServerConfig
+from pydolce.config import DolceConfig
+from pydolce.core.parser import CodeSegment
+from pydolce.core.priority import parse_diff, risk_score
+from pydolce.main import app
+
+DIFF = """\
+diff --git a/src/mod.py b/src/mod.py
+--- a/src/mod.py
++++ b/src/mod.py
+@@ -3,0 +4,2 @@ def f():
+@@ -10 +12 @@ def g():
+@@ -20,3 +22,0 @@ def h():
+diff --git a/old.py b/old.py
+deleted file mode 100644
+--- a/old.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+"""
+
+HELPER = '''
+def send(address) -> bool:
+    """Send a message over the network.
+
+    Returns:
+        bool: Whether the message was sent.
+    """
+    return requests.post(address).ok
+'''
+
+
+def test_parse_diff_keeps_added_lines(tmp_path: Path) -> None:
+    changed = parse_diff(DIFF, tmp_path)
+    assert changed == {(tmp_path / "src" / "mod.py").resolve(): [(4, 5), (12, 12)]}
+
+
+def test_changed_public_uncached_segments_come_first(
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    public, private = func_code_segments(
+        'def send():\n    """Send."""\n    pass\n\n'
+        'def _send():\n    """Send."""\n    pass\n'
+    )
+    changed = {private.file_path.resolve(): [(private.lineno, private.lineno)]}
+
+    assert risk_score(private, changed, cached=True) > risk_score(public, {}, False)
+    assert risk_score(public, {}, cached=False) > risk_score(public, {}, True)
+    assert risk_score(public, {}, cached=True) > risk_score(private, {}, True)
+
+
+@pytest.mark.parametrize("time_budget, requests", [(1e-9, 0), (60.0, 1)])
+def test_llm_checks_deferred_past_the_time_budget(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    time_budget: float,
+    requests: int,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    (tmp_path / "mod.py").write_text(f'"""Module."""\n{HELPER}')
+
+    with MockLLMServer(MockServerConfig()) as server:
+        config = DolceConfig(
+            url=server.url,
+            model=MOCK_MODEL,
+            provider="ollama",
+            llm_cache=False,
+            warm_up=False,
+            time_budget=time_budget,
+        )
+        pydolce.check(".", config, stats_json="stats.json")
+
+    stats = (tmp_path / "stats.json").read_text()
+    assert len(server.latencies) == requests
+    assert ('"segments_deferred": 1' in stats) == (not requests)
+
+
+def test_cli_time_budget_is_validated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(app, ["check", "--no-llm", "--time-budget", "0"])
+
+    assert result.exit_code == 2
+    assert "Time budget must be a positive number" in result.output
@@ -0,0 +1,69 @@
+from typing import Any, Callable
+
+import pytest
+from pytest_mock import MockerFixture
+
+from pydolce.config import DolceConfig
+from pydolce.core.check import check_llm_rules
+from pydolce.core.client import LLMResponse
+from pydolce.core.parser import CodeSegment
+from pydolce.core.router import LLMRouter
+from pydolce.core.rules.checkers.common import CheckContext, CheckStatus
+from pydolce.core.rules.rule import LLMRule
+from pydolce.core.rules.rulesets import ALL_RULES, RULE_BY_REF
+from pydolce.core.stats import LLMUsage
+
+GOOD = '{"status": "GOOD", "issues": [], "descr": []}'
+BAD_501 = '{"status": "BAD", "issues": ["DCE501"], "descr": ["Sends SMS"]}'
+
+
+def _client(mocker: MockerFixture, text: str) -> Any:
+    client = mocker.Mock()
+    client.complete.return_value = LLMResponse(text, LLMUsage())
+    return client
+
+
+def test_rules_are_routed_by_reference_then_group(mocker: MockerFixture) -> None:
+    router = LLMRouter(
+        {"default": mocker.Mock(), "small": mocker.Mock(), "big": mocker.Mock()},
+        routing={"semantic": "small", "DCE502": "big"},
+    )
+
+    assert router.profile_for(RULE_BY_REF["DCE501"]) == "small"
+    assert router.profile_for(RULE_BY_REF["DCE101"]) == "default"
+    assert router.profile_for(RULE_BY_REF["DCE502"]) == "big"
+
+
+def test_bad_verdicts_are_escalated(
+    mocker: MockerFixture,
+    ctx: CheckContext,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    segment = func_code_segments('def f():\n    """Send an email."""\n    sms()')[0]
+    small = _client(mocker, BAD_501)
+    big = _client(mocker, GOOD)
+    router = LLMRouter({"default": small, "big": big}, routing={}, escalate_to="big")
+    rules = [rule for rule in ALL_RULES if isinstance(rule, LLMRule)]
+
+    report = check_llm_rules(segment, ctx, router, rules)
+
+    assert report is not None
+    assert all(r[0].status == CheckStatus.GOOD for r in report.values())
+    assert small.complete.call_count == 1
+    assert big.complete.call_count == 1
+    assert ctx.stats.counters["escalated_prompts"] == 1
+
+
+def test_routing_validation() -> None:
+    config = DolceConfig(
+        profiles={"small": {"model": "qwen3:1.7b"}}, routing={"content": "small"}
+    )
+    config.validate()
+    assert config.profile_config("small").model == "qwen3:1.7b"
+
+    with pytest.raises(ValueError, match="Unknown profile"):
+        DolceConfig(routing={"content": "tiny"}).validate()
+    with pytest.raises(ValueError, match="Invalid routing key"):
+        DolceConfig(profiles={"small": {}}, routing={"typos": "small"}).validate()
+    with pytest.raises(ValueError, match="Invalid options"):
+        DolceConfig(profiles={"small": {"exclude": []}}).validate()
@@ -0,0 +1,144 @@
+import dataclasses
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from typer.testing import CliRunner
+
+import pydolce
+from pydolce.bench.mock_server import MOCK_MODEL, MockLLMServer, MockServerConfig
+from pydolce.config import DolceConfig
+from pydolce.core.parser import CodeSegment
+from pydolce.core.rules.rulesets import RULE_BY_REF
+from pydolce.core.sampling import Coverage, SampleRotation, stale_rules
+from pydolce.main import app
+
+HELPER = '''
+def send_{i}(address) -> bool:
+    """Send a message over the network.
+
+    Returns:
+        bool: Whether the message was sent.
+    """
+    return requests.post(address).ok
+'''
+
+
+def test_rotation_covers_every_segment(
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    segments = func_code_segments(
+        "\n".join(f"def f{i}():\n    pass\n" for i in range(50))
+    )
+    sampled = [
+        [s for s in segments if s in SampleRotation(0.25, seed=7, run=run)]
+        for run in range(4)
+    ]
+    assert sorted(s.code_path for run in sampled for s in run) == sorted(
+        s.code_path for s in segments
+    )
+    assert all(run for run in sampled)
+
+
+def test_rotation_advances_per_saved_run(tmp_path: Path) -> None:
+    state = tmp_path / "sampling.json"
+    runs = []
+    for _ in range(3):
+        rotation = SampleRotation.next_run(0.1, 0, state)
+        rotation.save(state)
+        runs.append(rotation.run)
+    assert runs == [0, 1, 2]
+    # Runs that are not saved take the same slot again
+    assert SampleRotation.next_run(0.1, 0, state).run == 3
+    assert SampleRotation.next_run(0.1, 0, state).run == 3
+    # A new seed starts a new rotation
+    assert SampleRotation.next_run(0.1, 1, state).run == 0
+
+
+def test_stale_verdicts_and_coverage() -> None:
+    r501, r502 = RULE_BY_REF["DCE501"], RULE_BY_REF["DCE502"]
+    now = time.time()
+    times = {r501: now - 100.0, r502: now - 10.0}
+    assert stale_rules(times, [r501, r502], max_age=50.0) == {r501}
+    assert stale_rules({}, [r501], max_age=50.0) == {r501}
+
+    coverage = Coverage()
+    coverage.add(times, [r501, r502])
+    coverage.add({r501: now}, [r501, r502])
+    coverage.add({}, [])
+    assert (coverage.covered, coverage.segments) == (1, 2)
+    assert coverage.oldest == now - 100.0
+
+
+def test_sampled_runs_cover_the_project(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    (tmp_path / "mod.py").write_text(
+        '"""Module."""\n' + "".join(HELPER.format(i=i) for i in range(6))
+    )
+
+    with MockLLMServer(MockServerConfig()) as server:
+        config = DolceConfig(
+            url=server.url,
+            model=MOCK_MODEL,
+            provider="ollama",
+            llm_cache=False,
+            warm_up=False,
+            sample=0.5,
+        )
+        pydolce.check(".", config)
+        first_run = len(server.latencies)
+        pydolce.check(".", config)
+
+    assert 0 < first_run < 6
+    assert len(server.latencies) == 6
+    output = " ".join(capsys.readouterr().out.split())
+    assert "6 of 6 segments covered (100.0%)" in output
+
+
+def test_runs_stopped_early_keep_their_slice(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    (tmp_path / "mod.py").write_text(
+        '"""Module."""\n' + "".join(HELPER.format(i=i) for i in range(6))
+    )
+    (tmp_path / "bad.py").write_text(
+        '"""Module."""\n\n\ndef f(x):\n    """Double x.\n\n'
+        '    Args:\n        y (int): The number.\n    """\n    return x * 2\n'
+    )
+    state = tmp_path / ".pydolce" / "cache" / "sampling.json"
+
+    with MockLLMServer(MockServerConfig()) as server:
+        config = DolceConfig(
+            url=server.url,
+            model=MOCK_MODEL,
+            provider="ollama",
+            llm_cache=False,
+            warm_up=False,
+            sample=0.5,
+        )
+        with pytest.raises(SystemExit):
+            pydolce.check(".", dataclasses.replace(config, max_errors=1))
+        assert not state.exists()
+        with pytest.raises(SystemExit):
+            pydolce.check(".", config)
+
+    assert SampleRotation.next_run(0.5, 0, state).run == 1
+
+
+@pytest.mark.parametrize("sample", ["0", "5", "-1"])
+def test_cli_sample_is_validated(
+    sample: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(app, ["check", "--no-llm", "--sample", sample])
+
+    assert result.exit_code == 2
+    assert "Sample must be greater than 0.0" in result.output
@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+import pydolce
+from pydolce.config import DolceConfig
+from pydolce.core.results import RunReport
+from pydolce.core.sharding import Shard, weighted_buckets
+from pydolce.main import app
+
+MODULE = '''"""Module {i}."""
+
+
+def f{i}(x: int) -> int:
+    """Double x.
+
+    Args:
+        x (int): The number.
+
+    Returns:
+        int: The double.
+    """
+    return x * 2
+'''
+
+
+def test_parse_shard() -> None:
+    assert Shard.parse("2/4") == Shard(1, 4)
+    assert str(Shard.parse(" 3 / 3 ", "segment")) == "3/3"
+    for spec in ("0/2", "3/2", "1", "a/b"):
+        with pytest.raises(ValueError):
+            Shard.parse(spec)
+
+
+def test_shards_partition_the_files(tmp_path: Path) -> None:
+    files = [tmp_path / f"pkg/mod{i}.py" for i in range(40)]
+    shards = [Shard(i, 3).files(files, tmp_path) for i in range(3)]
+
+    assert sorted(f for shard in shards for f in shard) == sorted(files)
+    assert all(shards)
+    # Stable across machines checking out the project elsewhere
+    elsewhere = [tmp_path / "copy" / f.relative_to(tmp_path) for f in files]
+    assert [len(Shard(i, 3).files(elsewhere, tmp_path / "copy")) for i in range(3)] == [
+        len(shard) for shard in shards
+    ]
+
+
+def test_weighted_buckets_balance_timings() -> None:
+    buckets = weighted_buckets({"a": 5.0, "b": 4.0, "c": 3.0, "d": 3.0, "e": 3.0}, 2)
+    loads = [0.0, 0.0]
+    for key, weight in {"a": 5.0, "b": 4.0, "c": 3.0, "d": 3.0, "e": 3.0}.items():
+        loads[buckets[key]] += weight
+    assert sorted(loads) == [8.0, 10.0]
+    # Unknown files weigh as the mean of the known ones
+    assert weighted_buckets({"a": 2.0, "b": None, "c": 2.0}, 3) == {
+        "a": 0,
+        "b": 1,
+        "c": 2,
+    }
+
+
+def test_merged_shard_reports_cover_the_project(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    for i in range(6):
+        (tmp_path / f"mod{i}.py").write_text(MODULE.format(i=i))
+
+    for i in (1, 2):
+        config = DolceConfig(url="", shard=f"{i}/2")
+        pydolce.check(".", config, report_json=f"shard{i}.json")
+    shard_files = [set(RunReport.load(f"shard{i}.json").files) for i in (1, 2)]
+    assert not shard_files[0] & shard_files[1]
+
+    cache_file = tmp_path / ".pydolce" / "cache" / "check_cache.json"
+    cache_file.unlink()
+    pydolce.merge_results(["shard1.json", "shard2.json"], DolceConfig(), "all.json")
+
+    merged = RunReport.load("all.json")
+    assert set(merged.files) == {f"mod{i}.py" for i in range(6)}
+    assert len(merged.segments) == 12
+    assert len(json.loads(cache_file.read_text())) == 12
+
+
+def test_cli_shard_is_validated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(app, ["check", "--no-llm", "--shard", "3/2"])
+
+    assert result.exit_code == 2
+    assert "i must be between 1 and N" in result.output
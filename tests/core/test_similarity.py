@@ -0,0 +1,123 @@
+from pathlib import Path
+from typing import Any, Callable
+
+from pytest_mock import MockerFixture
+
+from pydolce.config import DolceConfig
+from pydolce.core.check import check_llm_rules
+from pydolce.core.client import LLMResponse
+from pydolce.core.parser import CodeSegment
+from pydolce.core.pipeline import ParseStage
+from pydolce.core.rules.checkers.common import CheckContext, CheckStatus
+from pydolce.core.rules.rulesets import RULE_BY_REF
+from pydolce.core.similarity import Vocabulary, agreement
+from pydolce.core.stats import LLMUsage
+
+MATCHING = '''
+def send_email(address, body):
+    """Send an email message to an address."""
+    message = build_message(body)
+    smtp.send_message(message, to=address)
+'''
+
+MISMATCHING = '''
+def notify(phone, body):
+    """Send an email to the user."""
+    sms_gateway.deliver(phone, body)
+'''
+
+BAD_501 = '{"status": "BAD", "issues": ["DCE501"], "descr": ["Sends SMS"]}'
+
+
+def _client(mocker: MockerFixture, text: str) -> Any:
+    client = mocker.Mock()
+    client.complete.return_value = LLMResponse(text, LLMUsage())
+    return client
+
+
+def test_agreement_scores_summary_terms_found_in_code(
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    assert agreement(func_code_segments(MATCHING)[0]) == 1.0
+    assert agreement(func_code_segments(MISMATCHING)[0]) < 0.5
+
+    short = func_code_segments('def f():\n    """Do it."""\n    g()')[0]
+    assert agreement(short) is None
+
+
+def test_vocabulary_counts_the_parsed_files(tmp_path: Path) -> None:
+    files = [tmp_path / "a.py", tmp_path / "b.py"]
+    files[0].write_text(MATCHING)
+    files[1].write_text(MISMATCHING)
+    cache_file = tmp_path / "vocabulary.json"
+
+    vocabulary = Vocabulary.load(cache_file)
+    list(ParseStage(files, DolceConfig(), vocabulary=vocabulary))
+    assert vocabulary.n_docs == 2
+    assert vocabulary.df["send"] == 1
+    assert vocabulary.idf("send") < vocabulary.idf("unseen")
+    vocabulary.save(cache_file)
+
+    files[1].write_text(MATCHING)
+    vocabulary = Vocabulary.load(cache_file)
+    assert vocabulary.df["send"] == 1  # As counted by the previous run
+    list(ParseStage(files[1:], DolceConfig(), vocabulary=vocabulary))
+    assert vocabulary.n_docs == 2
+    assert vocabulary.df["send"] == 2
+    assert Vocabulary({"all": vocabulary.totals()}).df == vocabulary.df
+
+
+def test_agreeing_segments_skip_the_llm(
+    mocker: MockerFixture,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    config = DolceConfig(behavior_prefilter=0.8, behavior_prefilter_audit=0.0)
+    ctx = CheckContext(config=config)
+    llm = _client(mocker, BAD_501)
+    rules = [RULE_BY_REF["DCE501"]]
+
+    report = check_llm_rules(func_code_segments(MATCHING)[0], ctx, llm, rules)
+    assert report is not None
+    assert report[RULE_BY_REF["DCE501"]][0].status == CheckStatus.GOOD
+    llm.complete.assert_not_called()
+    assert ctx.stats.counters["dce501_prescreened"] == 1
+
+    report = check_llm_rules(func_code_segments(MISMATCHING)[0], ctx, llm, rules)
+    assert report is not None
+    assert report[RULE_BY_REF["DCE501"]][0].status == CheckStatus.BAD
+    assert llm.complete.call_count == 1
+
+
+def test_prefilter_is_opt_in(
+    mocker: MockerFixture,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    ctx = CheckContext(config=DolceConfig())
+    llm = _client(mocker, BAD_501)
+
+    report = check_llm_rules(
+        func_code_segments(MATCHING)[0], ctx, llm, [RULE_BY_REF["DCE501"]]
+    )
+
+    assert report is not None
+    assert report[RULE_BY_REF["DCE501"]][0].status == CheckStatus.BAD
+    assert ctx.stats.counters["dce501_prescreened"] == 0
+
+
+def test_audited_segments_estimate_false_negatives(
+    mocker: MockerFixture,
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    config = DolceConfig(behavior_prefilter=0.8, behavior_prefilter_audit=1.0)
+    ctx = CheckContext(config=config)
+    llm = _client(mocker, BAD_501)
+
+    report = check_llm_rules(
+        func_code_segments(MATCHING)[0], ctx, llm, [RULE_BY_REF["DCE501"]]
+    )
+
+    assert report is not None
+    assert report[RULE_BY_REF["DCE501"]][0].status == CheckStatus.BAD
+    assert ctx.stats.counters["dce501_audited"] == 1
+    assert ctx.stats.counters["dce501_audit_misses"] == 1
+    assert ctx.stats.counters["dce501_prescreened"] == 0
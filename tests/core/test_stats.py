@@ -0,0 +1,50 @@
+import json
+from pathlib import Path
+
+from pydolce.core.stats import LLMUsage, RunStats
+
+
+def test_run_stats_aggregates_calls() -> None:
+    stats = RunStats()
+    stats.record_llm_call(
+        LLMUsage(prompt_tokens=100, completion_tokens=10, latency=1.0),
+        file="a.py",
+        segment="a.f",
+        rule_set="DCE301,DCE302",
+    )
+    stats.record_llm_call(
+        LLMUsage(prompt_tokens=50, completion_tokens=5, latency=3.0),
+        file="a.py",
+        segment="a.g",
+        rule_set="DCE301",
+    )
+    stats.record_llm_call(
+        LLMUsage(latency=0.001, cached=True),
+        file="b.py",
+        segment="b.f",
+        rule_set="DCE301",
+    )
+    stats.increment("segments_checked", 3)
+
+    data = stats.to_dict()
+
+    assert data["run"]["calls"] == 3
+    assert data["run"]["cached_calls"] == 1
+    assert data["run"]["prompt_tokens"] == 150
+    assert data["by_file"]["a.py"]["completion_tokens"] == 15
+    assert data["by_rule_set"]["DCE301"]["calls"] == 2
+    assert data["counters"] == {"segments_checked": 3}
+    # Cached calls do not skew the latency percentiles
+    assert data["latency_p50"] in (1.0, 3.0)
+
+
+def test_run_stats_write_json(tmp_path: Path) -> None:
+    stats = RunStats()
+    stats.record_llm_call(
+        LLMUsage(prompt_tokens=1), file="a.py", segment="a.f", rule_set="DCE301"
+    )
+    out = tmp_path / "stats.json"
+
+    stats.write_json(out)
+
+    assert json.loads(out.read_text())["run"]["prompt_tokens"] == 1
@@ -0,0 +1,69 @@
+from typing import Callable
+
+from pydolce.core.parser import CodeSegment
+from pydolce.core.tokens import TokenBudget, elide_code, estimate_tokens
+
+
+def test_estimate_tokens() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("def f(x): return x") == 9
+    assert estimate_tokens("a_very_long_identifier") == 6
+
+
+def test_elide_function_keeps_head_and_docstring(
+    func_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    body = "\n".join(f"    x{i} = compute({i})" for i in range(500))
+    code = f'def f():\n    """Compute things."""\n{body}\n    return x499'
+    segment = func_code_segments(code)[0]
+
+    elided, was_elided = elide_code(segment.code_str, segment.code_node, 200)
+
+    assert was_elided
+    assert estimate_tokens(elided) <= 200
+    assert elided.startswith('def f():\n    """Compute things."""')
+    assert "lines elided" in elided
+    assert elided.endswith("return x499")
+
+
+def test_elide_class_drops_method_bodies_first(
+    class_code_segments: Callable[[str], list[CodeSegment]],
+) -> None:
+    body = "\n".join(f"        x{i} = compute({i})" for i in range(100))
+    code = (
+        f'class A:\n    """A class."""\n\n    def f(self):\n        """Do f."""\n{body}'
+    )
+    segment = class_code_segments(code)[0]
+
+    elided, was_elided = elide_code(segment.code_str, segment.code_node, 100)
+
+    assert was_elided
+    assert "Do f." in elided
+    assert "compute" not in elided
+    assert "lines elided" not in elided
+
+
+def test_short_code_is_not_elided() -> None:
+    assert elide_code("def f(): pass", None, 100) == ("def f(): pass", False)
+
+
+def test_token_budget_stops_once_reached() -> None:
+    budget = TokenBudget(100)
+
+    assert budget.reserve(80)
+    budget.settle(80, 120)
+
+    assert budget.exhausted
+    assert not budget.reserve(1)
+    assert TokenBudget().reserve(10**9)
+
+
+def test_token_budget_refuses_reservations_past_the_limit() -> None:
+    budget = TokenBudget(100)
+
+    assert budget.reserve(60)
+    assert not budget.reserve(41)
+    assert budget.used == 60
+    assert budget.reserve(40)
+    assert budget.used == 100
+    assert not budget.reserve(1)